@@ -7,6 +7,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from search_engines import search_url
+from dark_mode import DarkMode
 
 HOME_PAGE = "https://www.google.com"
 
@@ -44,11 +46,13 @@ class AdBlockInterceptor(QWebEngineUrlRequestInterceptor):
 #  BROWSER TAB
 # --------------------------
 class BrowserTab(QWidget):
-    def __init__(self, url=HOME_PAGE, profile=None):
+    def __init__(self, url=HOME_PAGE, profile=None, page_factory=None):
         super().__init__()
         layout = QVBoxLayout(self)
         self.web = QWebEngineView()
-        if profile:
+        if page_factory:
+            self.web.setPage(page_factory(self.web))
+        elif profile:
             page = QWebEnginePage(profile, self.web)
             self.web.setPage(page)
         self.web.setUrl(QUrl(url))
@@ -69,12 +73,14 @@ class MiniBrowser(QMainWindow):
         self.profile = QWebEngineProfile.defaultProfile()
         self.profile.setRequestInterceptor(AdBlockInterceptor())
         self.profile.downloadRequested.connect(self.on_download_requested)
+        self.dark = DarkMode(self.profile, self.dark_mode, parent=self)
 
         # --- Tabs ---
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.update_urlbar)
+        self.tabs.currentChanged.connect(lambda i: self.current() and self.dark.apply_if_stale(self.current()))
         self.setCentralWidget(self.tabs)
 
         # --- Toolbar ---
@@ -153,8 +159,8 @@ class MiniBrowser(QMainWindow):
     #  TABS / NAVIGATION
     # --------------------------
     def add_tab(self, url):
-        tab = BrowserTab(url, profile=self.profile)
-        tab.web.loadFinished.connect(lambda ok, w=tab.web: self.apply_dark_if_enabled(w))
+        tab = BrowserTab(url, profile=self.profile, page_factory=self.dark.new_page)
+        tab.web.loadFinished.connect(lambda ok, w=tab.web: ok and self.dark.page_loaded(w))
         index = self.tabs.addTab(tab, "Tab")
         tab.web.titleChanged.connect(lambda t, i=index: self.tabs.setTabText(i, t[:30]))
         tab.web.urlChanged.connect(lambda u, i=index: self.url_changed(u, i))
@@ -164,6 +170,7 @@ class MiniBrowser(QMainWindow):
         if self.tabs.count() == 1:
             self.close()
         else:
+            self.dark.forget(self.tabs.widget(i).web)
             self.tabs.removeTab(i)
 
     def current(self):
@@ -178,8 +185,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
@@ -218,46 +224,12 @@ class MiniBrowser(QMainWindow):
     #  DARK MODE
     # --------------------------
     def toggle_dark_mode(self):
+        # Theme tối sinh theo computed style (không filter toàn trang), chỉ đổi class trên trang đang mở;
+        # tab nền nhận trạng thái mới khi được chọn
         self.dark_mode = not self.dark_mode
-        js = ""
-        if self.dark_mode:
-            js = """
-            (function() {
-                let css = `
-                    html, body { background: #111 !important; filter: invert(1) hue-rotate(180deg) !important; }
-                    img, video, canvas { filter: invert(1) hue-rotate(180deg) !important; }
-                `;
-                let style = document.createElement('style'); style.id = "dark_mode_css"; style.innerText = css;
-                document.head.appendChild(style);
-            })();
-            """
-            self.dark_btn.setText("☀")
-        else:
-            js = """
-            (function() {
-                let style = document.getElementById("dark_mode_css");
-                if(style) style.remove();
-            })();
-            """
-            self.dark_btn.setText("🌙")
-        w = self.current()
-        if w and w.page():
-            w.page().runJavaScript(js)
-
-    def apply_dark_if_enabled(self, web):
-        if not self.dark_mode:
-            return
-        js = """
-        if (!document.getElementById('dark_mode_css')) {
-            let css = `
-                html, body { background: #111 !important; filter: invert(1) hue-rotate(180deg) !important; }
-                img, video, canvas { filter: invert(1) hue-rotate(180deg) !important; }
-            `;
-            let style = document.createElement('style'); style.id = "dark_mode_css"; style.innerText = css;
-            document.head.appendChild(style);
-        }
-        """
-        web.page().runJavaScript(js)
+        self.dark.set_enabled(self.dark_mode)
+        self.dark.apply_visible([self.tabs.widget(i).web for i in range(self.tabs.count())], self.current())
+        self.dark_btn.setText("☀" if self.dark_mode else "🌙")
 
     # --------------------------
     #  DOWNLOAD
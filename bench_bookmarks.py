@@ -0,0 +1,134 @@
+"""Microbenchmark cho BookmarkStore (100k bookmarks) so với cách quét list cũ,
+và độ trễ mỗi phím gõ của ô tìm kiếm (SearchIndex).
+
+    python bench_bookmarks.py --count 100000
+"""
+import json
+import time
+import random
+import argparse
+
+from bookmark_store import BookmarkStore
+from search_index import SearchIndex
+
+LIST_SCAN_SAMPLE = 200  # list scan O(n) chậm => chỉ đo một mẫu nhỏ
+TITLE_WORDS = ("python news video music github docs tutorial release article guide "
+               "linux kernel rust browser weather").split()
+TYPED_QUERIES = ["python guide", "site12 article", "rust 123", "browser", "news linux video"]
+
+
+def make_urls(count, domains):
+    rnd = random.Random(42)
+    urls = []
+    for i in range(count):
+        host = f"site{rnd.randrange(domains)}.example.com"
+        urls.append(f"https://{host}/articles/{i}?id={i}")
+    return urls
+
+
+def per_op_us(seconds, ops):
+    return round(seconds * 1e6 / max(ops, 1), 3)
+
+
+def bench_store(urls):
+    store = BookmarkStore()
+    t = time.perf_counter()
+    for i, url in enumerate(urls):
+        store.add(url, f"Article {i}")
+    add_s = time.perf_counter() - t
+
+    # Cùng URL nhưng host viết hoa, '/' cuối và utm_* => phải bị coi là trùng
+    dupes = [u.replace("https://site", "HTTPS://SITE").replace("?id=", "/?utm_source=x&id=") for u in urls[:10000]]
+    t = time.perf_counter()
+    rejected = sum(1 for i, url in enumerate(dupes) if store.add(url, "dupe") is None)
+    dedupe_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    hits = sum(1 for url in urls if store.get(url) is not None)
+    lookup_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for url in urls[::2]:
+        store.delete(url)
+    delete_s = time.perf_counter() - t
+
+    return {
+        "add_us": per_op_us(add_s, len(urls)),
+        "dedupe_us": per_op_us(dedupe_s, len(dupes)),
+        "dedupe_rejected": rejected,
+        "lookup_us": per_op_us(lookup_s, len(urls)),
+        "lookup_hits": hits,
+        "delete_us": per_op_us(delete_s, len(urls[::2])),
+        "remaining": len(store),
+        "domains": len(store.domains()),
+    }
+
+
+def bench_list_scan(urls):
+    """Cách cũ: any(b['url'] == url ...) và dựng lại list khi xoá"""
+    bookmarks = [{"title": "", "url": u} for u in urls]
+    sample = urls[-LIST_SCAN_SAMPLE:]
+    t = time.perf_counter()
+    for url in sample:
+        any(b['url'] == url for b in bookmarks)
+    dedupe_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for url in sample[:LIST_SCAN_SAMPLE // 4]:
+        bookmarks = [b for b in bookmarks if b['url'] != url]
+    delete_s = time.perf_counter() - t
+    return {
+        "dedupe_us": per_op_us(dedupe_s, len(sample)),
+        "delete_us": per_op_us(delete_s, LIST_SCAN_SAMPLE // 4),
+    }
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def bench_search(urls):
+    """Gõ từng ký tự của TYPED_QUERIES, đo thời gian search mỗi lần gõ"""
+    rnd = random.Random(7)
+    index = SearchIndex()
+    t = time.perf_counter()
+    for i, url in enumerate(urls):
+        title = " ".join(rnd.sample(TITLE_WORDS, 3)) + f" {i}"
+        index.add(url, title, url, visits=rnd.randrange(50))
+    build_s = time.perf_counter() - t
+    index.ranked_chunks()  # sắp xếp theo visits một lần, như khi dựng xong index
+
+    keystrokes = []
+    for query in TYPED_QUERIES:
+        for n in range(1, len(query) + 1):
+            t = time.perf_counter()
+            index.search(query[:n])
+            keystrokes.append((time.perf_counter() - t) * 1000)
+    return {
+        "build_s": round(build_s, 2),
+        "keystrokes": len(keystrokes),
+        "keystroke_p50_ms": round(percentile(keystrokes, 0.5), 3),
+        "keystroke_p95_ms": round(percentile(keystrokes, 0.95), 3),
+        "keystroke_max_ms": round(max(keystrokes), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookmarkStore microbenchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--domains", type=int, default=5000)
+    args = parser.parse_args()
+
+    urls = make_urls(args.count, args.domains)
+    report = {
+        "count": args.count,
+        "store": bench_store(urls),
+        "list_scan": bench_list_scan(urls),
+        "search": bench_search(urls),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Benchmark dark mode (offscreen).
+
+Chi phí chèn mỗi trang: cách cũ (chèn CSS sau loadFinished => restyle + layout lại toàn trang,
+trang trắng trong lúc chờ) so với script DocumentCreation:
+
+    python bench_dark_mode.py --pages 20
+
+FPS khi cuộn một trang dài (ảnh, khối màu) với từng engine: none, filter (invert cả trang),
+theme (đổi màu theo computed style), native (force-dark của Chromium). Mỗi engine chạy trong
+một tiến trình riêng (native là cờ lúc khởi động); --software-gl giống AA_UseSoftwareOpenGL
+của các bản lite:
+
+    python bench_dark_mode.py --scroll --software-gl
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from bench_tab_scaling import build_fixture, start_fixture_server, summarize, HERE
+
+LOAD_TIMEOUT_S = 30
+SCROLL_MS = 3000
+SCROLL_STEP_PX = 40
+SCROLL_ENGINES = ("none", "filter", "theme", "native")
+CARDS = 200
+
+# Giống apply_dark_if_enabled cũ, thêm đo restyle + layout (offsetHeight ép layout ngay)
+LOADFINISHED_JS = """(function () {
+    var t0 = performance.now();
+    var style = document.createElement("style");
+    style.id = "dark_mode_css";
+    style.innerText = `html, body { background: #111 !important; filter: invert(1) hue-rotate(180deg) !important; }
+        img, video, canvas { filter: invert(1) hue-rotate(180deg) !important; }`;
+    document.head.appendChild(style);
+    document.body.offsetHeight;
+    var paint = performance.getEntriesByName("first-contentful-paint")[0];
+    return {cost: performance.now() - t0, white: paint ? t0 - paint.startTime : null};
+})()"""
+DOCUMENT_CREATION_JS = """(function () {
+    var t0 = performance.now();
+    document.body.offsetHeight;  // style đã đúng từ đầu => layout không còn việc
+    return {cost: window.__mbDarkCost + (performance.now() - t0), white: 0};
+})()"""
+
+# Cuộn SCROLL_STEP_PX mỗi frame, ghi khoảng cách giữa các requestAnimationFrame
+SCROLL_JS = """(function (duration, step) {
+    window.__scrollResult = null;
+    var gaps = [], last = performance.now(), end = last + duration;
+    function tick(now) {
+        gaps.push(now - last);
+        last = now;
+        window.scrollBy(0, step);
+        if (window.scrollY + window.innerHeight >= document.documentElement.scrollHeight) window.scrollTo(0, 0);
+        if (now < end) { requestAnimationFrame(tick); return; }
+        gaps.sort(function (a, b) { return a - b; });
+        window.__scrollResult = {fps: gaps.length * 1000 / duration, frames: gaps.length,
+            p50_ms: gaps[gaps.length >> 1], p95_ms: gaps[Math.floor(gaps.length * 0.95)],
+            max_ms: gaps[gaps.length - 1]};
+    }
+    requestAnimationFrame(tick);
+})(%d, %d)"""
+
+CARD_SVG = ("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='160' height='90'>"
+            "<rect width='160' height='90' fill='%23{color}'/><circle cx='80' cy='45' r='30' fill='%23fff'/></svg>")
+CARD_COLORS = ("f4a261", "2a9d8f", "e76f51", "264653", "e9c46a")
+
+
+def build_scroll_page(root):
+    cards = []
+    for i in range(CARDS):
+        color = CARD_COLORS[i % len(CARD_COLORS)]
+        cards.append(f'<div class="card c{i % 5}"><img src="{CARD_SVG.format(color=color)}">'
+                     f'<h3 class="title">Card {i}</h3><p class="text">{"Lorem ipsum dolor sit amet. " * 8}</p></div>')
+    css = ("body { background: #fff; color: #222; font-family: sans-serif; margin: 0 }"
+           ".card { margin: 12px; padding: 12px; border: 1px solid #ddd; background: #f7f7f7; border-radius: 6px }"
+           ".c1 { background: #eef6ff } .c2 { background: #fff4e5 } .title { color: #1a4d8f }")
+    with open(os.path.join(root, "scroll.html"), "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><style>{css}</style></head>"
+                f"<body>{''.join(cards)}</body></html>")
+
+
+def wait(ms):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def load(view, url):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    view.loadFinished.connect(loop.quit)
+    view.load(url)
+    QTimer.singleShot(LOAD_TIMEOUT_S * 1000, loop.quit)
+    loop.exec_()
+    view.loadFinished.disconnect(loop.quit)
+
+
+def run_js(view, js):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    result = [None]
+
+    def done(value):
+        result[0] = value
+        loop.quit()
+    view.page().runJavaScript(js, done)
+    QTimer.singleShot(LOAD_TIMEOUT_S * 1000, loop.quit)
+    loop.exec_()
+    return result[0]
+
+
+# --------------------------
+#  INJECTION COST
+# --------------------------
+def run_injection(mode, urls):
+    from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
+    from dark_mode import DarkMode
+
+    profile = QWebEngineProfile()  # off-the-record, không dùng cache của trình duyệt
+    if mode == "document_creation":
+        DarkMode(profile, enabled=True, engine="filter", parent=profile)
+    view = QWebEngineView()
+    view.setPage(QWebEnginePage(profile, view))
+    view.resize(1100, 700)
+    view.show()
+
+    costs, white = [], []
+    js = LOADFINISHED_JS if mode == "loadfinished" else DOCUMENT_CREATION_JS
+    for url in urls:
+        load(view, url)
+        result = run_js(view, js) or {}
+        if result.get("cost") is not None:
+            costs.append(result["cost"])
+        if result.get("white") is not None:
+            white.append(result["white"])
+    view.close()
+    return {"restyle_ms": summarize(costs), "white_ms": summarize(white)}
+
+
+# --------------------------
+#  SCROLL FPS (tiến trình con)
+# --------------------------
+def run_scroll(engine, url, software_gl):
+    from PyQt5.QtCore import Qt, QUrl
+    from PyQt5.QtWidgets import QApplication
+    if engine == "native":
+        from dark_mode import NATIVE_DARK_FLAG
+        from launch_profiles import FLAGS_ENV
+        os.environ[FLAGS_ENV] = " ".join(filter(None, [os.environ.get(FLAGS_ENV), NATIVE_DARK_FLAG]))
+    if software_gl:
+        QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+    app = QApplication(sys.argv[:1])
+    from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
+    from dark_mode import DarkMode
+
+    profile = QWebEngineProfile()
+    view = QWebEngineView()
+    dark = DarkMode(profile, enabled=True, engine=engine, parent=profile) if engine != "none" else None
+    view.setPage(dark.new_page(view) if dark else QWebEnginePage(profile, view))
+    view.resize(1100, 700)
+    view.show()
+
+    load(view, QUrl(url))
+    if dark is not None:
+        dark.page_loaded(view)  # theme: sinh CSS cho host như lần mở đầu
+        wait(500)
+    run_js(view, SCROLL_JS % (SCROLL_MS, SCROLL_STEP_PX))
+    result = None
+    for _ in range(LOAD_TIMEOUT_S * 5):
+        wait(200)
+        result = run_js(view, "window.__scrollResult")
+        if result:
+            break
+    view.close()
+    app.processEvents()
+    return dict(result or {"error": "no result"}, engine=engine,
+                theme_ms=round(dark.stats["theme_ms"], 2) if dark else None)
+
+
+def run_scroll_suite(base_url, software_gl):
+    results = []
+    for engine in SCROLL_ENGINES:
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        cmd = [sys.executable, os.path.join(HERE, "bench_dark_mode.py"), "--run-scroll", engine,
+               "--url", f"{base_url}/scroll.html"] + (["--software-gl"] if software_gl else [])
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            results.append({"engine": engine, "error": proc.stderr.strip()[-2000:]})
+        else:
+            results.append(json.loads(lines[-1]))
+        print(f"{engine}: done", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dark mode benchmark")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--scroll", action="store_true", help="đo FPS khi cuộn với từng engine")
+    parser.add_argument("--software-gl", action="store_true")
+    parser.add_argument("--run-scroll", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scroll:
+        print(json.dumps(run_scroll(args.run_scroll, args.url, args.software_gl)))
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        build_fixture(root, args.pages)
+        build_scroll_page(root)
+        server, base_url = start_fixture_server(root)
+        try:
+            if args.scroll:
+                report = {"software_gl": args.software_gl, "scroll": run_scroll_suite(base_url, args.software_gl)}
+            else:
+                from PyQt5.QtCore import QUrl
+                from PyQt5.QtWidgets import QApplication
+                app = QApplication(sys.argv[:1])
+                urls = [QUrl(f"{base_url}/page_{i}.html") for i in range(args.pages)]
+                report = {mode: run_injection(mode, urls) for mode in ("loadfinished", "document_creation")}
+                app.processEvents()
+        finally:
+            server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark cho HistoryStore: chi phí visit() trên thread GUI, tốc độ writer ghi batch
+và độ trễ truy vấn khi history.db có hàng triệu visit; độ trễ mỗi phím gõ của omnibox
+(cả khi trie đang dựng dở); thời gian mỗi lượt của job bảo trì (gộp / xoá visit cũ, incremental vacuum).
+
+    python bench_history.py --visits 1000000 --places 100000
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from history_store import HistoryStore
+from history_maintenance import HistoryMaintenance
+from omnibox import FrecencyTrie, OMNIBOX_PLACES
+from bench_bookmarks import make_urls, percentile
+
+QUERY_REPEAT = 50
+TYPED_URLS = ["site12.example.com/articles", "articles 5", "https://www.site3", "id"]
+
+
+def timed_ms(fn, repeat=QUERY_REPEAT):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return {"p50_ms": round(percentile(samples, 0.5), 3), "p95_ms": round(percentile(samples, 0.95), 3)}
+
+
+def bench_omnibox(history):
+    """Dựng trie từ top_places như Omnibox, đo thời gian gợi ý mỗi lần gõ"""
+    t = time.perf_counter()
+    trie = FrecencyTrie()
+    for place in history.top_places(OMNIBOX_PLACES):
+        trie.entry(place["url"], place["title"], place["host"]).history = place["frecency"]
+    load_s = time.perf_counter() - t
+    # Gõ phím khi trie chưa dựng xong: Omnibox trả lời bằng scan
+    partial = []
+    for text in TYPED_URLS:
+        for n in range(1, len(text) + 1):
+            t = time.perf_counter()
+            trie.scan(text[:n])
+            partial.append((time.perf_counter() - t) * 1000)
+    t = time.perf_counter()
+    trie.build()
+    build_s = time.perf_counter() - t
+
+    keystrokes = []
+    for text in TYPED_URLS:
+        for n in range(1, len(text) + 1):
+            t = time.perf_counter()
+            trie.complete(text[:n])
+            keystrokes.append((time.perf_counter() - t) * 1000)
+    return {
+        "entries": len(trie),
+        "load_s": round(load_s, 3),
+        "build_s": round(build_s, 3),
+        "keystroke_p50_ms": round(percentile(keystrokes, 0.5), 3),
+        "keystroke_max_ms": round(max(keystrokes), 3),
+        "partial_keystroke_max_ms": round(max(partial), 3),
+    }
+
+
+def bench_maintenance(history):
+    """Một lượt bảo trì đầy đủ, đo từng lát (mỗi lát = một transaction trên thread GUI)"""
+    job = HistoryMaintenance(history)
+    job.stats = {"aggregated": 0, "expired_days": 0, "expired_places": 0, "vacuumed_pages": 0}
+    slices = []
+    steps = job.run(time.time())
+    while True:
+        t = time.perf_counter()
+        if next(steps, StopIteration) is StopIteration:
+            break
+        slices.append((time.perf_counter() - t) * 1000)
+    return dict(job.stats, slices=len(slices), total_s=round(sum(slices) / 1000, 2),
+                slice_p50_ms=round(percentile(slices, 0.5), 3), slice_max_ms=round(max(slices), 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HistoryStore benchmark")
+    parser.add_argument("--visits", type=int, default=1000000)
+    parser.add_argument("--places", type=int, default=100000)
+    parser.add_argument("--domains", type=int, default=5000)
+    args = parser.parse_args()
+
+    urls = make_urls(args.places, args.domains)
+    rnd = random.Random(3)
+    start = time.time() - 365 * 24 * 3600
+    step = 365 * 24 * 3600 / args.visits
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = HistoryStore(os.path.join(tmp, "history.db"))
+        # visit() là phần chạy trên thread GUI mỗi lần chuyển trang
+        enqueue = []
+        t_all = time.perf_counter()
+        for i in range(args.visits):
+            # nửa là trang quen (mở lại nhiều lần), nửa rải đều
+            url = urls[int(rnd.expovariate(1 / 200)) % len(urls)] if i % 2 else rnd.choice(urls)
+            t = time.perf_counter()
+            history.visit(url, f"Page {i % 1000}", at=start + i * step)
+            enqueue.append((time.perf_counter() - t) * 1e6)
+        history.flush(timeout=None)
+        write_s = time.perf_counter() - t_all
+
+        sample = urls[:100]
+        now = time.time()
+        report = {
+            "visits": args.visits,
+            "places": history.conn.execute("SELECT COUNT(*) FROM places").fetchone()[0],
+            "visit_call_p50_us": round(percentile(enqueue, 0.5), 3),
+            "visit_call_p99_us": round(percentile(enqueue, 0.99), 3),
+            "write_visits_per_s": round(args.visits / write_s),
+            "recent": timed_ms(lambda: history.recent(200)),
+            "last_day": timed_ms(lambda: history.visits(now - 24 * 3600, now)),
+            "for_host": timed_ms(lambda: history.for_host(f"site{rnd.randrange(args.domains)}.example.com")),
+            "place": timed_ms(lambda: history.place(rnd.choice(sample))),
+            "visit_times": timed_ms(lambda: history.visit_times(rnd.choice(sample))),
+            "search": timed_ms(lambda: history.search("articles/12", limit=200)),
+            "db_mb": round(os.path.getsize(history.path) / 1e6, 1),
+            "omnibox": bench_omnibox(history),
+            "maintenance": bench_maintenance(history),
+        }
+        history.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""So sánh RSS và thời gian load giữa các launch mode (process model).
+
+    python bench_launch_modes.py --modes default,process-per-site,renderer-limit:2,low-end --tabs 1,10,50
+
+Dùng lại bench_tab_scaling (offscreen + fixture server), mỗi mode chạy riêng.
+"""
+import sys
+import json
+import argparse
+
+from bench_tab_scaling import run_suite, DEFAULT_VARIANT
+from launch_profiles import parse_mode
+
+DEFAULT_MODES = "default,process-per-site,single-process,renderer-limit:4,low-end"
+DEFAULT_TABS = "1,10,50"
+
+
+def compare(report_by_mode):
+    """Bảng so sánh gọn: mode -> tabs -> rss_mb, load p50/p95, renderers"""
+    table = {}
+    for mode, report in report_by_mode.items():
+        rows = {}
+        for r in report["results"]:
+            if "error" in r:
+                rows[str(r["tabs"])] = {"error": r["error"].splitlines()[-1] if r["error"] else "failed"}
+                continue
+            rows[str(r["tabs"])] = {
+                "rss_mb": r["rss_mb"],
+                "renderers": r["renderers"],
+                "load_p50_ms": r["load_ms"].get("p50"),
+                "load_p95_ms": r["load_ms"].get("p95"),
+                "all_loaded_ms": r["all_loaded_ms"],
+                "gui_latency_p95_ms": r["gui_latency_ms"].get("p95"),
+            }
+        table[mode] = rows
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Launch-mode memory/latency benchmark")
+    parser.add_argument("--variant", default=DEFAULT_VARIANT)
+    parser.add_argument("--modes", default=DEFAULT_MODES)
+    parser.add_argument("--tabs", default=DEFAULT_TABS)
+    parser.add_argument("--output", help="ghi JSON ra file thay vì stdout")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        parse_mode(mode)  # báo lỗi sớm trước khi chạy benchmark dài
+    counts = [int(n) for n in args.tabs.split(",") if n.strip()]
+
+    reports = {}
+    for mode in modes:
+        print(f"mode={mode}", file=sys.stderr)
+        reports[mode] = run_suite(args.variant, counts, ["--launch-mode", mode])
+
+    text = json.dumps({"variant": args.variant, "comparison": compare(reports), "runs": reports}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
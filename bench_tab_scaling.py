@@ -0,0 +1,246 @@
+"""Benchmark mở nhiều tab (offscreen) với một fixture server tĩnh.
+
+    python bench_tab_scaling.py --variant webBrowser7bookmark5sort1fix.py --tabs 1,10,50,100 --output tabs.json
+
+Mỗi số tab chạy trong một tiến trình riêng để RSS/renderer không cộng dồn.
+Kết quả là JSON: thời gian tới loadFinished, tổng RSS, số renderer, độ trễ GUI thread.
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import importlib.util
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_VARIANT = "webBrowser7bookmark5sort1fix.py"
+DEFAULT_TABS = "1,10,50,100"
+LOAD_TIMEOUT_S = 120
+SETTLE_MS = 1000
+HEARTBEAT_MS = 10
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Fixture {i}</title>
+<link rel="stylesheet" href="style.css"></head>
+<body><h1>Fixture page {i}</h1>
+{paragraphs}
+<script src="app.js"></script></body></html>
+"""
+STYLE_CSS = "body { font-family: sans-serif; margin: 2em; } p { line-height: 1.5; }\n"
+APP_JS = "document.title = document.title + ' (ready)';\n"
+
+
+# --------------------------
+#  FIXTURE SERVER
+# --------------------------
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def build_fixture(root, pages):
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    paragraphs = "\n".join(f"<p>{text}</p>" for _ in range(30))
+    for i in range(pages):
+        with open(os.path.join(root, f"page_{i}.html"), "w", encoding="utf-8") as f:
+            f.write(PAGE_TEMPLATE.format(i=i, paragraphs=paragraphs))
+    with open(os.path.join(root, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE_TEMPLATE.format(i="home", paragraphs=""))
+    with open(os.path.join(root, "style.css"), "w", encoding="utf-8") as f:
+        f.write(STYLE_CSS)
+    with open(os.path.join(root, "app.js"), "w", encoding="utf-8") as f:
+        f.write(APP_JS)
+
+
+def start_fixture_server(root):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --------------------------
+#  HELPERS
+# --------------------------
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def load_variant(path):
+    spec = importlib.util.spec_from_file_location("bench_variant", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --------------------------
+#  ONE RUN (tiến trình con)
+# --------------------------
+def run_one(variant, tabs, base_url, launch_mode=None):
+    if launch_mode:
+        from launch_profiles import apply_launch_mode
+        apply_launch_mode(launch_mode)
+    from PyQt5.QtCore import QTimer, QEventLoop
+    from PyQt5.QtWidgets import QApplication
+    from proc_stats import tree_rss, renderer_count
+
+    home = base_url + "/index.html"
+    # Config riêng trong thư mục tạm => không đụng config.json thật, không tải google.com
+    with open("config.json", "w", encoding="utf-8") as f:
+        json.dump({"home_page": home}, f)
+    with open("config_light.json", "w", encoding="utf-8") as f:
+        json.dump({}, f)
+
+    module = load_variant(variant)
+    for name in ("DEFAULT_HOME", "HOME_PAGE", "HOME"):
+        if hasattr(module, name):
+            setattr(module, name, home)
+
+    app = QApplication(sys.argv[:1])
+    browser = module.MiniBrowser()
+    browser.show()
+
+    # Độ trễ GUI thread: timer nhịp HEARTBEAT_MS, đo phần trễ so với lịch
+    lags = []
+    last = [time.perf_counter()]
+
+    def heartbeat():
+        now = time.perf_counter()
+        lags.append(max(0.0, (now - last[0]) * 1000 - HEARTBEAT_MS))
+        last[0] = now
+
+    beat = QTimer()
+    beat.setInterval(HEARTBEAT_MS)
+    beat.timeout.connect(heartbeat)
+    beat.start()
+
+    load_ms = []
+    failed = [0]
+    pending = [tabs]
+    loop = QEventLoop()
+
+    def finished(ok, started):
+        load_ms.append((time.perf_counter() - started) * 1000)
+        if not ok:
+            failed[0] += 1
+        pending[0] -= 1
+        if pending[0] == 0:
+            loop.quit()
+
+    def watch(web, started):
+        state = {"done": False}
+
+        def on_finished(ok):
+            if not state["done"]:
+                state["done"] = True
+                finished(ok, started)
+        web.loadFinished.connect(on_finished)
+
+    start = time.perf_counter()
+    for i in range(tabs):
+        t0 = time.perf_counter()
+        browser.add_tab(f"{base_url}/page_{i}.html")
+        watch(browser.tabs.widget(browser.tabs.count() - 1).web, t0)
+    QTimer.singleShot(LOAD_TIMEOUT_S * 1000, loop.quit)
+    loop.exec_()
+    all_loaded_ms = (time.perf_counter() - start) * 1000
+
+    settle = QEventLoop()
+    QTimer.singleShot(SETTLE_MS, settle.quit)
+    settle.exec_()
+    beat.stop()
+
+    pid = os.getpid()
+    result = {
+        "tabs": tabs,
+        "loaded": len(load_ms),
+        "failed": failed[0] + pending[0],
+        "load_ms": summarize(load_ms),
+        "all_loaded_ms": round(all_loaded_ms, 2),
+        "rss_mb": round(tree_rss(pid) / (1024 * 1024), 1),
+        "renderers": renderer_count(pid),
+        "gui_latency_ms": summarize(lags),
+    }
+    browser.close()
+    app.processEvents()
+    return result
+
+
+# --------------------------
+#  MAIN
+# --------------------------
+def run_suite(variant, counts, extra_args=()):
+    """Chạy mỗi số tab trong tiến trình con, trả về dict kết quả"""
+    variant = os.path.abspath(variant)
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        build_fixture(root, max(counts))
+        server, base_url = start_fixture_server(root)
+        try:
+            for n in counts:
+                with tempfile.TemporaryDirectory() as workdir:
+                    env = dict(os.environ, QT_QPA_PLATFORM="offscreen",
+                               PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])))
+                    cmd = [sys.executable, os.path.join(HERE, "bench_tab_scaling.py"),
+                           "--run-one", str(n), "--variant", variant, "--base-url", base_url]
+                    cmd.extend(extra_args)
+                    proc = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+                    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+                    if proc.returncode != 0 or not lines:
+                        results.append({"tabs": n, "error": proc.stderr.strip()[-2000:]})
+                    else:
+                        results.append(json.loads(lines[-1]))
+                    print(f"tabs={n}: done", file=sys.stderr)
+        finally:
+            server.shutdown()
+    return {
+        "variant": os.path.basename(variant),
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tab-scaling benchmark (offscreen)")
+    parser.add_argument("--variant", default=DEFAULT_VARIANT)
+    parser.add_argument("--tabs", default=DEFAULT_TABS, help="danh sách số tab, vd 1,10,50,100")
+    parser.add_argument("--output", help="ghi JSON ra file thay vì stdout")
+    parser.add_argument("--launch-mode", help="launch mode (xem launch_profiles.py)")
+    parser.add_argument("--run-one", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+        print(json.dumps(run_one(args.variant, args.run_one, args.base_url, args.launch_mode)))
+        return
+
+    counts = [int(n) for n in args.tabs.split(",") if n.strip()]
+    extra = ["--launch-mode", args.launch_mode] if args.launch_mode else []
+    report = run_suite(args.variant, counts, extra)
+    report["launch_mode"] = args.launch_mode or "default"
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
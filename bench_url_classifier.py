@@ -0,0 +1,56 @@
+"""Benchmark url_classifier: thời gian nạp PSL và chi phí mỗi phím gõ, trên các chuỗi gõ
+của tests/test_url_classifier.py (kiểm tra đúng / sai nằm ở test đó).
+
+    python bench_url_classifier.py
+"""
+import json
+import time
+import random
+import argparse
+
+import url_classifier
+from url_classifier import classify, public_suffixes
+from bench_bookmarks import percentile
+from tests.test_url_classifier import make_cases, SEED
+
+
+def bench_keystrokes(cases, psl, rnd, sample):
+    """Gõ từng ký tự của các chuỗi mẫu: classify() trên mọi tiền tố"""
+    samples = []
+    for text, _ in rnd.sample(cases, min(sample, len(cases))):
+        for n in range(1, len(text) + 1):
+            t = time.perf_counter()
+            classify(text[:n], psl=psl)
+            samples.append((time.perf_counter() - t) * 1e6)
+    return {"keystrokes": len(samples), "p50_us": round(percentile(samples, 0.5), 2),
+            "p99_us": round(percentile(samples, 0.99), 2), "max_us": round(max(samples), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL classifier benchmark")
+    parser.add_argument("--sample", type=int, default=2000, help="số chuỗi gõ từng phím")
+    args = parser.parse_args()
+    rnd = random.Random(SEED)
+
+    url_classifier._psl = None
+    t = time.perf_counter()
+    psl = public_suffixes()
+    load_ms = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+    public_suffixes()
+    cached_us = (time.perf_counter() - t) * 1e6
+
+    cases = make_cases(psl, rnd)
+    report = {
+        "rules": psl.rules,
+        "tlds": len(psl.root),
+        "load_ms": round(load_ms, 1),
+        "cached_lookup_us": round(cached_us, 2),
+        "cases": len(cases),
+        "keystroke": bench_keystrokes(cases, psl, rnd, args.sample),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import html
+import sqlite3
+import tempfile
+from html.parser import HTMLParser
+from itertools import islice
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+try:
+    import ijson  # parse JSON kiểu streaming (tuỳ chọn)
+except ImportError:
+    ijson = None
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 250           # số bookmark mỗi lần ghi vào store (một transaction)
+STEP_DELAY_MS = 0          # nhường event loop giữa các batch
+WEBKIT_EPOCH_OFFSET = 11644473600  # giây từ 1601-01-01 (Chrome) đến 1970-01-01
+
+FORMATS = ("netscape", "chrome", "firefox")
+
+
+def detect_format(path):
+    """netscape | chrome | firefox theo nội dung đầu file"""
+    with open(path, "rb") as f:
+        head = f.read(512)
+    if head.startswith(b"SQLite format 3"):
+        return "firefox"
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{"):
+        return "chrome"
+    return "netscape"
+
+
+# --------------------------
+#  READERS (generator: url, title, added_at)
+# --------------------------
+class _NetscapeParser(HTMLParser):
+    """Lấy <A HREF=... ADD_DATE=...>title</A>, bỏ qua cấu trúc thư mục"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self._link = None
+        self._title = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            attrs = dict(attrs)
+            if attrs.get("href"):
+                self._link = (attrs["href"], attrs.get("add_date"))
+                self._title = []
+
+    def handle_data(self, data):
+        if self._link:
+            self._title.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._link:
+            url, add_date = self._link
+            self.entries.append((url, "".join(self._title).strip(), _seconds(add_date)))
+            self._link = None
+
+
+def read_netscape(path):
+    parser = _NetscapeParser()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from parser.entries
+            parser.entries = []
+    parser.close()
+    yield from parser.entries
+
+
+def read_chrome(path):
+    """File Bookmarks (JSON) của Chrome/Chromium/Edge"""
+    if ijson is None:
+        # Không có ijson: phải đọc cả file (vẫn ghi vào store theo batch)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        roots = data.get("roots", {}) if isinstance(data, dict) else None
+        if not isinstance(roots, dict):
+            raise ValueError("Not a Chrome bookmarks file")
+        stack = [node for node in roots.values() if isinstance(node, dict)]
+        stack.reverse()
+        while stack:
+            node = stack.pop()
+            if node.get("type") == "url" and node.get("url"):
+                yield node["url"], node.get("name", ""), _webkit_seconds(node.get("date_added"))
+            else:
+                children = node.get("children", [])
+                if not isinstance(children, list):
+                    raise ValueError("Not a Chrome bookmarks file")
+                # Bỏ qua phần tử không phải object thay vì dừng cả lần nhập
+                stack.extend(child for child in reversed(children) if isinstance(child, dict))
+        return
+
+    stack = []
+    with open(path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if event == "start_map":
+                stack.append({})
+            elif event == "end_map":
+                node = stack.pop()
+                if node.get("type") == "url" and node.get("url"):
+                    yield node["url"], node.get("name", ""), _webkit_seconds(node.get("date_added"))
+            elif event in ("string", "number") and stack:
+                key = prefix.rsplit(".", 1)[-1]
+                if key in ("url", "name", "type", "date_added"):
+                    stack[-1][key] = value
+
+
+def read_firefox(path):
+    """places.sqlite của Firefox, mở read-only (Firefox đang chạy vẫn đọc được)"""
+    uri = "file:" + os.path.abspath(path) + "?mode=ro&immutable=1"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        cur = conn.execute(
+            "SELECT p.url, COALESCE(b.title, p.title, ''), b.dateAdded "
+            "FROM moz_bookmarks b JOIN moz_places p ON p.id = b.fk "
+            "WHERE b.type = 1 AND p.url NOT LIKE 'place:%' ORDER BY b.id")
+        while True:
+            rows = cur.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            for url, title, added in rows:
+                yield url, title, added / 1e6 if added else None
+    finally:
+        conn.close()
+
+
+READERS = {"netscape": read_netscape, "chrome": read_chrome, "firefox": read_firefox}
+
+
+def read_bookmarks(path, fmt=None):
+    return READERS[fmt or detect_format(path)](path)
+
+
+def _seconds(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _webkit_seconds(value):
+    """date_added của Chrome: micro giây tính từ 1601-01-01"""
+    try:
+        return int(value) / 1e6 - WEBKIT_EPOCH_OFFSET if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+# --------------------------
+#  WRITERS
+# --------------------------
+def _open_atomic(path):
+    """File tạm cùng thư mục; đóng xong thì os.replace (xem config_store.write_atomic)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".bookmarks-", suffix=".tmp", dir=directory)
+    return os.fdopen(fd, "w", encoding="utf-8"), tmp
+
+
+def _write_streaming(path, write):
+    """write(f) ghi lần lượt từng bookmark, trả về số bookmark đã ghi"""
+    f, tmp = _open_atomic(path)
+    try:
+        with f:
+            count = write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def write_netscape(bookmarks, path):
+    """Định dạng Firefox / Chrome / Safari đều import được"""
+    def write(f):
+        f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n"
+                '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+                "<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n")
+        count = 0
+        for bm in bookmarks:
+            added = int(bm.get("added_at") or time.time())
+            f.write(f'    <DT><A HREF="{html.escape(bm["url"])}" ADD_DATE="{added}">'
+                    f'{html.escape(bm.get("title") or bm["url"], quote=False)}</A>\n')
+            count += 1
+        f.write("</DL><p>\n")
+        return count
+    return _write_streaming(path, write)
+
+
+def write_chrome(bookmarks, path):
+    """File Bookmarks của Chrome: tất cả nằm trong Bookmarks bar"""
+    now = str(int((time.time() + WEBKIT_EPOCH_OFFSET) * 1e6))
+
+    def write(f):
+        f.write('{"roots": {"bookmark_bar": {"children": [')
+        count = 0
+        for bm in bookmarks:
+            added = bm.get("added_at") or time.time()
+            entry = {
+                "date_added": str(int((added + WEBKIT_EPOCH_OFFSET) * 1e6)),
+                "id": str(count + 4),
+                "name": bm.get("title") or bm["url"],
+                "type": "url",
+                "url": bm["url"],
+            }
+            f.write((",\n" if count else "\n") + json.dumps(entry, ensure_ascii=False))
+            count += 1
+        f.write('\n], "date_added": "%s", "id": "1", "name": "Bookmarks bar", "type": "folder"},\n' % now)
+        f.write(' "other": {"children": [], "date_added": "%s", "id": "2", "name": "Other bookmarks", "type": "folder"},\n' % now)
+        f.write(' "synced": {"children": [], "date_added": "%s", "id": "3", "name": "Mobile bookmarks", "type": "folder"}},\n' % now)
+        f.write(' "version": 1}\n')
+        return count
+    return _write_streaming(path, write)
+
+
+WRITERS = {"netscape": write_netscape, "chrome": write_chrome}
+
+
+def export_bookmarks(bookmarks, path, fmt=None):
+    """fmt mặc định theo phần mở rộng: .json => chrome, còn lại netscape HTML"""
+    fmt = fmt or ("chrome" if path.lower().endswith(".json") else "netscape")
+    return WRITERS[fmt](bookmarks, path)
+
+
+# --------------------------
+#  IMPORT JOB
+# --------------------------
+class BookmarkImporter(QObject):
+    """Đọc file theo batch trên event loop: mỗi lượt một batch vào store rồi nhường GUI.
+
+    Không giữ cả file trong RAM; bookmark trùng (URL chuẩn hoá) được gộp vào bản đã có.
+    """
+    progress = pyqtSignal(int, int)   # added, seen
+    finished = pyqtSignal(int, int)   # added, duplicates
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, path, fmt=None, batch_size=BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.added = 0
+        self.seen = 0
+        self._entries = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(STEP_DELAY_MS)
+        self._timer.timeout.connect(self.step)
+
+    def start(self):
+        try:
+            self._entries = read_bookmarks(self.path, self.fmt)
+        except (OSError, sqlite3.Error) as e:
+            self.failed.emit(str(e))
+            return
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        self._entries = None
+
+    def step(self):
+        if self._entries is None:
+            return
+        try:
+            batch = list(islice(self._entries, self.batch_size))
+            if batch:
+                self.added += self.store.add_many(batch)
+                self.seen += len(batch)
+        except (OSError, ValueError, sqlite3.Error, AttributeError, TypeError, KeyError) as e:
+            # File hỏng kiểu lạ (JSON sai cấu trúc...) => báo lỗi, không làm sập trình duyệt
+            self.cancel()
+            self.failed.emit(str(e))
+            return
+        if len(batch) < self.batch_size:
+            self._entries = None
+            self.finished.emit(self.added, self.seen - self.added)
+            return
+        self.progress.emit(self.added, self.seen)
+        self._timer.start()
@@ -0,0 +1,474 @@
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+
+FETCH_BATCH = 200
+HEADERS = ["Title", "URL"]
+
+# Frecency kiểu Firefox: lượt mở gần đây nặng hơn lượt mở lâu rồi
+FRECENCY_BUCKETS = ((4, 100), (14, 70), (31, 50), (90, 30))  # (số ngày, trọng số)
+FRECENCY_OLD_WEIGHT = 10
+DAY_S = 24 * 3600
+
+
+def collate(text):
+    """Khoá so sánh chuỗi: bỏ dấu (kể cả đ), không phân biệt hoa thường"""
+    text = unicodedata.normalize("NFKD", text or "").replace("đ", "d").replace("Đ", "D")
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def host_key(host):
+    return collate(host[4:] if host.startswith("www.") else host)
+
+
+def frecency(bm, now):
+    last = bm.get("last_visit") or bm.get("added_at") or now
+    age_days = (now - last) / DAY_S
+    weight = next((w for days, w in FRECENCY_BUCKETS if age_days < days), FRECENCY_OLD_WEIGHT)
+    return (bm.get("visits", 0) + 1) * weight
+
+
+# mode -> (nhãn, khoá của bookmark, nhóm domain xếp theo bookmark tốt nhất?)
+# Khoá nhỏ hơn đứng trước; url ở cuối để khoá luôn duy nhất (bisect tìm đúng dòng)
+# domain: nhóm theo tên host; title: nhóm theo title đầu tiên (A-Z) của nhóm
+SORT_MODES = {
+    "domain": ("Domain", lambda bm, now: (collate(bm["title"]), bm["url"]), False),
+    "title": ("Title", lambda bm, now: (collate(bm["title"]), bm["url"]), True),
+    "added": ("Date added", lambda bm, now: (-bm.get("added_at", 0), bm["url"]), True),
+    "visits": ("Visit count", lambda bm, now: (-bm.get("visits", 0), collate(bm["title"]), bm["url"]), True),
+    "frecency": ("Frecency", lambda bm, now: (-frecency(bm, now), bm["url"]), True),
+}
+DEFAULT_SORT = "domain"
+
+
+class _Group:
+    """Một nhóm domain; items chỉ được tạo khi view mở nhóm (fetchMore)"""
+
+    def __init__(self, host):
+        self.host = host
+        self.items = None   # bookmark đã sắp xếp
+        self.keys = None    # khoá tương ứng (song song với items, dùng cho bisect)
+        self.key_of = None  # url -> khoá lúc chèn (visits đổi sau đó không làm lệch bisect)
+        self.fetched = 0
+
+    def unload(self):
+        self.items = self.keys = self.key_of = None
+        self.fetched = 0
+
+
+# --------------------------
+#  BOOKMARK TREE MODEL
+# --------------------------
+class BookmarkTreeModel(QAbstractItemModel):
+    """Model 2 cấp (domain -> bookmark) trên BookmarkStore, nạp dần bằng fetchMore.
+
+    Model sống cùng MiniBrowser nên mở lại dialog không phải dựng lại cây;
+    thêm / xoá bookmark chỉ chèn / xoá đúng một dòng (vị trí tìm bằng bisect
+    trên khoá sắp xếp tính sẵn). Đổi chế độ sắp xếp chỉ đổi thứ tự tại chỗ
+    (layoutChanged), giữ nguyên nhóm đang mở và dòng đang chọn.
+    """
+
+    def __init__(self, store, icons=None, parent=None, sort_mode=DEFAULT_SORT):
+        super().__init__(parent)
+        self.store = store
+        self.icons = icons  # FaviconCache (tuỳ chọn)
+        self.sort_mode = sort_mode if sort_mode in SORT_MODES else DEFAULT_SORT
+        self._groups = {host: _Group(host) for host in store.domains()}
+        self._domains = []
+        self._domain_keys = []
+        self._rows = {}
+        self._fetched = 0
+        self._busy = False  # đang thay đổi cấu trúc (xem fetchMore)
+        self._sort_domains(time.time())
+        store.listeners.append(self.on_store_changed)
+        if icons:
+            icons.iconReady.connect(self.on_icon_ready)
+
+    # --------------------------
+    #  SORT KEYS
+    # --------------------------
+    def item_key(self, bm, now=None):
+        return SORT_MODES[self.sort_mode][1](bm, now or time.time())
+
+    def group_key(self, host, now=None):
+        """Domain theo tên, hoặc theo bookmark tốt nhất của nhóm (date / visits / frecency)"""
+        if not SORT_MODES[self.sort_mode][2]:
+            return (host_key(host), host)
+        now = now or time.time()
+        return (min(self.item_key(bm, now) for bm in self.store.domain(host)), host)
+
+    def _sort_domains(self, now):
+        keyed = sorted((self.group_key(host, now), host) for host in self._groups)
+        self._domain_keys = [key for key, _ in keyed]
+        self._domains = [host for _, host in keyed]
+        self._rows = {host: row for row, host in enumerate(self._domains)}
+
+    def _load_group(self, group, now=None):
+        now = now or time.time()
+        keyed = sorted((self.item_key(bm, now), bm) for bm in self.store.domain(group.host))
+        group.keys = [key for key, _ in keyed]
+        group.items = [bm for _, bm in keyed]
+        group.key_of = {bm["url"]: key for key, bm in keyed}
+
+    def set_sort_mode(self, mode):
+        """Sắp xếp lại tại chỗ: layoutChanged + cập nhật persistent index"""
+        if mode not in SORT_MODES or mode == self.sort_mode:
+            return
+        self._busy = True
+        try:
+            self._resort(mode)
+        finally:
+            self._busy = False
+
+    def _resort(self, mode):
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        anchors = []
+        for index in old:
+            group = index.internalPointer()
+            if group is None:
+                anchors.append((self._domains[index.row()], None, index.column()))
+            else:
+                anchors.append((group.host, group.items[index.row()], index.column()))
+
+        self.sort_mode = mode
+        now = time.time()
+        self._sort_domains(now)
+        for host, group in self._groups.items():
+            if group.items is None:
+                continue
+            if self._rows[host] >= self._fetched:
+                group.unload()  # nhóm rơi ra ngoài phần đã hiển thị
+            else:
+                self._load_group(group, now)
+
+        new = []
+        for host, bm, column in anchors:
+            row = self._rows.get(host)
+            if row is None or row >= self._fetched:
+                new.append(QModelIndex())
+            elif bm is None:
+                new.append(self.createIndex(row, column, None))
+            else:
+                group = self._groups[host]
+                pos = self._find(group, bm)
+                new.append(self.createIndex(pos, column, group)
+                           if pos is not None and pos < group.fetched else QModelIndex())
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+
+    def _find(self, group, bm):
+        key = group.key_of.get(bm["url"])
+        if key is None:
+            return None
+        pos = bisect_left(group.keys, key)
+        if pos < len(group.items) and group.items[pos] is bm:
+            return pos
+        return None
+
+    # --------------------------
+    #  STRUCTURE
+    # --------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        if not parent.isValid():
+            if 0 <= row < self._fetched:
+                return self.createIndex(row, column, None)
+            return QModelIndex()
+        if parent.internalPointer() is not None:
+            return QModelIndex()
+        group = self._groups[self._domains[parent.row()]]
+        if 0 <= row < group.fetched:
+            return self.createIndex(row, column, group)
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        group = index.internalPointer()
+        if group is None:
+            return QModelIndex()
+        return self.createIndex(self._rows[group.host], 0, None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._fetched
+        if parent.column() > 0 or parent.internalPointer() is not None:
+            return 0
+        return self._groups[self._domains[parent.row()]].fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._domains)
+        return parent.internalPointer() is None and parent.column() == 0
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return self._fetched < len(self._domains)
+        if parent.internalPointer() is not None:
+            return False
+        group = self._groups[self._domains[parent.row()]]
+        return group.items is None or group.fetched < len(group.items)
+
+    def fetchMore(self, parent):
+        # begin*Rows có thể kích hoạt view / tester gọi lại fetchMore giữa chừng
+        # một thay đổi khác => bỏ qua lượt lồng nhau
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            self._fetch_more(parent)
+        finally:
+            self._busy = False
+
+    def _fetch_more(self, parent):
+        if not parent.isValid():
+            count = min(FETCH_BATCH, len(self._domains) - self._fetched)
+            if count <= 0:
+                return
+            self.beginInsertRows(parent, self._fetched, self._fetched + count - 1)
+            self._fetched += count
+            self.endInsertRows()
+            return
+        group = self._groups[self._domains[parent.row()]]
+        if group.items is None:
+            self._load_group(group)
+        count = min(FETCH_BATCH, len(group.items) - group.fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent, group.fetched, group.fetched + count - 1)
+        group.fetched += count
+        self.endInsertRows()
+
+    # --------------------------
+    #  DATA
+    # --------------------------
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group = index.internalPointer()
+        if role == Qt.DecorationRole:
+            if index.column() == 0 and self.icons:
+                return self.icons.icon(group.host if group else self._domains[index.row()])
+            return None
+        if group is None:
+            if role == Qt.DisplayRole and index.column() == 0:
+                return self._domains[index.row()]
+            return None
+        bm = group.items[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return bm["title"] if index.column() == 0 else bm["url"]
+        if role == Qt.UserRole:
+            return bm["url"]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def bookmark(self, index):
+        """Bookmark dict của một dòng con, None nếu là dòng domain"""
+        if not index.isValid() or index.internalPointer() is None:
+            return None
+        return index.internalPointer().items[index.row()]
+
+    def group_index(self, host):
+        row = self._rows.get(host)
+        if row is None or row >= self._fetched:
+            return QModelIndex()
+        return self.createIndex(row, 0, None)
+
+    def on_icon_ready(self, host):
+        group_index = self.group_index(host)
+        if not group_index.isValid():
+            return
+        self.dataChanged.emit(group_index, group_index, [Qt.DecorationRole])
+        fetched = self._groups[host].fetched
+        if fetched:
+            first = self.index(0, 0, group_index)
+            last = self.index(fetched - 1, 0, group_index)
+            self.dataChanged.emit(first, last, [Qt.DecorationRole])
+
+    # --------------------------
+    #  INCREMENTAL UPDATES
+    # --------------------------
+    def on_store_changed(self, event, bm):
+        # "visited" không đổi chỗ ngay (tránh dòng nhảy khi đang xem); lần sắp xếp sau sẽ tính lại
+        if event not in ("added", "removed"):
+            return
+        self._busy = True
+        try:
+            if event == "added":
+                self.on_added(bm)
+            else:
+                self.on_removed(bm)
+        finally:
+            self._busy = False
+
+    def on_added(self, bm):
+        host = bm["host"]
+        group = self._groups.get(host)
+        if group is None:
+            group = self._groups[host] = _Group(host)
+            self._insert_group(host, self.group_key(host))
+            return
+        key = self.item_key(bm)
+        if SORT_MODES[self.sort_mode][2] and (key, host) < self._domain_keys[self._rows[host]]:
+            self._move_group(host, (key, host))
+        if group.items is None:
+            return  # nhóm chưa mở, lần fetchMore sau sẽ đọc từ store
+        pos = bisect_right(group.keys, key)
+        visible = self._rows[host] < self._fetched and (pos < group.fetched or group.fetched == len(group.items))
+        if visible:
+            self.beginInsertRows(self.group_index(host), pos, pos)
+        group.items.insert(pos, bm)
+        group.keys.insert(pos, key)
+        group.key_of[bm["url"]] = key
+        if visible:
+            group.fetched += 1
+            self.endInsertRows()
+
+    def on_removed(self, bm):
+        host = bm["host"]
+        group = self._groups.get(host)
+        if group is None:
+            return
+        if group.items is not None:
+            pos = self._find(group, bm)
+            if pos is not None:
+                shown = pos < group.fetched and self._rows[host] < self._fetched
+                if shown:
+                    self.beginRemoveRows(self.group_index(host), pos, pos)
+                del group.items[pos]
+                del group.keys[pos]
+                del group.key_of[bm["url"]]
+                if shown:
+                    group.fetched -= 1
+                    self.endRemoveRows()
+        if not self.store.domain_size(host):
+            self.remove_group(host)
+        elif SORT_MODES[self.sort_mode][2]:
+            self._move_group(host, self.group_key(host))
+
+    def _insert_group(self, host, key):
+        row = bisect_right(self._domain_keys, key)
+        visible = row < self._fetched or self._fetched == len(self._domains)
+        if visible:
+            self.beginInsertRows(QModelIndex(), row, row)
+        self._domains.insert(row, host)
+        self._domain_keys.insert(row, key)
+        self._renumber(row)
+        if visible:
+            self._fetched += 1
+            self.endInsertRows()
+
+    def _move_group(self, host, key):
+        """Nhóm đổi khoá (bookmark tốt nhất đổi) => chuyển tới vị trí mới"""
+        old = self._rows[host]
+        if self._domain_keys[old] == key:
+            return
+        others = self._domain_keys[:old] + self._domain_keys[old + 1:]
+        new = bisect_right(others, key)
+        if new == old:
+            self._domain_keys[old] = key
+            return
+        old_shown = old < self._fetched
+        new_shown = new < self._fetched if old_shown else (new < self._fetched or self._fetched >= len(others))
+        if old_shown and new_shown:
+            self.beginMoveRows(QModelIndex(), old, old, QModelIndex(), new if new < old else new + 1)
+        elif old_shown:
+            self.beginRemoveRows(QModelIndex(), old, old)
+        elif new_shown:
+            self.beginInsertRows(QModelIndex(), new, new)
+        del self._domains[old]
+        self._domains.insert(new, host)
+        others.insert(new, key)
+        self._domain_keys = others
+        self._renumber(min(old, new))
+        if old_shown and new_shown:
+            self.endMoveRows()
+        elif old_shown:
+            self._fetched -= 1
+            self._groups[host].unload()
+            self.endRemoveRows()
+        elif new_shown:
+            self._fetched += 1
+            self.endInsertRows()
+
+    def _renumber(self, start):
+        for r in range(start, len(self._domains)):
+            self._rows[self._domains[r]] = r
+
+    def remove_group(self, host):
+        row = self._rows.pop(host)
+        shown = row < self._fetched
+        if shown:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self._domains[row]
+        del self._domain_keys[row]
+        del self._groups[host]
+        self._renumber(row)
+        if shown:
+            self._fetched -= 1
+            self.endRemoveRows()
+
+
+# --------------------------
+#  SEARCH RESULTS MODEL
+# --------------------------
+class BookmarkResultsModel(QAbstractItemModel):
+    """Danh sách phẳng kết quả tìm kiếm (đã xếp hạng), thay cho cây khi có từ khoá"""
+
+    def __init__(self, icons=None, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self.icons = icons
+        if icons:
+            icons.iconReady.connect(self.on_icon_ready)
+
+    def set_results(self, items):
+        self.beginResetModel()
+        self._items = list(items)
+        self.endResetModel()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self._items):
+            return QModelIndex()
+        return self.createIndex(row, column, None)
+
+    def parent(self, index):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        bm = self._items[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return bm["title"] if index.column() == 0 else bm["url"]
+        if role == Qt.DecorationRole and index.column() == 0 and self.icons:
+            return self.icons.icon(bm["host"])
+        if role == Qt.UserRole:
+            return bm["url"]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def bookmark(self, index):
+        return self._items[index.row()] if index.isValid() else None
+
+    def on_icon_ready(self, host):
+        if self._items:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._items) - 1, 0), [Qt.DecorationRole])
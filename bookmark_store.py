@@ -0,0 +1,161 @@
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def normalize_url(url):
+    """Khoá so trùng: scheme/host chữ thường, bỏ port mặc định, '/' cuối, tham số tracking"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    netloc = host
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    query = parts.query
+    if query:
+        params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                  if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+        query = urlencode(params)
+    return urlunsplit((scheme, netloc, path, query, parts.fragment))
+
+
+def url_domain(url):
+    try:
+        return (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:
+        return ""
+
+
+# --------------------------
+#  BOOKMARK STORE
+# --------------------------
+class BookmarkStore:
+    """Bookmarks theo khoá URL chuẩn hoá, index theo domain và thứ tự thêm.
+
+    Thêm / xoá / tra cứu đều O(1) (dict). Bookmark là dict như trước:
+    {"title", "url", "added_at", "visits", "last_visit", "host"}. Nếu có db (ProfileDB) thì ghi từng dòng.
+    """
+
+    def __init__(self, db=None):
+        self.db = db
+        self._by_key = {}     # key -> bookmark, giữ thứ tự thêm
+        self._by_domain = {}  # host -> {key: bookmark}, giữ thứ tự thêm
+        self.listeners = []   # fn(event, bookmark), event = "added" | "removed" | "visited"
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(list(self._by_key.values()))
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._by_key
+
+    def get(self, url):
+        return self._by_key.get(normalize_url(url))
+
+    def domains(self):
+        return list(self._by_domain)
+
+    def domain(self, host):
+        return list(self._by_domain.get(host, {}).values())
+
+    def domain_size(self, host):
+        return len(self._by_domain.get(host, ()))
+
+    # --------------------------
+    #  CHANGES
+    # --------------------------
+    def load(self, bookmarks):
+        """Nạp từ DB/JSON, bỏ qua bản trùng (không ghi lại DB)"""
+        for bm in bookmarks:
+            if bm.get("url"):
+                self._insert(dict(bm), notify=False)
+
+    def add(self, url, title, added_at=None, persist=True):
+        """Trả về bookmark mới, None nếu đã có"""
+        key = normalize_url(url)
+        if key in self._by_key:
+            return None
+        bm = {"title": title or url, "url": url, "added_at": added_at or time.time()}
+        if persist and self.db and not self.db.add_bookmark(url, bm["title"], bm["added_at"]):
+            return None
+        return self._insert(bm, key=key)
+
+    def add_many(self, entries):
+        """Thêm một batch (url, title, added_at) trong một transaction; trả về số bookmark mới.
+
+        Chỉ chèn vào bộ nhớ (và báo listener) sau khi commit: rollback thì store, tree
+        model, search index không còn bookmark ma.
+        """
+        new = {}
+        with self.db.transaction() if self.db else nullcontext():
+            for url, title, added_at in entries:
+                key = normalize_url(url)
+                if key in self._by_key or key in new:
+                    continue
+                bm = {"title": title or url, "url": url, "added_at": added_at or time.time()}
+                if self.db and not self.db.add_bookmark(url, bm["title"], bm["added_at"]):
+                    continue
+                new[key] = bm
+        return sum(1 for key, bm in new.items() if self._insert(bm, key=key))
+
+    def delete(self, url, persist=True):
+        """Xoá theo URL (so khớp đã chuẩn hoá), trả về bookmark đã xoá hoặc None"""
+        key = normalize_url(url)
+        bm = self._by_key.pop(key, None)
+        if bm is None:
+            return None
+        group = self._by_domain.get(bm["host"])
+        if group is not None:
+            group.pop(key, None)
+            if not group:
+                del self._by_domain[bm["host"]]
+        if persist and self.db:
+            self.db.delete_bookmark(bm["url"])
+        self._notify("removed", bm)
+        return bm
+
+    def visit(self, url, persist=True):
+        """Tăng số lần mở nếu url là bookmark (dùng để xếp hạng kết quả tìm kiếm)"""
+        bm = self.get(url)
+        if bm is None:
+            return None
+        bm["visits"] = bm.get("visits", 0) + 1
+        bm["last_visit"] = time.time()
+        if persist and self.db:
+            self.db.visit_bookmark(bm["url"])
+        self._notify("visited", bm)
+        return bm
+
+    def _insert(self, bm, key=None, notify=True):
+        key = key or normalize_url(bm["url"])
+        if key in self._by_key:
+            return None
+        bm["host"] = url_domain(bm["url"])
+        bm.setdefault("added_at", time.time())
+        bm.setdefault("visits", 0)
+        self._by_key[key] = bm
+        self._by_domain.setdefault(bm["host"], {})[key] = bm
+        if notify:
+            self._notify("added", bm)
+        return bm
+
+    def _notify(self, event, bm):
+        for fn in self.listeners:
+            fn(event, bm)
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import tempfile
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from settings_sync import FileLock, FileChangeWatcher
+
+SAVE_DELAY_MS = 500     # gom các thay đổi liên tiếp (giữ Ctrl+=, ...) thành một lần ghi
+MAX_SAVE_DELAY_S = 3.0  # thay đổi liên tục cũng không giữ quá lâu trong RAM
+
+
+def _snapshot(data):
+    """key -> JSON text, để so sánh từng field"""
+    return {k: json.dumps(v, sort_keys=True) for k, v in data.items()}
+
+
+def write_atomic(path, text):
+    """Ghi vào file tạm cùng thư mục rồi os.replace => không bao giờ để lại file cụt"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        binary = isinstance(text, bytes)
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# --------------------------
+#  CONFIG STORE
+# --------------------------
+class ConfigStore(QObject):
+    """Giữ config trong RAM, ghi ra đĩa theo debounce timer (write-behind).
+
+    Nhiều instance dùng chung file: khi ghi thì khoá file và chỉ ghi đè các key
+    instance này đã sửa; thay đổi của instance khác được nhận qua QFileSystemWatcher
+    và báo bằng signal changed(keys).
+    """
+    changed = pyqtSignal(list)
+
+    def __init__(self, path, delay_ms=SAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.data = self.load()
+        self._synced = _snapshot(self.data)  # trạng thái trên đĩa lần đồng bộ gần nhất
+        self._dirty_since = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+        self.watcher = FileChangeWatcher([path], parent=self)
+        self.watcher.changed.connect(self.reload_remote)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            print(f"⚠ Cannot read {self.path}: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.schedule_save()
+
+    def update(self, values):
+        self.data.update(values)
+        self.schedule_save()
+
+    def schedule_save(self):
+        """Đánh dấu dirty; ghi sau SAVE_DELAY_MS không có thay đổi mới"""
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        if now - self._dirty_since >= MAX_SAVE_DELAY_S:
+            self.flush()
+        else:
+            self._timer.start()
+
+    def dirty_keys(self, current=None):
+        """Các key đã sửa trong RAM so với lần đồng bộ gần nhất"""
+        current = _snapshot(self.data) if current is None else current
+        return {k for k in set(current) | set(self._synced) if current.get(k) != self._synced.get(k)}
+
+    def flush(self):
+        """Ghi ngay nếu có thay đổi (gọi trong closeEvent)"""
+        self._timer.stop()
+        self._dirty_since = None
+        ours = _snapshot(self.data)
+        dirty = self.dirty_keys(ours)
+        if not dirty:
+            return
+        try:
+            with FileLock(self.path):
+                disk = self.load()
+                # Merge từng field: key mình sửa thì lấy của mình, còn lại giữ trên đĩa
+                for key in dirty:
+                    if key in self.data:
+                        disk[key] = self.data[key]
+                    else:
+                        disk.pop(key, None)
+                write_atomic(self.path, json.dumps(disk, indent=4))
+            self.apply_remote(disk, skip=dirty)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠ Cannot save {self.path}: {e}")
+
+    def reload_remote(self):
+        """File bị instance khác ghi => chỉ áp dụng các key thay đổi"""
+        try:
+            with FileLock(self.path):
+                disk = self.load()
+        except OSError as e:
+            print(f"⚠ Cannot reload {self.path}: {e}")
+            return
+        self.apply_remote(disk, skip=self.dirty_keys())
+
+    def apply_remote(self, disk, skip=()):
+        remote = _snapshot(disk)
+        changed = []
+        for key in set(remote) | set(self._synced):
+            if remote.get(key) == self._synced.get(key):
+                continue
+            if key not in skip:
+                if key in disk:
+                    self.data[key] = disk[key]
+                else:
+                    self.data.pop(key, None)
+                changed.append(key)
+        self._synced = remote
+        if changed:
+            self.changed.emit(sorted(changed))
@@ -0,0 +1,388 @@
+import os
+import json
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import QObject
+from PyQt5.QtWebEngineWidgets import QWebEngineScript, QWebEnginePage
+
+from config_store import write_atomic
+from launch_profiles import FLAGS_ENV
+from dark_policy import DarkSitePolicy, DETECT_JS, is_native_dark
+
+SCRIPT_NAME = "minibrowser-dark-mode"
+HOST_SCRIPT_NAME = "minibrowser-dark-theme"
+SKIP_SCRIPT_NAME = "minibrowser-dark-skip"
+DARK_CLASS = "mb-dark"
+STYLE_ID = "dark_mode_css"
+THEME_STYLE_ID = "dark_theme_css"
+
+# theme : đổi màu từng phần tử theo computed style (sinh một lần, cache theo host) — không filter
+# native: force-dark của Chromium (cờ lúc khởi động, đổi phải khởi động lại)
+# filter: invert(1) cả trang như cũ — mỗi frame đi qua một filter layer toàn trang
+DARK_ENGINES = ("theme", "native", "filter")
+DEFAULT_ENGINE = "theme"
+NATIVE_DARK_FLAG = "--blink-settings=forceDarkModeEnabled=true"
+
+THEME_MAX_ELEMENTS = 3000  # số phần tử đọc computed style khi sinh theme
+THEME_MAX_RULES = 600
+THEME_HOSTS = 300          # LRU theme theo host
+THEME_MAX_AGE_S = 7 * 24 * 3600
+
+FILTER_CSS = """
+html.mb-dark, html.mb-dark body {
+    background: #111 !important;
+    filter: invert(1) hue-rotate(180deg) !important;
+}
+html.mb-dark img, html.mb-dark video, html.mb-dark canvas, html.mb-dark iframe {
+    filter: invert(1) hue-rotate(180deg) !important;
+}
+"""
+# Nền tối có ngay từ lần vẽ đầu; màu riêng của site do theme của host (nếu đã có) ghi đè
+THEME_BASE_CSS = """
+html.mb-dark {
+    color-scheme: dark !important;
+    background-color: #181a1b !important;
+    color: #e8e6e3 !important;
+}
+html.mb-dark body { background-color: #181a1b; color: #e8e6e3; }
+html.mb-dark input, html.mb-dark textarea, html.mb-dark select, html.mb-dark button {
+    background-color: #202324; color: #e8e6e3; border-color: #3e4446;
+}
+html.mb-dark a { color: #6cb4ff; }
+"""
+
+# Chạy lúc DocumentCreation (trước khi parse HTML) trong mọi frame: gắn <style> một lần
+# (lần đầu bật), trạng thái chỉ là class trên <html> => bật / tắt không cần chèn lại CSS.
+# window.__mbDark(on) đổi class rồi chuyển tiếp cho iframe con qua postMessage
+# (runJavaScript của Qt chỉ chạy ở main frame). Với engine filter, iframe được đảo
+# ngược lại ở frame cha vì nội dung của nó tự tô tối bằng script riêng.
+DARK_JS = """(function (on, css) {
+    if (window.__mbDark) return;
+    var t0 = performance.now();
+    if (window.__mbDarkOff) on = false;  // site bị tắt dark mode (script của page có thể chạy trước)
+    function attach() {
+        var root = document.documentElement;
+        if (!root) return false;
+        root.classList.toggle("%(cls)s", on);
+        if (on && !document.getElementById("%(id)s")) {
+            var style = document.createElement("style");
+            style.id = "%(id)s";
+            style.textContent = css;
+            root.appendChild(style);  // chưa có <head> lúc này; <style> trong <html> vẫn có hiệu lực
+        }
+        return true;
+    }
+    window.__mbDark = function (value) {
+        on = value;
+        attach();
+        for (var i = 0; i < window.frames.length; i++) {
+            window.frames[i].postMessage({__mbDark: value}, "*");
+        }
+    };
+    window.addEventListener("message", function (e) {
+        if (e.source === window.parent && e.data && typeof e.data.__mbDark === "boolean") {
+            window.__mbDark(e.data.__mbDark);
+        }
+    });
+    if (!attach()) {
+        new MutationObserver(function (_, observer) {
+            if (attach()) observer.disconnect();
+        }).observe(document, {childList: true});
+    }
+    window.__mbDarkCost = performance.now() - t0;
+})(%(on)s, %(css)s);"""
+
+# Theme đã cache của host: script riêng của page, chỉ main frame
+THEME_STYLE_JS = """(function (css) {
+    function attach() {
+        var root = document.documentElement;
+        if (!root) return false;
+        var style = document.getElementById("%(id)s") || document.createElement("style");
+        style.id = "%(id)s";
+        style.textContent = css;
+        if (!style.parentNode) root.appendChild(style);
+        return true;
+    }
+    if (!attach()) {
+        new MutationObserver(function (_, observer) {
+            if (attach()) observer.disconnect();
+        }).observe(document, {childList: true});
+    }
+})(%(css)s);"""
+
+# Sinh theme: đọc computed style của tối đa maxElements phần tử, đổi độ sáng (giữ hue)
+# của nền / chữ / viền, ghi thành rule theo tag.class hoặc #id. Ảnh, video giữ nguyên.
+THEME_JS = """(function (maxElements, maxRules) {
+    var t0 = performance.now();
+    function parse(c) {
+        var m = /rgba?\\(([\\d.]+),\\s*([\\d.]+),\\s*([\\d.]+)(?:,\\s*([\\d.]+))?\\)/.exec(c);
+        if (!m) return null;
+        var a = m[4] === undefined ? 1 : +m[4];
+        return a === 0 ? null : [+m[1] / 255, +m[2] / 255, +m[3] / 255, a];
+    }
+    function shift(c, background) {
+        var p = parse(c);
+        if (!p) return null;
+        var max = Math.max(p[0], p[1], p[2]), min = Math.min(p[0], p[1], p[2]);
+        var l = (max + min) / 2, d = max - min, h = 0, s = 0;
+        if (d) {
+            s = d / (1 - Math.abs(2 * l - 1));
+            h = max === p[0] ? ((p[1] - p[2]) / d) %% 6 : max === p[1] ? (p[2] - p[0]) / d + 2 : (p[0] - p[1]) / d + 4;
+            h = (h * 60 + 360) %% 360;
+        }
+        if (background) {
+            if (l < 0.35) return null;  // đã tối
+            l = 0.1 + (1 - l) * 0.25;
+        } else {
+            if (l > 0.6) return null;   // đã sáng
+            l = 0.9 - l * 0.4;
+        }
+        return "hsla(" + h.toFixed(0) + "," + (s * 85).toFixed(0) + "%%," + (l * 100).toFixed(0) + "%%," + p[3] + ")";
+    }
+    function selector(el) {
+        if (el.id) return "#" + CSS.escape(el.id);
+        var cls = Array.prototype.slice.call(el.classList, 0, 2);
+        if (!cls.length) return null;
+        return el.localName + cls.map(function (c) { return "." + CSS.escape(c); }).join("");
+    }
+    var seen = {}, rules = [], n = 0;
+    var root = document.body || document.documentElement;
+    var walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+    for (var el = root; el && n < maxElements && rules.length < maxRules; el = walker.nextNode()) {
+        n++;
+        var sel = selector(el);
+        if (!sel || seen[sel]) continue;
+        seen[sel] = true;
+        var cs = getComputedStyle(el), decl = [];
+        var bg = shift(cs.backgroundColor, true);
+        if (bg) decl.push("background-color:" + bg);
+        if (cs.backgroundImage.indexOf("gradient") >= 0) decl.push("background-image:none");
+        var fg = shift(cs.color, false);
+        if (fg) decl.push("color:" + fg);
+        var border = cs.borderTopStyle !== "none" && shift(cs.borderTopColor, true);
+        if (border) decl.push("border-color:" + border);
+        if (decl.length) rules.push("html.%(cls)s " + sel + "{" + decl.join(" !important;") + " !important}");
+    }
+    var css = rules.join("\\n");
+    var style = document.getElementById("%(id)s") || document.createElement("style");
+    style.id = "%(id)s";
+    style.textContent = css;
+    if (!style.parentNode) document.documentElement.appendChild(style);
+    return {css: css, elements: n, ms: performance.now() - t0};
+})(%(max_elements)d, %(max_rules)d)"""
+
+# Site không tô tối (policy never / auto mà site đã tối): script của page, cả iframe
+SKIP_JS = "window.__mbDarkOff = true; window.__mbDark && window.__mbDark(false);"
+
+COST_JS = "window.__mbDarkCost === undefined ? null : window.__mbDarkCost"
+
+
+def native_dark_active():
+    return NATIVE_DARK_FLAG in os.environ.get(FLAGS_ENV, "").split()
+
+
+def native_dark_flags(enabled, engine):
+    """Cờ Chromium cho engine native — truyền vào apply_launch_mode trước khi tạo QApplication"""
+    return [NATIVE_DARK_FLAG] if enabled and engine == "native" else []
+
+
+def _script(name, source, subframes):
+    script = QWebEngineScript()
+    script.setName(name)
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    script.setRunsOnSubFrames(subframes)
+    script.setSourceCode(source)
+    return script
+
+
+# --------------------------
+#  PAGE
+# --------------------------
+class DarkPage(QWebEnginePage):
+    """Page gắn theme của host ngay trước mỗi lần điều hướng main frame"""
+
+    def __init__(self, dark, parent=None):
+        super().__init__(dark.profile, parent)
+        self.dark = dark
+
+    def acceptNavigationRequest(self, url, nav_type, is_main_frame):
+        if is_main_frame:
+            self.dark.prepare(self, url)
+        return super().acceptNavigationRequest(url, nav_type, is_main_frame)
+
+
+# --------------------------
+#  DARK MODE
+# --------------------------
+class DarkMode(QObject):
+    """Dark mode bằng QWebEngineScript của profile (DocumentCreation, MainWorld, cả iframe).
+
+    Trang được tô tối ngay từ lần vẽ đầu thay vì trắng rồi restyle sau loadFinished.
+    Bật / tắt: đổi nguồn script cho trang mở sau đó, còn trang đang mở chỉ đổi class.
+    Engine theme sinh CSS cho từng host ở lần mở đầu (THEME_JS), lưu vào cache_path
+    và chèn lúc tạo document ở các lần sau. Site nào được tô tối do DarkSitePolicy quyết định.
+    """
+
+    def __init__(self, profile, enabled=False, engine=DEFAULT_ENGINE, cache_path=None, sites=None, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.enabled = bool(enabled)
+        self.engine = engine if engine in DARK_ENGINES else DEFAULT_ENGINE
+        self.native = native_dark_active()  # cờ đã đặt lúc khởi động, không tắt được khi đang chạy
+        self.cache_path = cache_path
+        self.sites = sites if sites is not None else DarkSitePolicy()
+        self.themes = OrderedDict()  # host -> {"css", "at"}
+        self.script = None
+        self.stale = set()  # tab nền chưa nhận trạng thái mới, áp dụng khi được mở lại
+        self.stats = {"pages": 0, "inject_ms": 0.0, "themes": 0, "theme_ms": 0.0}
+        self.load_themes()
+        self.install()
+
+    def active_engine(self):
+        """Engine đang chạy: chọn native sau khi khởi động thì tạm dùng theme tới lần sau"""
+        if self.native:
+            return "native"
+        return "theme" if self.engine == "native" else self.engine
+
+    def install(self):
+        if self.script is not None:
+            self.profile.scripts().remove(self.script)
+        engine = self.active_engine()
+        css = FILTER_CSS if engine == "filter" else THEME_BASE_CSS
+        on = self.enabled and engine != "native"
+        self.script = _script(SCRIPT_NAME, DARK_JS % {"cls": DARK_CLASS, "id": STYLE_ID,
+                                                      "on": "true" if on else "false",
+                                                      "css": json.dumps(css)}, True)
+        self.profile.scripts().insert(self.script)
+
+    def set_enabled(self, enabled):
+        """Trang mở sau đó nhận trạng thái mới từ script; trang đang mở: gọi apply()"""
+        self.enabled = bool(enabled)
+        self.install()
+
+    def set_engine(self, engine):
+        """Trang đang mở giữ CSS cũ tới khi tải lại; native cần khởi động lại"""
+        if engine in DARK_ENGINES and engine != self.engine:
+            self.engine = engine
+            self.install()
+
+    def needs_restart(self):
+        return self.native != (self.enabled and self.engine == "native")
+
+    def apply(self, web):
+        on = self.enabled and self.active_engine() != "native" and self.sites.wants_dark(web.url().host())
+        web.page().runJavaScript(f"window.__mbDark && window.__mbDark({'true' if on else 'false'})")
+
+    def apply_visible(self, webs, current):
+        """Chỉ tab đang xem được áp dụng ngay; tab nền đánh dấu chờ => không restyle hàng loạt"""
+        for web in webs:
+            if web is current:
+                self.stale.discard(web)
+                self.apply(web)
+            else:
+                self.stale.add(web)
+
+    def apply_if_stale(self, web):
+        """Gọi khi tab được mở lại (currentChanged) hoặc hết bị freeze"""
+        if web in self.stale:
+            self.stale.discard(web)
+            self.apply(web)
+
+    def forget(self, web):
+        self.stale.discard(web)
+
+    def new_page(self, parent=None):
+        return DarkPage(self, parent)
+
+    # --------------------------
+    #  THEME CACHE (theo host)
+    # --------------------------
+    def theme(self, host):
+        entry = self.themes.get(host)
+        if entry is None or time.time() - entry["at"] > THEME_MAX_AGE_S:
+            return None
+        self.themes.move_to_end(host)
+        return entry["css"]
+
+    def prepare(self, page, url):
+        """Trước khi main frame điều hướng: thay script của host cũ bằng của host mới"""
+        scripts = page.scripts()
+        for name in (HOST_SCRIPT_NAME, SKIP_SCRIPT_NAME):
+            old = scripts.findScript(name)
+            if not old.isNull():
+                scripts.remove(old)
+        if not self.sites.wants_dark(url.host()):
+            scripts.insert(_script(SKIP_SCRIPT_NAME, SKIP_JS, True))
+            return
+        css = self.theme(url.host()) if self.active_engine() == "theme" else None
+        if css:
+            scripts.insert(_script(HOST_SCRIPT_NAME,
+                                   THEME_STYLE_JS % {"id": THEME_STYLE_ID, "css": json.dumps(css)}, False))
+
+    def page_loaded(self, web):
+        """Sau loadFinished: đo chi phí script; host auto chưa biết thì phát hiện giao diện tối
+        của site, host chưa có theme thì sinh một lần"""
+        if not self.enabled:
+            return
+        web.page().runJavaScript(COST_JS, self.on_cost)
+        host = web.url().host()
+        if not host or self.active_engine() == "native":
+            return  # force-dark là cờ của cả process, không tắt theo site được
+        if self.sites.needs_detection(host):
+            js = DETECT_JS % (json.dumps(DARK_CLASS), json.dumps(STYLE_ID))
+            web.page().runJavaScript(js, lambda result, web=web, host=host: self.on_detect(web, host, result))
+        else:
+            self.generate_theme(web, host)
+
+    def on_detect(self, web, host, result):
+        if result is None:
+            return
+        self.sites.remember(host, is_native_dark(result))
+        if self.sites.wants_dark(host):
+            self.generate_theme(web, host)
+        else:
+            self.apply(web)  # site đã tối: bỏ class (trang này), lần sau không chèn
+
+    def generate_theme(self, web, host):
+        if self.active_engine() == "theme" and self.sites.wants_dark(host) and self.theme(host) is None:
+            js = THEME_JS % {"cls": DARK_CLASS, "id": THEME_STYLE_ID,
+                             "max_elements": THEME_MAX_ELEMENTS, "max_rules": THEME_MAX_RULES}
+            web.page().runJavaScript(js, lambda result, host=host: self.on_theme(host, result))
+
+    def on_theme(self, host, result):
+        if not result:
+            return
+        self.themes[host] = {"css": result["css"], "at": time.time()}
+        self.themes.move_to_end(host)
+        while len(self.themes) > THEME_HOSTS:
+            self.themes.popitem(last=False)
+        self.stats["themes"] += 1
+        self.stats["theme_ms"] += result["ms"]
+
+    def load_themes(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.themes = OrderedDict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠ Dark theme cache unreadable, starting empty: {e}")
+
+    def save_themes(self):
+        if self.cache_path:
+            write_atomic(self.cache_path, json.dumps(self.themes))
+
+    # --------------------------
+    #  COST
+    # --------------------------
+    def on_cost(self, ms):
+        if ms is None:
+            return
+        self.stats["pages"] += 1
+        self.stats["inject_ms"] += ms
+
+    def cost_per_page(self):
+        return self.stats["inject_ms"] / self.stats["pages"] if self.stats["pages"] else None
@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+
+from url_classifier import public_suffixes, is_ip
+
+# auto  : bật dark mode trừ khi site đã có giao diện tối (phát hiện một lần, cache theo host)
+# always: luôn bật, kể cả site đã tối
+# never : không bao giờ bật
+AUTO, ALWAYS, NEVER = "auto", "always", "never"
+POLICIES = (AUTO, ALWAYS, NEVER)
+# Trước đây là SKIP_DARK_MODE (các trang nặng bỏ dark mode)
+DEFAULT_SITES = {"youtube.com": NEVER, "twitter.com": NEVER, "facebook.com": NEVER}
+
+DARK_LUMINANCE = 0.3            # nền có độ sáng tương đối dưới ngưỡng này coi là tối
+DETECT_HOSTS = 500              # LRU kết quả phát hiện theo host
+DETECT_MAX_AGE_S = 7 * 24 * 3600  # site đổi giao diện => phát hiện lại sau một tuần
+
+# Đọc màu nền gốc của trang (tạm bỏ class / <style> dark mode của trình duyệt), có rule
+# @media (prefers-color-scheme: dark) hay <meta name=color-scheme content=dark> không
+DETECT_JS = """(function (cls, styleId) {
+    var root = document.documentElement;
+    if (!root || !document.body) return null;
+    var had = !!cls && root.classList.contains(cls), style = styleId && document.getElementById(styleId);
+    var sheet = style && style.sheet, sheetOff = sheet && sheet.disabled;
+    if (had) root.classList.remove(cls);
+    if (sheet) sheet.disabled = true;
+    function luminance(c) {
+        var m = /rgba?\\(([\\d.]+),\\s*([\\d.]+),\\s*([\\d.]+)(?:,\\s*([\\d.]+))?\\)/.exec(c);
+        if (!m || (m[4] !== undefined && +m[4] < 0.5)) return null;
+        return (0.2126 * m[1] + 0.7152 * m[2] + 0.0722 * m[3]) / 255;
+    }
+    var bg = luminance(getComputedStyle(document.body).backgroundColor);
+    if (bg === null) bg = luminance(getComputedStyle(root).backgroundColor);
+    if (had) root.classList.add(cls);
+    if (sheet) sheet.disabled = sheetOff;
+
+    var scheme = !!document.querySelector('link[media*="prefers-color-scheme"]'), budget = 5000;
+    function scan(rules) {
+        for (var i = 0; i < rules.length && !scheme && budget-- > 0; i++) {
+            var rule = rules[i];
+            if (rule.media && /prefers-color-scheme:\\s*dark/.test(rule.media.mediaText)) scheme = true;
+            else if (rule.cssRules) scan(rule.cssRules);
+        }
+    }
+    for (var i = 0; i < document.styleSheets.length && !scheme; i++) {
+        var s = document.styleSheets[i];
+        if (style && s.ownerNode === style) continue;
+        try { scan(s.cssRules); } catch (e) {}  // stylesheet khác origin: không đọc được rule
+    }
+    var meta = document.querySelector('meta[name="color-scheme"]');
+    return {background: bg, scheme: scheme,
+            prefers_dark: matchMedia("(prefers-color-scheme: dark)").matches,
+            dark_only: !!meta && /^\\s*(only\\s+)?dark\\s*$/.test(meta.content)};
+})(%s, %s)"""
+
+
+def site_of(host):
+    """Khoá để lưu policy cho host: tên miền đăng ký được ("m.youtube.com" => "youtube.com")"""
+    host = host.lower().rstrip(".")
+    if not host or is_ip(host):
+        return host
+    return public_suffixes().registrable_domain(host) or host
+
+
+def is_native_dark(result):
+    """Kết quả DETECT_JS => site đang hiển thị giao diện tối của chính nó"""
+    if not result:
+        return False
+    bg = result.get("background")
+    if bg is not None:
+        return bg < DARK_LUMINANCE
+    # Không đặt màu nền => canvas mặc định, chỉ tối khi site khai báo color-scheme dark
+    return bool(result.get("dark_only") or (result.get("scheme") and result.get("prefers_dark")))
+
+
+# --------------------------
+#  SITE POLICY
+# --------------------------
+class DarkSitePolicy:
+    """Policy dark mode theo site (always / never / auto) và cache phát hiện giao diện tối.
+
+    Tra theo hậu tố host: policy của "youtube.com" áp dụng cho "m.youtube.com";
+    policy gần host nhất thắng. Không có policy => auto.
+    """
+
+    def __init__(self, sites=None, detected=None):
+        self.sites = dict(DEFAULT_SITES if sites is None else sites)
+        self.detected = OrderedDict(detected or {})  # host -> {"dark": bool, "at": time}
+        self.dirty = False
+
+    def policy(self, host):
+        host = host.lower().rstrip(".")
+        if is_ip(host):
+            return self.sites.get(host, AUTO)
+        labels = host.split(".")
+        for i in range(len(labels)):
+            mode = self.sites.get(".".join(labels[i:]))
+            if mode is not None:
+                return mode
+        return AUTO
+
+    def set_policy(self, site, mode):
+        if mode == AUTO:
+            self.sites.pop(site, None)
+        elif mode in POLICIES:
+            self.sites[site] = mode
+
+    def native_dark(self, host):
+        """True / False theo lần phát hiện gần nhất, None nếu chưa biết (hoặc đã cũ)"""
+        entry = self.detected.get(host)
+        if entry is None or time.time() - entry["at"] > DETECT_MAX_AGE_S:
+            return None
+        self.detected.move_to_end(host)
+        return entry["dark"]
+
+    def remember(self, host, dark):
+        self.detected[host] = {"dark": bool(dark), "at": time.time()}
+        self.detected.move_to_end(host)
+        while len(self.detected) > DETECT_HOSTS:
+            self.detected.popitem(last=False)
+        self.dirty = True
+
+    def needs_detection(self, host):
+        return bool(host) and self.policy(host) == AUTO and self.native_dark(host) is None
+
+    def wants_dark(self, host):
+        """Có tô tối host này không (chưa phát hiện => có, tắt lại nếu hoá ra site đã tối)"""
+        mode = self.policy(host) if host else AUTO
+        if mode != AUTO:
+            return mode == ALWAYS
+        return not (host and self.native_dark(host))
@@ -0,0 +1,151 @@
+import os
+import hashlib
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+
+from config_store import write_atomic
+
+ICON_SIZE = 32
+LRU_SIZE = 2048          # số QIcon giữ trong RAM
+DECODE_BATCH = 64        # số file mỗi job decode
+DECODE_DELAY_MS = 0      # gom các yêu cầu trong cùng một lượt event loop
+
+
+# --------------------------
+#  DECODE JOB (thread pool)
+# --------------------------
+class _DecodeJob(QRunnable):
+    """Đọc + decode PNG ngoài thread GUI. QImage dùng được ở mọi thread; QPixmap/QIcon thì không"""
+
+    def __init__(self, cache, items):
+        super().__init__()
+        self.cache = cache
+        self.items = items  # [(host, path)]
+
+    def run(self):
+        results = []
+        for host, path in self.items:
+            image = QImage()
+            if not image.load(path):
+                image = None
+            results.append((host, image))
+        self.cache.decoded.emit(results)
+
+
+# --------------------------
+#  FAVICON CACHE
+# --------------------------
+class FaviconCache(QObject):
+    """Favicon theo host, lưu file PNG đặt tên theo hash nội dung (nhiều host dùng chung icon
+    thì chỉ một file). Bảng host -> hash nằm trong ProfileDB.
+
+    icon(host) trả về ngay từ LRU; nếu chưa có thì trả QIcon rỗng, decode trên QThreadPool
+    rồi báo iconReady(host) để view vẽ lại. Không bao giờ tải icon qua mạng.
+    """
+    iconReady = pyqtSignal(str)
+    decoded = pyqtSignal(list)
+
+    def __init__(self, db, directory, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._hashes = db.favicons()        # host -> hash
+        self._icons = OrderedDict()         # host -> QIcon (LRU)
+        self._queued = OrderedDict()        # host chờ decode
+        self._decoding = set()
+        self.empty = QIcon()
+        self.pool = QThreadPool.globalInstance()
+        self.decoded.connect(self.on_decoded)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DECODE_DELAY_MS)
+        self._timer.timeout.connect(self.flush_queue)
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest + ".png")
+
+    def has(self, host):
+        return host in self._hashes
+
+    # --------------------------
+    #  LOOKUP
+    # --------------------------
+    def icon(self, host):
+        icon = self._icons.get(host)
+        if icon is not None:
+            self._icons.move_to_end(host)
+            return icon
+        if host in self._hashes and host not in self._decoding:
+            self._queued[host] = None
+            self._timer.start()
+        return self.empty
+
+    def flush_queue(self):
+        """Chia các host đang chờ thành job DECODE_BATCH file"""
+        items = [(host, self.path(self._hashes[host])) for host in self._queued if host in self._hashes]
+        self._decoding.update(self._queued)
+        self._queued.clear()
+        for i in range(0, len(items), DECODE_BATCH):
+            self.pool.start(_DecodeJob(self, items[i:i + DECODE_BATCH]))
+
+    def on_decoded(self, results):
+        for host, image in results:
+            self._decoding.discard(host)
+            if image is None or image.isNull():
+                self._hashes.pop(host, None)  # file mất / hỏng => coi như chưa có
+                continue
+            self.remember(host, QIcon(QPixmap.fromImage(image)))
+            self.iconReady.emit(host)
+
+    def remember(self, host, icon):
+        self._icons[host] = icon
+        self._icons.move_to_end(host)
+        while len(self._icons) > LRU_SIZE:
+            self._icons.popitem(last=False)
+
+    # --------------------------
+    #  STORE (từ QWebEngineView.iconChanged)
+    # --------------------------
+    def store(self, host, icon):
+        if not host or icon.isNull():
+            return
+        pixmap = icon.pixmap(ICON_SIZE, ICON_SIZE)
+        if pixmap.isNull():
+            return
+        data = QByteArray()
+        buf = QBuffer(data)
+        buf.open(QIODevice.WriteOnly)
+        pixmap.save(buf, "PNG")
+        buf.close()
+        png = bytes(data)
+        digest = hashlib.sha1(png).hexdigest()
+
+        self.remember(host, icon)
+        if self._hashes.get(host) == digest:
+            return
+        path = self.path(digest)
+        try:
+            if not os.path.exists(path):
+                write_atomic(path, png)
+        except OSError as e:
+            print(f"⚠ Cannot save favicon {host}: {e}")
+            return
+        self._hashes[host] = digest
+        self.db.set_favicon(host, digest)
+        self.iconReady.emit(host)
+
+    def prune(self):
+        """Xoá file không còn host nào trỏ tới (icon cũ của host đã đổi favicon).
+
+        Đọc lại bảng favicons: instance khác dùng chung profile có thể vừa ghi file mới.
+        """
+        used = set(self._hashes.values()) | set(self.db.favicons().values())
+        for name in os.listdir(self.directory):
+            if name.endswith(".png") and name[:-4] not in used:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,160 @@
+import time
+import sqlite3
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+DAY_S = 24 * 3600
+AGGREGATE_AFTER_DAYS = 90   # visit cũ hơn => gộp thành số lượt theo ngày (daily_visits)
+RETENTION_DAYS = 365        # cũ hơn nữa => xoá hẳn (cả trang không còn lượt mở nào)
+SLICE_ROWS = 500            # số dòng mỗi transaction (~10 ms)
+VACUUM_PAGES = 256          # số trang trả lại cho hệ điều hành mỗi lượt
+STEP_BUDGET_MS = 15         # thời gian tối đa mỗi lượt event loop
+START_DELAY_MS = 60000      # chạy sau khi khởi động 1 phút
+IDLE_RETRY_MS = 5000        # đang tải trang => thử lại sau
+RUN_EVERY_S = DAY_S
+
+
+# --------------------------
+#  HISTORY MAINTENANCE
+# --------------------------
+class HistoryMaintenance(QObject):
+    """Dọn history.db mỗi ngày một lần, chia thành các lượt ngắn trên event loop.
+
+    Mỗi lượt chạy các transaction nhỏ (SLICE_ROWS dòng) tới khi hết STEP_BUDGET_MS
+    rồi nhường GUI; trình duyệt đang tải trang thì tạm dừng. Các bước:
+    gộp visit cũ vào daily_visits, xoá dữ liệu quá RETENTION_DAYS, incremental
+    vacuum, rồi PRAGMA optimize để cập nhật thống kê index.
+    """
+    finished = pyqtSignal(dict)
+
+    def __init__(self, history, is_idle=None, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.conn = history.conn
+        self.is_idle = is_idle
+        self.stats = {}
+        self._steps = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.step)
+
+    def schedule(self, delay=START_DELAY_MS):
+        if not self._timer.isActive():
+            self._timer.start(delay)
+
+    def due(self, now=None):
+        last = float(self.history.get_meta("last_maintenance", 0))
+        return (now or time.time()) - last >= RUN_EVERY_S
+
+    # --------------------------
+    #  TIME SLICES
+    # --------------------------
+    def step(self):
+        if self._steps is None:
+            if not self.due():
+                self.schedule(RUN_EVERY_S * 1000)
+                return
+            self.stats = {"aggregated": 0, "expired_days": 0, "expired_places": 0, "vacuumed_pages": 0}
+            self._steps = self.run(time.time())
+        if self.is_idle and not self.is_idle():
+            self.schedule(IDLE_RETRY_MS)
+            return
+        deadline = time.perf_counter() + STEP_BUDGET_MS / 1000
+        try:
+            while time.perf_counter() < deadline:
+                next(self._steps)
+        except StopIteration:
+            self._steps = None
+            self.finished.emit(self.stats)
+            self.schedule(RUN_EVERY_S * 1000)
+            return
+        except sqlite3.Error as e:
+            print(f"⚠ History maintenance failed: {e}")
+            self._steps = None
+            self.schedule(IDLE_RETRY_MS * 12)
+            return
+        self._timer.start(0)
+
+    def run_now(self):
+        """Chạy hết một lượt bảo trì (dòng lệnh / benchmark), trả về stats"""
+        self.stats = {"aggregated": 0, "expired_days": 0, "expired_places": 0, "vacuumed_pages": 0}
+        for _ in self.run(time.time()):
+            pass
+        return self.stats
+
+    def run(self, now):
+        """Generator: mỗi next() là một transaction nhỏ"""
+        yield from self.aggregate(now - AGGREGATE_AFTER_DAYS * DAY_S)
+        yield from self.expire(now - RETENTION_DAYS * DAY_S)
+        incremental = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        if incremental:
+            yield from self.incremental_vacuum()
+        self.conn.execute("PRAGMA analysis_limit=400")
+        self.conn.execute("PRAGMA optimize")
+        self.history.set_meta("last_maintenance", now)
+        if not incremental:
+            # history.db tạo trước schema 3: chuyển sang INCREMENTAL bằng một lần VACUUM,
+            # chạy trên writer thread (GUI vẫn đọc được nhờ WAL)
+            self.history.vacuum()
+
+    def _transaction(self, *statements):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = [self.conn.execute(sql, params).rowcount for sql, params in statements]
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return counts
+
+    # --------------------------
+    #  STEPS
+    # --------------------------
+    def aggregate(self, cutoff):
+        """visit trước cutoff => (place, ngày, số lượt), theo thứ tự thời gian, mỗi lần SLICE_ROWS dòng"""
+        while True:
+            row = self.conn.execute(
+                "SELECT visited_at FROM visits WHERE visited_at < ? ORDER BY visited_at LIMIT 1 OFFSET ?",
+                (cutoff, SLICE_ROWS - 1)).fetchone()
+            # Mốc của lát này: dòng thứ SLICE_ROWS (<=, cùng tập cho cả INSERT và DELETE)
+            where, params = ("visited_at <= ?", (row[0],)) if row else ("visited_at < ?", (cutoff,))
+            _, deleted = self._transaction(
+                ("INSERT INTO daily_visits(place_id, day, count) "
+                 f"SELECT place_id, CAST(visited_at / {DAY_S} AS INTEGER), COUNT(*) "
+                 f"FROM visits INDEXED BY idx_visits_time WHERE {where} GROUP BY 1, 2 "
+                 "ON CONFLICT(place_id, day) DO UPDATE SET count = count + excluded.count", params),
+                (f"DELETE FROM visits WHERE {where}", params))
+            self.stats["aggregated"] += deleted
+            yield
+            if row is None:
+                return
+
+    def expire(self, cutoff):
+        day = int(cutoff // DAY_S)
+        while True:
+            deleted, = self._transaction(
+                ("DELETE FROM daily_visits WHERE (place_id, day) IN "
+                 "(SELECT place_id, day FROM daily_visits WHERE day < ? LIMIT ?)", (day, SLICE_ROWS)))
+            self.stats["expired_days"] += deleted
+            yield
+            if deleted < SLICE_ROWS:
+                break
+        # last_visit < cutoff: mọi visit của trang đã được gộp rồi bị xoá ở trên
+        while True:
+            deleted, = self._transaction(
+                ("DELETE FROM places WHERE id IN "
+                 "(SELECT id FROM places WHERE last_visit < ? ORDER BY last_visit LIMIT ?)",
+                 (cutoff, SLICE_ROWS)))
+            self.stats["expired_places"] += deleted
+            yield
+            if deleted < SLICE_ROWS:
+                break
+
+    def incremental_vacuum(self):
+        while True:
+            free = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                return
+            # executescript: sqlite3_exec chạy pragma tới hết (execute chỉ step một lần = một trang)
+            self.conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+            self.stats["vacuumed_pages"] += min(free, VACUUM_PAGES)
+            yield
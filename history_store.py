@@ -0,0 +1,288 @@
+import math
+import time
+import queue
+import sqlite3
+import threading
+from PyQt5.QtCore import QThread
+
+from profile_db import url_host
+
+SCHEMA_VERSION = 3
+FLUSH_INTERVAL_S = 2.0   # gom visit trong tối đa 2 giây rồi ghi một transaction
+FLUSH_BATCH = 500        # hoặc khi đủ 500 thao tác
+FLUSH_WAIT_S = 5.0       # flush() chờ writer tối đa
+SKIP_SCHEMES = ("about:", "data:", "blob:", "chrome:", "qrc:", "view-source:", "javascript:")
+
+# Frecency = tổng các lượt mở, mỗi lượt giảm một nửa sau FRECENCY_HALF_LIFE_DAYS.
+# Lưu dạng log và quy về mốc FRECENCY_EPOCH: thêm lượt mở chỉ là log_add, và thứ tự
+# giữa các trang không đổi theo thời gian (mọi điểm cùng giảm một hệ số) => không cần tính lại.
+FRECENCY_HALF_LIFE_DAYS = 30
+FRECENCY_EPOCH = 1577836800  # 2020-01-01
+FRECENCY_RATE = math.log(2) / (FRECENCY_HALF_LIFE_DAYS * 24 * 3600)
+
+# places: mỗi URL một dòng (tra theo url / host); visits: mỗi lượt mở một dòng (tra theo thời gian);
+# daily_visits: visit cũ được gộp thành số lượt mỗi ngày (xem history_maintenance)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id          INTEGER PRIMARY KEY,
+    url         TEXT NOT NULL UNIQUE,
+    title       TEXT,
+    host        TEXT NOT NULL,
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    last_visit  REAL NOT NULL,
+    frecency    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_places_host ON places(host, last_visit);
+CREATE INDEX IF NOT EXISTS idx_places_last_visit ON places(last_visit);
+CREATE TABLE IF NOT EXISTS visits (
+    id         INTEGER PRIMARY KEY,
+    place_id   INTEGER NOT NULL,
+    visited_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_visits_place ON visits(place_id, visited_at);
+CREATE INDEX IF NOT EXISTS idx_visits_time ON visits(visited_at);
+CREATE TABLE IF NOT EXISTS daily_visits (
+    place_id INTEGER NOT NULL,
+    day      INTEGER NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (place_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_daily_visits_day ON daily_visits(day);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+UPSERT_PLACE = (
+    "INSERT INTO places(url, title, host, visit_count, last_visit, frecency) VALUES (?, ?, ?, 1, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET visit_count = visit_count + 1, "
+    "last_visit = MAX(last_visit, excluded.last_visit), title = COALESCE(excluded.title, title), "
+    "frecency = log_add(frecency, excluded.frecency)")
+INSERT_VISIT = "INSERT INTO visits(place_id, visited_at) SELECT id, ? FROM places WHERE url = ?"
+PLACE_COLUMNS = "url, COALESCE(title, url) AS title, host, visit_count, last_visit, frecency"
+
+
+def visit_score(at):
+    """Điểm (log) của một lượt mở lúc at"""
+    return FRECENCY_RATE * (at - FRECENCY_EPOCH)
+
+
+def log_add(a, b):
+    """log(e^a + e^b), None / -inf = chưa có lượt mở nào"""
+    a = -math.inf if a is None else a
+    b = -math.inf if b is None else b
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+def connect(path):
+    conn = sqlite3.connect(path, isolation_level=None, timeout=10, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # chỉ có hiệu lực khi tạo file mới (trước WAL)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.create_function("log_add", 2, log_add, deterministic=True)
+    return conn
+
+
+# --------------------------
+#  WRITER THREAD
+# --------------------------
+class _HistoryWriter(QThread):
+    """Connection riêng, chỉ thread này ghi. Thao tác: ("visit", url, title, host, at),
+    ("title", url, title), ("vacuum",), ("flush", Event), ("stop",)"""
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.queue = queue.Queue()
+
+    def run(self):
+        conn = connect(self.path)
+        try:
+            stop = False
+            while not stop:
+                batch = [self.queue.get()]  # ngủ tới khi có visit, không poll
+                deadline = time.monotonic() + FLUSH_INTERVAL_S
+                while len(batch) < FLUSH_BATCH and batch[-1][0] in ("visit", "title"):
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                stop = self.write(conn, batch)
+        finally:
+            conn.close()
+
+    def write(self, conn, batch):
+        """Một transaction cho cả batch; trả về True nếu gặp lệnh stop"""
+        visits = [op[1:] + (visit_score(op[4]),) for op in batch if op[0] == "visit"]
+        titles = [(op[2], op[1]) for op in batch if op[0] == "title"]
+        if visits or titles:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(UPSERT_PLACE, visits)
+                    conn.executemany(INSERT_VISIT, [(at, url) for url, _, _, at, _ in visits])
+                    # title đến sau visit (titleChanged) => áp dụng sau cùng
+                    conn.executemany("UPDATE places SET title = ? WHERE url = ?", titles)
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                print(f"⚠ Cannot write history ({len(visits)} visits): {e}")
+        if any(op[0] == "vacuum" for op in batch):
+            # Một lần cho history.db cũ: bật auto_vacuum=INCREMENTAL (cần VACUUM toàn bộ).
+            # Chạy trên thread này nên GUI vẫn đọc được (WAL), chỉ visit mới chờ trong hàng đợi
+            try:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+            except sqlite3.Error as e:
+                print(f"⚠ Cannot vacuum history: {e}")
+        for op in batch:
+            if op[0] == "flush":
+                op[1].set()
+        return any(op[0] == "stop" for op in batch)
+
+
+# --------------------------
+#  HISTORY STORE
+# --------------------------
+class HistoryStore:
+    """Lịch sử duyệt web trong history.db (tách khỏi profile.db để không kích hoạt
+    đồng bộ giữa các instance mỗi lần chuyển trang).
+
+    visit() / set_title() chỉ đưa vào hàng đợi, writer thread ghi theo batch nên
+    điều hướng không bao giờ chờ đĩa. Truy vấn đọc trên connection của thread GUI
+    (WAL: đọc không chặn ghi) và luôn đi qua index: url, host, thời gian.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+        self.conn.execute("BEGIN IMMEDIATE")
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                self.conn.execute(statement)
+        self.upgrade()
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_places_frecency ON places(frecency)")
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.conn.execute("COMMIT")
+        self.writer = _HistoryWriter(path)
+        self.writer.start()
+        self.listeners = []  # fn(event, place), event = "visited" | "title"
+
+    def upgrade(self):
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(places)")}
+        if "frecency" not in columns:  # schema 1 -> 2
+            self.conn.execute("ALTER TABLE places ADD COLUMN frecency REAL")
+            # Không còn từng lượt mở cũ trong tay: coi như visit_count lượt cùng lúc last_visit
+            self.conn.create_function("initial_frecency", 2,
+                                      lambda count, at: math.log(max(count, 1)) + visit_score(at))
+            self.conn.execute("UPDATE places SET frecency = initial_frecency(visit_count, last_visit)")
+
+    # --------------------------
+    #  RECORDING (thread GUI, không chặn)
+    # --------------------------
+    def visit(self, url, title=None, at=None):
+        if not url or url.startswith(SKIP_SCHEMES):
+            return
+        place = {"url": url, "title": title or None, "host": url_host(url), "at": at or time.time()}
+        self.writer.queue.put(("visit", url, place["title"], place["host"], place["at"]))
+        self._notify("visited", place)
+
+    def set_title(self, url, title):
+        if url and title and not url.startswith(SKIP_SCHEMES):
+            self.writer.queue.put(("title", url, title))
+            self._notify("title", {"url": url, "title": title})
+
+    def _notify(self, event, place):
+        for fn in self.listeners:
+            fn(event, place)
+
+    def vacuum(self):
+        """VACUUM toàn bộ trên writer thread (không chặn GUI)"""
+        self.writer.queue.put(("vacuum",))
+
+    def flush(self, timeout=FLUSH_WAIT_S):
+        """Chờ writer ghi hết hàng đợi (trước khi truy vấn để thấy visit vừa xong)"""
+        if not self.writer.isRunning():
+            return False
+        done = threading.Event()
+        self.writer.queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self.writer.isRunning():
+            self.writer.queue.put(("stop",))
+            self.writer.wait()
+        self.conn.close()
+
+    # --------------------------
+    #  META
+    # --------------------------
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+    # --------------------------
+    #  QUERIES
+    # --------------------------
+    def recent(self, limit=200, before=None):
+        """Các trang mở gần nhất (mỗi URL một dòng); before = last_visit của trang cuối để lấy trang tiếp"""
+        rows = self.conn.execute(
+            f"SELECT {PLACE_COLUMNS} FROM places WHERE last_visit < ? ORDER BY last_visit DESC LIMIT ?",
+            (before if before is not None else float("inf"), limit))
+        return [dict(row) for row in rows]
+
+    def visits(self, start, end, limit=1000):
+        """Từng lượt mở trong khoảng [start, end), mới nhất trước"""
+        rows = self.conn.execute(
+            "SELECT p.url, COALESCE(p.title, p.url) AS title, p.host, v.visited_at "
+            "FROM visits v JOIN places p ON p.id = v.place_id "
+            "WHERE v.visited_at >= ? AND v.visited_at < ? ORDER BY v.visited_at DESC LIMIT ?",
+            (start, end, limit))
+        return [dict(row) for row in rows]
+
+    def top_places(self, limit=20000):
+        """Các trang có frecency cao nhất (nạp cho omnibox)"""
+        rows = self.conn.execute(
+            f"SELECT {PLACE_COLUMNS} FROM places ORDER BY frecency DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def for_host(self, host, limit=200):
+        rows = self.conn.execute(
+            f"SELECT {PLACE_COLUMNS} FROM places WHERE host = ? ORDER BY last_visit DESC LIMIT ?",
+            (host, limit))
+        return [dict(row) for row in rows]
+
+    def place(self, url):
+        row = self.conn.execute(f"SELECT {PLACE_COLUMNS} FROM places WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def visit_times(self, url, limit=100):
+        rows = self.conn.execute(
+            "SELECT v.visited_at FROM places p JOIN visits v ON v.place_id = p.id "
+            "WHERE p.url = ? ORDER BY v.visited_at DESC LIMIT ?", (url, limit))
+        return [row[0] for row in rows]
+
+    def search(self, text, limit=200):
+        """Khớp chuỗi con trong url / title, duyệt theo last_visit giảm dần nên dừng sớm khi đủ limit"""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.conn.execute(
+            f"SELECT {PLACE_COLUMNS} FROM places INDEXED BY idx_places_last_visit "
+            "WHERE url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\' "
+            "ORDER BY last_visit DESC LIMIT ?", (pattern, pattern, limit))
+        return [dict(row) for row in rows]
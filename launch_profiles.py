@@ -0,0 +1,99 @@
+import os
+import sys
+
+FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+MODE_ENV = "MINIBROWSER_LAUNCH_MODE"
+DEFAULT_MODE = "default"
+MAX_RENDERER_LIMIT = 64
+
+# --------------------------
+#  LAUNCH MODES
+# --------------------------
+# Mỗi mode là một lựa chọn process model của Chromium (đánh đổi RAM / độ trễ):
+#   default           : process-per-site-instance của Chromium
+#   process-per-site  : các tab cùng site dùng chung renderer => ít RAM hơn
+#   single-process    : chỉ dùng cho kiosk, renderer crash là cả app crash
+#   renderer-limit:N  : tối đa N renderer, tab mới dùng chung renderer cũ
+#   low-end           : low-end-device-mode của Blink (giảm cache, tile, ...)
+LAUNCH_MODES = {
+    "default": [],
+    "process-per-site": ["--process-per-site"],
+    "single-process": ["--single-process"],
+    "renderer-limit": ["--renderer-process-limit={n}"],
+    "low-end": ["--enable-low-end-device-mode"],
+}
+
+# Các cờ quyết định process model => chỉ được có một bộ tại một thời điểm
+PROCESS_MODEL_FLAGS = (
+    "--process-per-site",
+    "--process-per-tab",
+    "--single-process",
+    "--renderer-process-limit",
+    "--enable-low-end-device-mode",
+)
+
+
+def parse_mode(spec):
+    """'renderer-limit:4' -> ('renderer-limit', 4). ValueError nếu không hợp lệ"""
+    name, _, arg = (spec or DEFAULT_MODE).strip().partition(":")
+    if name not in LAUNCH_MODES:
+        raise ValueError(f"Unknown launch mode {name!r}, expected one of: {', '.join(LAUNCH_MODES)}")
+    if name == "renderer-limit":
+        try:
+            n = int(arg)
+        except ValueError:
+            raise ValueError("renderer-limit needs a number, e.g. renderer-limit:4") from None
+        if not 1 <= n <= MAX_RENDERER_LIMIT:
+            raise ValueError(f"renderer-limit must be between 1 and {MAX_RENDERER_LIMIT}, got {n}")
+        return name, n
+    if arg:
+        raise ValueError(f"Launch mode {name!r} takes no argument")
+    return name, None
+
+
+def mode_flags(spec):
+    name, n = parse_mode(spec)
+    return [flag.format(n=n) for flag in LAUNCH_MODES[name]]
+
+
+def select_launch_mode(argv=None, default=DEFAULT_MODE):
+    """Lấy mode từ --launch-mode=... (và xoá khỏi argv) hoặc biến môi trường"""
+    argv = sys.argv if argv is None else argv
+    for i, arg in enumerate(list(argv)):
+        if arg.startswith("--launch-mode="):
+            del argv[i]
+            return arg.split("=", 1)[1]
+        if arg == "--launch-mode" and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            return value
+    return os.environ.get(MODE_ENV, default)
+
+
+def apply_launch_mode(spec, extra_flags=()):
+    """Ghi QTWEBENGINE_CHROMIUM_FLAGS cho mode. Phải gọi trước khi tạo QApplication"""
+    name, n = parse_mode(spec)
+    flags = mode_flags(spec)
+
+    existing = os.environ.get(FLAGS_ENV, "").split()
+    kept, dropped = [], []
+    for flag in existing:
+        if flag.split("=", 1)[0] in PROCESS_MODEL_FLAGS:
+            dropped.append(flag)
+        elif flag not in kept:
+            kept.append(flag)
+    for flag in extra_flags:
+        if flag.split("=", 1)[0] in PROCESS_MODEL_FLAGS:
+            raise ValueError(f"{flag} conflicts with launch modes, use a launch mode instead")
+        if flag not in kept:
+            kept.append(flag)
+
+    final = kept + flags
+    os.environ[FLAGS_ENV] = " ".join(final)
+    label = name if n is None else f"{name}:{n}"
+    print(f"[launch] mode={label} flags={' '.join(final) or '(none)'}", file=sys.stderr)
+    if dropped:
+        print(f"[launch] ignored process-model flags from {FLAGS_ENV}: {' '.join(dropped)}", file=sys.stderr)
+    if name == "single-process":
+        print("[launch] single-process: a renderer crash will take down the whole browser", file=sys.stderr)
+    return final
@@ -0,0 +1,241 @@
+import sys
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+MAX_WORKERS = 16
+PER_HOST = 2                    # request đồng thời tối đa trên một host
+TIMEOUT_S = 10
+RECHECK_AFTER_S = 7 * 24 * 3600  # link còn sống: kiểm tra lại sau 7 ngày
+RETRY_ERRORS_AFTER_S = 24 * 3600  # link lỗi: thử lại sau 1 ngày
+SAVE_EVERY = 100                # ghi kết quả vào DB theo lô
+USER_AGENT = "MiniBrowser-LinkChecker/1.0"
+HEAD_UNSUPPORTED = {405, 501}
+STOP_POLL_S = 0.2               # worker xem cờ stop mỗi từng này giây khi chờ request
+STOP_WAIT_MS = 2000             # đóng trình duyệt: chờ worker tối đa từng này
+
+
+def is_dead(status):
+    return status == 0 or status >= 400
+
+
+def interleave_by_host(urls):
+    """Xếp xen kẽ theo host để worker không cùng chờ semaphore của một host"""
+    groups = {}
+    for url in urls:
+        groups.setdefault(_host(url), []).append(url)
+    queues = list(groups.values())
+    result = []
+    i = 0
+    while queues:
+        alive = []
+        for q in queues:
+            if i < len(q):
+                result.append(q[i])
+                alive.append(q)
+        queues = alive
+        i += 1
+    return result
+
+
+def _host(url):
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+# --------------------------
+#  CHECK ONE URL
+# --------------------------
+def check_url(session, url, etag=None, last_modified=None, timeout=TIMEOUT_S):
+    """HEAD, nếu server không hỗ trợ thì GET có điều kiện (không đọc body).
+
+    Trả về dict: url, status (0 = lỗi mạng), final_url, error, etag, last_modified.
+    """
+    result = {"url": url, "status": 0, "final_url": None, "error": None,
+              "etag": etag, "last_modified": last_modified, "checked_at": time.time()}
+    try:
+        resp = session.head(url, allow_redirects=True, timeout=timeout)
+        if resp.status_code in HEAD_UNSUPPORTED or resp.status_code == 403:
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            resp = session.get(url, headers=headers, allow_redirects=True, timeout=timeout, stream=True)
+            resp.close()  # chỉ cần status/header
+    except Exception as e:  # RequestException, URL hỏng (ValueError, UnicodeError...): vẫn báo kết quả
+        result["error"] = str(e)[:300] or type(e).__name__
+        return result
+
+    # 304: nội dung không đổi so với lần trước => vẫn sống
+    result["status"] = 200 if resp.status_code == 304 else resp.status_code
+    if resp.url and resp.url != url:
+        result["final_url"] = resp.url
+    result["etag"] = resp.headers.get("ETag", etag)
+    result["last_modified"] = resp.headers.get("Last-Modified", last_modified)
+    return result
+
+
+def make_session(per_host=PER_HOST):
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    # Giữ kết nối keep-alive cho mỗi host, đủ cho PER_HOST request song song
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=per_host)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def check_all(entries, on_result, stop=None, workers=MAX_WORKERS, per_host=PER_HOST, timeout=TIMEOUT_S):
+    """entries: [(url, etag, last_modified)]; gọi on_result(dict) từ thread worker"""
+    stop = stop or threading.Event()
+    session = make_session(per_host)
+    host_limits = {}
+    lock = threading.Lock()
+    by_url = {url: (etag, modified) for url, etag, modified in entries}
+
+    def task(url):
+        if stop.is_set():
+            return
+        host = _host(url)
+        with lock:
+            limit = host_limits.setdefault(host, threading.BoundedSemaphore(per_host))
+        with limit:
+            if stop.is_set():
+                return
+            etag, modified = by_url[url]
+            result = check_url(session, url, etag, modified, timeout)
+            if not stop.is_set():  # đã dừng => không báo kết quả về job đã đóng
+                on_result(result)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(task, url) for url in interleave_by_host(by_url)]
+        # Chờ từng lượt ngắn: stop thì trả về ngay, không chờ các request đang chạy (tối đa timeout)
+        while not stop.is_set():
+            if not wait(futures, timeout=STOP_POLL_S, return_when=ALL_COMPLETED).not_done:
+                break
+    finally:
+        pool.shutdown(wait=not stop.is_set())
+        session.close()
+
+
+# --------------------------
+#  BACKGROUND JOB
+# --------------------------
+class _LinkWorker(QThread):
+    checked = pyqtSignal(dict)
+
+    def __init__(self, entries, parent=None):
+        super().__init__(parent)
+        self.entries = entries
+        self.stop = threading.Event()
+
+    def run(self):
+        check_all(self.entries, self.checked.emit, stop=self.stop)
+
+
+class LinkCheckJob(QObject):
+    """Kiểm tra các bookmark cũ / chưa kiểm tra trên thread nền.
+
+    Worker chỉ làm HTTP; kết quả quay về thread GUI qua signal rồi được ghi vào
+    ProfileDB theo lô (sqlite3 connection không dùng chung giữa các thread).
+    """
+    progress = pyqtSignal(int, int, int)  # done, total, dead
+    finished = pyqtSignal(int, int)       # checked, dead
+
+    def __init__(self, db, urls, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.entries = db.stale_links(urls, RECHECK_AFTER_S, RETRY_ERRORS_AFTER_S)
+        self.done = 0
+        self.dead = 0
+        self._pending = []
+        self._closed = False
+        self.worker = None
+
+    def start(self):
+        if requests is None:
+            print("⚠ Link checker cần thư viện requests (pip install requests)")
+            self.finished.emit(0, 0)
+            return
+        if not self.entries:
+            self.finished.emit(0, 0)
+            return
+        self.worker = _LinkWorker(self.entries, self)
+        self.worker.checked.connect(self.on_checked)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.start()
+
+    def cancel(self):
+        if self.worker:
+            self.worker.stop.set()
+
+    def shutdown(self, timeout_ms=STOP_WAIT_MS):
+        """Đóng trình duyệt: ngắt signal (không ghi DB đã đóng), dừng worker, chờ có giới hạn"""
+        self._closed = True
+        if self.worker is None:
+            return
+        self.worker.checked.disconnect(self.on_checked)
+        self.worker.finished.disconnect(self.on_worker_finished)
+        self.cancel()
+        if not self.worker.wait(timeout_ms):
+            # Như SearchSuggester.stop: huỷ QThread đang chạy thì Qt abort cả tiến trình
+            print("⚠ Link checker did not stop, terminating")
+            self.worker.terminate()
+            self.worker.wait()
+
+    def on_checked(self, result):
+        if self._closed:  # signal đã xếp hàng trước lúc shutdown
+            return
+        self.done += 1
+        if is_dead(result["status"]):
+            self.dead += 1
+        self._pending.append(result)
+        if len(self._pending) >= SAVE_EVERY:
+            self.save()
+        self.progress.emit(self.done, len(self.entries), self.dead)
+
+    def on_worker_finished(self):
+        if self._closed:
+            return
+        self.save()
+        self.finished.emit(self.done, self.dead)
+
+    def save(self):
+        if self._pending:
+            self.db.save_link_results(self._pending)
+            self._pending = []
+
+
+# --------------------------
+#  COMMAND LINE
+# --------------------------
+def main():
+    """python link_checker.py URL... => một dòng JSON cho mỗi URL (không dùng DB)"""
+    if requests is None:
+        print("⚠ requires requests (pip install requests)")
+        sys.exit(1)
+    urls = sys.argv[1:]
+    lock = threading.Lock()
+
+    def emit(result):
+        with lock:
+            print(json.dumps(result))
+            sys.stdout.flush()
+    check_all([(url, None, None) for url in urls], emit)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWebEngineWidgets import QWebEngineView
+from search_engines import search_url
 
 HOME_PAGE = "https://www.google.com"
 
@@ -127,8 +128,7 @@ class MiniBrowser(QMainWindow):
             # đơn giản thêm http
             return "http://" + text
         # else: search on Google
-        from urllib.parse import quote_plus
-        return "https://www.google.com/search?q=" + quote_plus(text)
+        return search_url(text)
 
     def go_back(self):
         w = self.current_webview()
@@ -0,0 +1,479 @@
+import re
+import heapq
+import math
+from itertools import islice
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QCompleter
+
+from bookmark_store import normalize_url
+from history_store import log_add, visit_score
+from search_index import url_fields
+
+TOP_K = 12             # số gợi ý giữ sẵn ở mỗi nút trie
+MAX_SUGGESTIONS = 8
+BURST = 32             # nút lá giữ tối đa 32 khoá rồi mới tách thành các nút con
+MAX_DEPTH = 40
+MIN_TOKEN = 2
+OMNIBOX_PLACES = 20000  # số trang history (frecency cao nhất) nạp vào RAM
+BOOKMARK_VISITS = 3     # bookmark được tính như 3 lượt mở (lúc mở gần nhất / lúc thêm)
+BUILD_DELAY_MS = 1500   # dựng trie sau khi cửa sổ đã hiện
+BUILD_BATCH = 1000      # số trang nạp / chèn mỗi lượt event loop khi dựng trie
+SCAN_BUDGET = 1000      # trie chưa dựng xong: gõ phím duyệt tối đa từng này entry (~2 ms)
+STRIP_PREFIXES = ("https://", "http://", "www.")
+
+
+def strip_url(text):
+    """Bỏ scheme và www. như người dùng hay gõ"""
+    text = text.strip().lower()
+    for prefix in STRIP_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+# --------------------------
+#  FRECENCY TRIE
+# --------------------------
+class _Entry:
+    __slots__ = ("url", "title", "host", "history", "bookmark", "score", "keys", "text")
+
+    def __init__(self, url, title, host):
+        self.url = url
+        self.title = title or url
+        self.host = host
+        self.history = -math.inf   # frecency từ history (log)
+        self.bookmark = -math.inf  # phần cộng thêm nếu là bookmark
+        self.score = -math.inf
+        self.keys = ()
+        self.text = ""
+
+    def rescore(self):
+        self.score = log_add(self.history, self.bookmark)
+
+
+class _Node:
+    __slots__ = ("children", "items", "top")
+
+    def __init__(self):
+        self.children = None  # None = nút lá (burst bucket)
+        self.items = []       # [(key, entry)]: lá = mọi khoá; nút trong = khoá kết thúc tại đây
+        self.top = []         # TOP_K entry điểm cao nhất trong cây con, giảm dần
+
+
+def _top(candidates):
+    return heapq.nlargest(TOP_K, dict.fromkeys(candidates), key=lambda e: e.score)
+
+
+class FrecencyTrie:
+    """Burst trie trên host (URL không scheme / www) và các token của URL.
+
+    Mỗi nút giữ sẵn TOP_K entry có frecency cao nhất trong cây con, nên gợi ý cho
+    một prefix chỉ là đi xuống len(prefix) nút; lá (tối đa BURST khoá) thì lọc tuyến
+    tính. Frecency đã quy về mốc cố định (xem history_store) nên thứ tự không cũ đi
+    theo thời gian: chỉ cập nhật các nút trên đường đi của entry vừa đổi.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.entries = {}  # normalize_url -> _Entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def entry(self, url, title=None, host=""):
+        """Entry của url (tạo mới nếu chưa có, chưa chèn vào trie)"""
+        key = normalize_url(url)
+        e = self.entries.get(key)
+        if e is None:
+            e = self.entries[key] = _Entry(url, title, host)
+        elif title:
+            e.title = title
+        return e
+
+    @staticmethod
+    def keys_of(e):
+        host_tokens, path_tokens = url_fields(e.url)
+        keys = {strip_url(e.url)[:MAX_DEPTH]}
+        keys.update(t[:MAX_DEPTH] for t in host_tokens + path_tokens if len(t) >= MIN_TOKEN)
+        return tuple(keys)
+
+    # --------------------------
+    #  BUILD / UPDATE
+    # --------------------------
+    def index(self, entries):
+        """Chèn các entry chưa có trong trie, chưa tính top (xem build)"""
+        for e in entries:
+            e.rescore()
+            if not e.keys:
+                e.text = f"{strip_url(e.url)} {e.title.lower()}"
+                e.keys = self.keys_of(e)
+                for key in e.keys:
+                    self._insert(key, e)
+
+    def build(self):
+        """Chèn nốt các entry còn lại rồi tính top một lượt từ dưới lên"""
+        self.index(list(self.entries.values()))
+        self._compute(self.root)
+
+    def _compute(self, node):
+        if node.children is None:
+            node.top = _top(e for _, e in node.items)
+            return
+        for child in node.children.values():
+            self._compute(child)
+        node.top = _top(self._candidates(node))
+
+    @staticmethod
+    def _candidates(node):
+        for _, e in node.items:
+            yield e
+        for child in node.children.values():
+            yield from child.top
+
+    def _insert(self, key, e):
+        """Thêm (key, e); trả về (đường đi từ root, các nút lá mới do tách)"""
+        node, depth, path, created = self.root, 0, [self.root], []
+        while node.children is not None and depth < len(key):
+            child = node.children.get(key[depth])
+            if child is None:
+                child = node.children[key[depth]] = _Node()
+                created.append(child)
+            node = child
+            depth += 1
+            path.append(node)
+        node.items.append((key, e))
+        if node.children is None and len(node.items) > BURST and depth < MAX_DEPTH:
+            created.extend(self._split(node, depth))
+        return path, created
+
+    def _split(self, node, depth):
+        items, node.items, node.children = node.items, [], {}
+        for key, e in items:
+            if len(key) == depth:
+                node.items.append((key, e))
+            else:
+                node.children.setdefault(key[depth], _Node()).items.append((key, e))
+        created = list(node.children.values())
+        for child in list(node.children.values()):
+            if len(child.items) > BURST and depth + 1 < MAX_DEPTH:
+                created.extend(self._split(child, depth + 1))
+        return created
+
+    def _path(self, key):
+        node, depth, path = self.root, 0, [self.root]
+        while node.children is not None and depth < len(key):
+            node = node.children.get(key[depth])
+            if node is None:
+                break
+            depth += 1
+            path.append(node)
+        return path
+
+    def update(self, e):
+        """Gọi sau khi đổi history / bookmark / title của e"""
+        old = e.score
+        e.rescore()
+        e.text = f"{strip_url(e.url)} {e.title.lower()}"
+        if not e.keys:
+            e.keys = self.keys_of(e)
+            for key in e.keys:
+                path, created = self._insert(key, e)
+                for node in created:
+                    self._compute(node)
+                self._raise(path, e)
+        elif e.score >= old:
+            for key in e.keys:
+                self._raise(self._path(key), e)
+        else:
+            for key in e.keys:
+                self._recompute(self._path(key))
+
+    def remove(self, e):
+        self.entries.pop(normalize_url(e.url), None)
+        for key in e.keys:
+            path = self._path(key)
+            path[-1].items = [(k, x) for k, x in path[-1].items if x is not e]
+            self._recompute(path)
+        e.keys = ()
+
+    @staticmethod
+    def _raise(path, e):
+        """Điểm của e chỉ tăng: chèn / đổi chỗ e trong top của từng nút trên đường đi"""
+        for node in path:
+            top = node.top
+            if e in top:
+                top.sort(key=lambda x: x.score, reverse=True)
+            elif len(top) < TOP_K or e.score > top[-1].score:
+                top.append(e)
+                top.sort(key=lambda x: x.score, reverse=True)
+                del top[TOP_K:]
+
+    def _recompute(self, path):
+        """Điểm giảm / bị xoá: tính lại top từ dưới lên (top nút cha = gộp top các nút con)"""
+        for node in reversed(path):
+            if node.children is None:
+                node.top = _top(e for _, e in node.items)
+            else:
+                node.top = _top(self._candidates(node))
+
+    # --------------------------
+    #  QUERY
+    # --------------------------
+    def complete(self, text, limit=MAX_SUGGESTIONS):
+        words = strip_url(text).split()
+        if not words:
+            return []
+        first = words[0][:MAX_DEPTH]
+        node, depth = self.root, 0
+        while depth < len(first):
+            if node.children is None:
+                # Lá: lọc tuyến tính các khoá của bucket
+                candidates = _top(e for key, e in node.items if key.startswith(first))
+                break
+            node = node.children.get(first[depth])
+            if node is None:
+                return []
+            depth += 1
+        else:
+            candidates = node.top
+        if len(words[0]) > MAX_DEPTH or len(words) > 1:
+            # Từ thứ hai trở đi: lọc trong top của từ đầu theo chuỗi con url / title
+            rest = words[1:] + ([words[0]] if len(words[0]) > MAX_DEPTH else [])
+            candidates = [e for e in candidates if all(w in e.text for w in rest)]
+        return candidates[:limit]
+
+    def scan(self, text, limit=MAX_SUGGESTIONS, budget=SCAN_BUDGET):
+        """Gợi ý khi trie đang dựng dở (top của các nút chưa tính): duyệt tuyến tính tối đa
+        budget entry theo thứ tự nạp (history theo frecency giảm dần) với cùng luật khớp
+        như complete. Kết quả có thể thiếu, nhưng gõ phím không phải chờ dựng xong."""
+        words = strip_url(text).split()
+        if not words:
+            return []
+        first = words[0][:MAX_DEPTH]
+        rest = words[1:] + ([words[0]] if len(words[0]) > MAX_DEPTH else [])
+        # Khoá = url bỏ scheme hoặc một token của url => first đứng ở đầu url hoặc đầu một từ
+        starts = re.compile(r"(?<!\w)" + re.escape(first)).search
+        found = []
+        for e in islice(self.entries.values(), budget):
+            stripped = strip_url(e.url)
+            if not starts(stripped):
+                continue
+            if rest:
+                text = e.text or f"{stripped} {e.title.lower()}"
+                if not all(w in text for w in rest):
+                    continue
+            e.rescore()
+            found.append(e)
+        return heapq.nlargest(limit, found, key=lambda e: e.score)
+
+
+# --------------------------
+#  POPUP MODEL
+# --------------------------
+class OmniboxModel(QAbstractListModel):
+    """Gợi ý: hiện "title — url", điền url (EditRole) khi chọn; sau đó là các dòng
+    gợi ý tìm kiếm từ server (chữ gợi ý, url tìm kiếm)"""
+
+    def __init__(self, icons=None, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._searches = []
+        self.icons = icons
+
+    def set_results(self, entries, searches=()):
+        self.beginResetModel()
+        self._items = list(entries)
+        self._searches = list(searches)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items) + len(self._searches)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.row() >= len(self._items):
+            text, url = self._searches[index.row() - len(self._items)]
+            if role == Qt.DisplayRole:
+                return f"🔍 {text}"
+            return url if role == Qt.EditRole else None
+        e = self._items[index.row()]
+        if role == Qt.DisplayRole:
+            return e.url if e.title == e.url else f"{e.title}  —  {e.url}"
+        if role == Qt.EditRole:
+            return e.url
+        if role == Qt.DecorationRole and self.icons:
+            return self.icons.icon(e.host)
+        return None
+
+
+# --------------------------
+#  OMNIBOX
+# --------------------------
+class Omnibox(QObject):
+    """Gợi ý cho thanh địa chỉ từ history + bookmark, hoàn toàn trong RAM.
+
+    Trie dựng một lần từ OMNIBOX_PLACES trang frecency cao nhất trong history.db
+    (sau khi cửa sổ đã hiện), sau đó cập nhật theo listener của HistoryStore và
+    BookmarkStore. Gõ phím không bao giờ truy vấn đĩa.
+    """
+    openUrl = pyqtSignal(str)
+    suggested = pyqtSignal(str, list)  # (chữ đã gõ, gợi ý) — cho Preconnector, SearchSuggester
+
+    def __init__(self, urlbar, history, bookmarks, icons=None, parent=None):
+        super().__init__(parent)
+        self.urlbar = urlbar
+        self.history = history
+        self.bookmarks = bookmarks
+        self.trie = None       # trie đã dựng xong
+        self.results = []      # gợi ý history / bookmark cho chữ đang gõ
+        self._building = None  # trie đang dựng dần
+        self._todo = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.build_step)
+
+        self.model = OmniboxModel(icons, self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setWidget(urlbar)  # không dùng setCompleter: tự lọc, tự hiện popup
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(MAX_SUGGESTIONS)
+        self.completer.activated[str].connect(self.on_activated)
+        # Enter trên popup: QCompleter vừa gửi phím cho thanh địa chỉ vừa chọn dòng hiện tại
+        # => tự xử lý. Filter cài sau nên chạy trước filter của QCompleter
+        self.completer.popup().installEventFilter(self)
+        urlbar.textEdited.connect(self.on_text_edited)
+
+        history.listeners.append(self.on_history_changed)
+        bookmarks.listeners.append(self.on_bookmark_changed)
+        QTimer.singleShot(BUILD_DELAY_MS, self.start_build)
+
+    # --------------------------
+    #  BUILD (chia lượt trên event loop, như BookmarkImporter)
+    # --------------------------
+    def start_build(self):
+        if self.trie is not None or self._building is not None:
+            return
+        self._building = FrecencyTrie()
+        self._todo = self._build_steps(self._building)
+        self._timer.start()
+
+    def _build_steps(self, trie):
+        """Generator: mỗi next() làm một phần việc cỡ BUILD_BATCH"""
+        places = self.history.top_places(OMNIBOX_PLACES)
+        for i in range(0, len(places), BUILD_BATCH):
+            for place in places[i:i + BUILD_BATCH]:
+                e = trie.entry(place["url"], place["title"], place["host"])
+                e.history = place["frecency"] if place["frecency"] is not None else -math.inf
+            yield
+        for bm in self.bookmarks:
+            self._set_bookmark(trie.entry(bm["url"], bm["title"], bm["host"]), bm)
+        yield
+        entries = list(trie.entries.values())
+        for i in range(0, len(entries), BUILD_BATCH):
+            trie.index(entries[i:i + BUILD_BATCH])
+            yield
+
+    def build_step(self):
+        if self._building is None:
+            return
+        if next(self._todo, StopIteration) is StopIteration:
+            self.finish_build()
+        else:
+            self._timer.start()
+
+    def finish_build(self):
+        """Chèn nốt (cả entry mới trong lúc dựng) và tính top"""
+        self.start_build()
+        if self._building is None:
+            return
+        self._timer.stop()
+        for _ in self._todo:
+            pass
+        self._building.build()
+        self.trie, self._building, self._todo = self._building, None, None
+
+    @staticmethod
+    def _set_bookmark(e, bm):
+        at = bm.get("last_visit") or bm.get("added_at")
+        e.bookmark = math.log(BOOKMARK_VISITS) + visit_score(at) if at else -math.inf
+
+    # --------------------------
+    #  UPDATES
+    # --------------------------
+    def on_history_changed(self, event, place):
+        # Đang dựng: chỉ sửa entry, finish_build tính lại điểm và top từ đầu
+        trie = self.trie if self.trie is not None else self._building
+        if trie is None:
+            return  # start_build sẽ đọc từ DB (writer có thể chưa ghi, chấp nhận thiếu vài lượt)
+        if event == "visited":
+            e = trie.entry(place["url"], place["title"], place["host"])
+            e.history = log_add(e.history, visit_score(place["at"]))
+            if self.trie is not None:
+                self.trie.update(e)
+        elif event == "title":
+            e = trie.entries.get(normalize_url(place["url"]))
+            if e is not None and e.title != place["title"]:
+                e.title = place["title"]
+                e.text = f"{strip_url(e.url)} {e.title.lower()}"
+
+    def on_bookmark_changed(self, event, bm):
+        trie = self.trie if self.trie is not None else self._building
+        if trie is None:
+            return
+        if event == "removed":
+            e = trie.entries.get(normalize_url(bm["url"]))
+            if e is None:
+                return
+            e.bookmark = -math.inf
+            if e.history == -math.inf:
+                trie.remove(e)
+            elif self.trie is not None:
+                self.trie.update(e)
+            return
+        e = trie.entry(bm["url"], bm["title"], bm["host"])
+        self._set_bookmark(e, bm)
+        if self.trie is not None:
+            self.trie.update(e)
+
+    # --------------------------
+    #  POPUP
+    # --------------------------
+    def on_text_edited(self, text):
+        if self.trie is not None:
+            self.results = self.trie.complete(text)
+        else:
+            # Đang dựng (hoặc chưa tới BUILD_DELAY_MS): trả lời từ phần đã nạp, để timer dựng tiếp
+            self.start_build()
+            self.results = self._building.scan(text)
+        self.model.set_results(self.results)
+        self.suggested.emit(text, self.results)
+        self.show_popup()
+
+    def set_search_suggestions(self, text, searches):
+        """Gợi ý tìm kiếm (SearchSuggester.ready) về muộn: chỉ hiện nếu chữ chưa đổi"""
+        if text != self.urlbar.text() or not self.urlbar.hasFocus():
+            return
+        self.model.set_results(self.results, searches)
+        self.show_popup()
+
+    def show_popup(self):
+        if self.model.rowCount():
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            selected = self.completer.popup().selectionModel().selectedIndexes()
+            self.completer.popup().hide()
+            if selected:
+                self.on_activated(selected[0].data(Qt.EditRole))
+            else:  # chưa chọn dòng nào => Enter mở đúng chữ đã gõ
+                QApplication.sendEvent(self.urlbar, event)
+            return True
+        return False
+
+    def on_activated(self, url):
+        self.urlbar.setText(url)
+        self.openUrl.emit(url)
@@ -0,0 +1,108 @@
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+
+from proc_stats import available_memory, load_per_cpu
+
+POOL_SIZE = 1
+REFILL_DELAY_MS = 2000
+RETRY_DELAY_MS = 10000
+MEMORY_CHECK_MS = 30000  # kiểm tra RAM định kỳ, cả khi pool đã đầy (không còn refill nào chạy)
+MIN_FREE_MEMORY = 512 * 1024 * 1024  # dưới mức này coi là thiếu RAM
+MAX_LOAD_PER_CPU = 0.7
+
+
+# --------------------------
+#  WARM PAGE POOL
+# --------------------------
+class WarmPagePool(QObject):
+    """Giữ sẵn vài view đã tải trang home trên profile chung => Ctrl+T hiện ngay"""
+
+    def __init__(self, profile, url, size=POOL_SIZE, is_idle=None, page_factory=None, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.page_factory = page_factory  # page_factory(view) -> QWebEnginePage (vd. DarkMode.new_page)
+        self.url = url
+        self.size = size
+        self.is_idle = is_idle
+        self._ready = []
+        self._loading = []
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.refill)
+        self._memory_timer = QTimer(self)
+        self._memory_timer.timeout.connect(self.check_memory)
+        self._memory_timer.start(MEMORY_CHECK_MS)
+
+    def take(self, url):
+        """Trả về view đã tải sẵn url (hoặc None), rồi hẹn nạp lại pool"""
+        if url != self.url or not self._ready:
+            return None
+        view = self._ready.pop(0)
+        self.schedule_refill()
+        return view
+
+    def set_url(self, url):
+        if url != self.url:
+            self.clear()
+            self.url = url
+            self.schedule_refill()
+
+    def schedule_refill(self, delay=REFILL_DELAY_MS):
+        if not self._timer.isActive():
+            self._timer.start(delay)
+
+    # --------------------------
+    #  REFILL
+    # --------------------------
+    def under_memory_pressure(self):
+        free = available_memory()
+        return free is not None and free < MIN_FREE_MEMORY
+
+    def machine_idle(self):
+        if self.is_idle and not self.is_idle():
+            return False
+        load = load_per_cpu()
+        return load is None or load < MAX_LOAD_PER_CPU
+
+    def check_memory(self):
+        """Thiếu RAM => bỏ các view giữ sẵn, nạp lại sau; True nếu đang thiếu RAM"""
+        if not self.under_memory_pressure():
+            return False
+        self.clear()
+        self.schedule_refill(RETRY_DELAY_MS)
+        return True
+
+    def refill(self):
+        if self.check_memory():
+            return
+        if len(self._ready) + len(self._loading) >= self.size:
+            return
+        if not self.machine_idle():
+            self.schedule_refill(RETRY_DELAY_MS)
+            return
+
+        parent = self.parent() if isinstance(self.parent(), QWidget) else None
+        view = QWebEngineView(parent)
+        view.hide()
+        view.setPage(self.page_factory(view) if self.page_factory else QWebEnginePage(self.profile, view))
+        view.loadFinished.connect(lambda ok, v=view: self.on_loaded(v, ok))
+        self._loading.append(view)
+        view.load(QUrl(self.url))
+
+    def on_loaded(self, view, ok):
+        if view not in self._loading:
+            return
+        self._loading.remove(view)
+        if ok and view.url().isValid():
+            self._ready.append(view)
+        else:
+            view.deleteLater()
+        self.schedule_refill()
+
+    def clear(self):
+        for view in self._ready + self._loading:
+            view.deleteLater()
+        self._ready = []
+        self._loading = []
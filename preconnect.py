@@ -0,0 +1,154 @@
+import math
+import time
+import json
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from history_store import visit_score
+from omnibox import strip_url
+from url_classifier import classify, is_ip, LOCAL_HOSTS
+
+SUGGEST_DELAY_MS = 120   # gợi ý đủ chắc => preconnect gần như ngay
+TYPED_DELAY_MS = 400     # chỉ có host đang gõ => chờ người dùng ngừng gõ
+MIN_TYPED = 2
+MIN_VISITS = 2.0         # frecency của gợi ý >= 2 lượt mở "hôm nay"
+MAX_PER_MINUTE = 12
+HOST_COOLDOWN_S = 10     # Chromium đóng socket preconnect không dùng sau ~10 s
+COLD_SAMPLES = 20        # trung bình DNS + connect của các lần điều hướng không preconnect
+NAV_TIMING_JS = """(function () {
+    var n = performance.getEntriesByType("navigation")[0];
+    if (!n || !n.transferSize) return null;  // trang từ cache: không có kết nối để đo
+    return (n.domainLookupEnd - n.domainLookupStart) + (n.connectEnd - n.connectStart);
+})()"""
+
+
+def origin_of(url):
+    u = QUrl(url)
+    if u.scheme() not in ("http", "https") or not u.host():
+        return None
+    port = f":{u.port()}" if u.port() != -1 else ""
+    return f"{u.scheme()}://{u.host()}{port}"
+
+
+# --------------------------
+#  PRECONNECT
+# --------------------------
+class Preconnector(QObject):
+    """Làm ấm DNS + TCP/TLS cho origin người dùng sắp mở khi đang gõ thanh địa chỉ.
+
+    Gợi ý đầu của omnibox (đủ frecency, khớp tiền tố chữ đã gõ) hoặc host gõ tay
+    hợp lệ theo PSL được nạp vào một trang ẩn chỉ gồm <link rel=dns-prefetch> và
+    <link rel=preconnect> trên cùng profile => socket nằm sẵn trong pool khi Enter.
+    Giới hạn MAX_PER_MINUTE lần và HOST_COOLDOWN_S mỗi host. Sau khi tải, đọc
+    Navigation Timing để ghi lại số ms DNS + connect đã tiết kiệm.
+    """
+    saved = pyqtSignal(float)  # ms DNS + connect tiết kiệm được ở lần điều hướng vừa rồi
+
+    def __init__(self, profile, store=None, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.store = store  # HistoryStore: lưu thống kê qua các phiên (bảng meta)
+        self.page = None
+        self._pending = None
+        self._recent = deque()   # thời điểm các lần preconnect trong phút vừa qua
+        self._warmed = {}        # host -> thời điểm preconnect
+        self._cold = deque(maxlen=COLD_SAMPLES)
+        self.stats = {"preconnects": 0, "hits": 0, "saved_ms": 0.0}
+        if store is not None:
+            try:
+                self.stats.update(json.loads(store.get_meta("preconnect_stats", "{}")))
+            except ValueError:
+                pass
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.fire)
+
+    # --------------------------
+    #  CANDIDATE
+    # --------------------------
+    def on_suggestions(self, text, results):
+        """Omnibox vừa tính gợi ý cho text: chọn origin đáng làm ấm (nếu có)"""
+        self._timer.stop()
+        self._pending = None
+        typed = strip_url(text)
+        if len(typed) < MIN_TYPED or " " in typed:
+            return
+        if results and self.confident(typed, results[0]):
+            self._pending = origin_of(results[0].url)
+            delay = SUGGEST_DELAY_MS
+        else:
+            kind, url = classify(text)
+            self._pending = origin_of(url) if kind == "url" else None
+            delay = TYPED_DELAY_MS
+        if self._pending:
+            self._timer.start(delay)
+
+    @staticmethod
+    def confident(typed, entry):
+        if not strip_url(entry.url).startswith(typed):
+            return False
+        # frecency là log tổng visit giảm dần theo thời gian => trừ điểm của một lượt mở lúc này
+        return entry.score - visit_score(time.time()) >= math.log(MIN_VISITS)
+
+    def fire(self):
+        origin, self._pending = self._pending, None
+        if origin:
+            self.preconnect(origin)
+
+    # --------------------------
+    #  PRECONNECT
+    # --------------------------
+    def allowed(self, host, now):
+        if host in LOCAL_HOSTS or is_ip(host):
+            return False
+        if now - self._warmed.get(host, -math.inf) < HOST_COOLDOWN_S:
+            return False
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        return len(self._recent) < MAX_PER_MINUTE
+
+    def preconnect(self, origin):
+        host = QUrl(origin).host()
+        now = time.monotonic()
+        if not self.allowed(host, now):
+            return False
+        self._recent.append(now)
+        self._warmed = {h: t for h, t in self._warmed.items() if now - t < HOST_COOLDOWN_S}
+        self._warmed[host] = now
+        origins = [origin]
+        if origin.startswith("http://"):  # chữ gõ tay => http://, site thường chuyển sang https
+            origins.append("https://" + origin[len("http://"):])
+        hints = "".join(f'<link rel="preconnect" href="{o}">' for o in origins)
+        if self.page is None:
+            self.page = QWebEnginePage(self.profile, self)
+        self.page.setHtml(f'<link rel="dns-prefetch" href="//{host}">{hints}')
+        self.stats["preconnects"] += 1
+        return True
+
+    # --------------------------
+    #  MEASURE
+    # --------------------------
+    def measure(self, web):
+        """Gọi khi tab tải xong: so DNS + connect với trung bình các lần không preconnect"""
+        host = web.url().host()
+        warmed = time.monotonic() - self._warmed.pop(host, -math.inf) < HOST_COOLDOWN_S
+        web.page().runJavaScript(NAV_TIMING_JS, lambda ms, warmed=warmed: self.on_timing(ms, warmed))
+
+    def on_timing(self, ms, warmed):
+        if ms is None:
+            return
+        if not warmed:
+            if ms > 0:  # 0 = socket cũ của trang trước, không phải kết nối lạnh
+                self._cold.append(ms)
+            return
+        self.stats["hits"] += 1
+        if self._cold:
+            saved = max(0.0, sum(self._cold) / len(self._cold) - ms)
+            self.stats["saved_ms"] += saved
+            self.saved.emit(saved)
+
+    def save(self):
+        if self.store is not None:
+            self.store.set_meta("preconnect_stats", json.dumps(self.stats))
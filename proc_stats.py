@@ -0,0 +1,115 @@
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# --------------------------
+#  PROCESS STATS
+# --------------------------
+# Đọc CPU / bộ nhớ của tiến trình (renderer, browser).
+# Dùng psutil nếu có, nếu không thì đọc /proc (Linux).
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def cpu_time(pid):
+    """Tổng CPU time (user + system, giây) của pid, None nếu không đọc được"""
+    if not pid:
+        return None
+    if psutil:
+        try:
+            t = psutil.Process(pid).cpu_times()
+            return t.user + t.system
+        except (psutil.Error, OSError):
+            return None
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime, stime là trường 14, 15 (tính từ 1) => index 11, 12 sau ")"
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def rss(pid):
+    """Resident memory (byte) của pid, 0 nếu không đọc được"""
+    if psutil:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except (psutil.Error, OSError):
+            return 0
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def descendants(pid):
+    """Danh sách pid con cháu (QtWebEngineProcess renderer, gpu, zygote...)"""
+    if psutil:
+        try:
+            return [p.pid for p in psutil.Process(pid).children(recursive=True)]
+        except (psutil.Error, OSError):
+            return []
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    result, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def cmdline(pid):
+    if psutil:
+        try:
+            return psutil.Process(pid).cmdline()
+        except (psutil.Error, OSError):
+            return []
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().decode("utf-8", "replace").split("\0")
+    except OSError:
+        return []
+
+
+def tree_rss(pid):
+    """RSS của pid + toàn bộ tiến trình con"""
+    return rss(pid) + sum(rss(p) for p in descendants(pid))
+
+
+def renderer_count(pid):
+    return sum(1 for p in descendants(pid) if "--type=renderer" in cmdline(p))
+
+
+def available_memory():
+    """RAM còn dùng được (byte), None nếu không biết"""
+    if psutil:
+        return psutil.virtual_memory().available
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def load_per_cpu():
+    """Load average 1 phút chia số CPU, None trên Windows"""
+    if not hasattr(os, "getloadavg"):
+        return None
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from urllib.parse import urlsplit
+
+SCHEMA_VERSION = 6
+MIGRATED_KEY = "migrated_from_json"
+CHANGE_LOG_TTL_S = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id       INTEGER PRIMARY KEY,
+    url      TEXT NOT NULL UNIQUE,
+    title    TEXT NOT NULL,
+    host     TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    visits   INTEGER NOT NULL DEFAULT 0,
+    last_visit REAL
+);
+CREATE INDEX IF NOT EXISTS idx_bookmarks_host ON bookmarks(host);
+CREATE TABLE IF NOT EXISTS zoom (
+    host   TEXT PRIMARY KEY,
+    factor REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS link_status (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER NOT NULL,
+    final_url     TEXT,
+    error         TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    checked_at    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS favicons (
+    host       TEXT PRIMARY KEY,
+    hash       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind   TEXT NOT NULL,
+    key    TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    at     REAL NOT NULL
+);
+"""
+
+
+def url_host(url):
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+# --------------------------
+#  PROFILE DATABASE
+# --------------------------
+class ProfileDB:
+    """Bookmarks, zoom theo host và settings trong SQLite (WAL), cập nhật từng dòng.
+
+    Mỗi lần ghi cũng thêm một dòng vào bảng changes (kind, key, origin) để các
+    instance khác chỉ đọc lại đúng những gì đã đổi (xem changes_since).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.origin = uuid.uuid4().hex
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction():
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            self.upgrade()
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.conn.execute("DELETE FROM changes WHERE at < ?", (time.time() - CHANGE_LOG_TTL_S,))
+        self.last_seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def transaction(self):
+        return _Transaction(self.conn)
+
+    def upgrade(self):
+        """Nâng schema của profile cũ (CREATE IF NOT EXISTS không thêm cột)"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(bookmarks)")}
+        if "visits" not in columns:  # schema 2 -> 3
+            self.conn.execute("ALTER TABLE bookmarks ADD COLUMN visits INTEGER NOT NULL DEFAULT 0")
+        if "last_visit" not in columns:  # schema 5 -> 6
+            self.conn.execute("ALTER TABLE bookmarks ADD COLUMN last_visit REAL")
+
+    def close(self):
+        self.conn.close()
+
+    def watch_paths(self):
+        """File cần theo dõi để biết instance khác vừa ghi (WAL)"""
+        return [self.path, self.path + "-wal"]
+
+    # --------------------------
+    #  CHANGE LOG
+    # --------------------------
+    def _log(self, kind, key):
+        self.conn.execute(
+            "INSERT INTO changes(kind, key, origin, at) VALUES (?, ?, ?, ?)",
+            (kind, key, self.origin, time.time()))
+
+    def changes_since(self):
+        """[(kind, key)] do instance khác ghi kể từ lần gọi trước"""
+        rows = self.conn.execute(
+            "SELECT seq, kind, key, origin FROM changes WHERE seq > ? ORDER BY seq",
+            (self.last_seq,)).fetchall()
+        if not rows:
+            return []
+        self.last_seq = rows[-1]["seq"]
+        seen = {}
+        for row in rows:
+            if row["origin"] != self.origin:
+                seen[(row["kind"], row["key"])] = None
+        return list(seen)
+
+    # --------------------------
+    #  SETTINGS
+    # --------------------------
+    def get_setting(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_setting(self, key, value):
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO settings(key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)))
+            self._log("setting", key)
+
+    # --------------------------
+    #  BOOKMARKS
+    # --------------------------
+    def bookmarks(self):
+        rows = self.conn.execute("SELECT url, title, added_at, visits, last_visit FROM bookmarks ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def bookmark(self, url):
+        row = self.conn.execute(
+            "SELECT url, title, added_at, visits, last_visit FROM bookmarks WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def add_bookmark(self, url, title, added_at=None):
+        """True nếu thêm mới, False nếu url đã có"""
+        with self.transaction():
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO bookmarks(url, title, host, added_at) VALUES (?, ?, ?, ?)",
+                (url, title, url_host(url), added_at or time.time()))
+            if cur.rowcount > 0:
+                self._log("bookmark", url)
+        return cur.rowcount > 0
+
+    def delete_bookmark(self, url):
+        with self.transaction():
+            cur = self.conn.execute("DELETE FROM bookmarks WHERE url = ?", (url,))
+            if cur.rowcount > 0:
+                self.conn.execute("DELETE FROM link_status WHERE url = ?", (url,))
+                self._log("bookmark", url)
+        return cur.rowcount > 0
+
+    def visit_bookmark(self, url):
+        # Không ghi vào changes: số lần mở chỉ dùng để xếp hạng, không cần đồng bộ ngay
+        self.conn.execute("UPDATE bookmarks SET visits = visits + 1, last_visit = ? WHERE url = ?",
+                          (time.time(), url))
+
+    # --------------------------
+    #  LINK STATUS
+    # --------------------------
+    def stale_links(self, urls, max_age, error_max_age):
+        """[(url, etag, last_modified)] chưa kiểm tra hoặc kết quả đã cũ"""
+        now = time.time()
+        known = {row["url"]: row for row in self.conn.execute(
+            "SELECT url, status, etag, last_modified, checked_at FROM link_status")}
+        stale = []
+        for url in urls:
+            row = known.get(url)
+            if row is None:
+                stale.append((url, None, None))
+                continue
+            dead = row["status"] == 0 or row["status"] >= 400
+            if now - row["checked_at"] >= (error_max_age if dead else max_age):
+                stale.append((url, row["etag"], row["last_modified"]))
+        return stale
+
+    def save_link_results(self, results):
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO link_status"
+                "(url, status, final_url, error, etag, last_modified, checked_at) "
+                "VALUES (:url, :status, :final_url, :error, :etag, :last_modified, :checked_at)",
+                results)
+
+    def dead_links(self):
+        """Bookmark có kết quả kiểm tra lỗi gần nhất (status 0 = lỗi mạng)"""
+        rows = self.conn.execute(
+            "SELECT b.url, l.status, l.final_url, l.error FROM bookmarks b "
+            "JOIN link_status l ON l.url = b.url WHERE l.status = 0 OR l.status >= 400")
+        return [dict(row) for row in rows]
+
+    # --------------------------
+    #  FAVICONS
+    # --------------------------
+    def favicons(self):
+        """host -> hash của file PNG trong thư mục favicon"""
+        return {row["host"]: row["hash"] for row in self.conn.execute("SELECT host, hash FROM favicons")}
+
+    def set_favicon(self, host, digest):
+        self.conn.execute(
+            "INSERT INTO favicons(host, hash, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(host) DO UPDATE SET hash = excluded.hash, updated_at = excluded.updated_at",
+            (host, digest, time.time()))
+
+    # --------------------------
+    #  ZOOM
+    # --------------------------
+    def zoom(self, host, default=1.0):
+        row = self.conn.execute("SELECT factor FROM zoom WHERE host = ?", (host,)).fetchone()
+        return row["factor"] if row else default
+
+    def set_zoom(self, host, factor):
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO zoom(host, factor) VALUES (?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET factor = excluded.factor",
+                (host, factor))
+            self._log("zoom", host)
+
+    # --------------------------
+    #  MIGRATION
+    # --------------------------
+    def migrate_from_json(self, json_path):
+        """Nhập config.json / config_light.json cũ một lần (file JSON giữ nguyên)"""
+        if self.get_setting(MIGRATED_KEY) or not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Cannot migrate {json_path}: {e}")
+            return False
+        if not isinstance(config, dict):
+            return False
+
+        with self.transaction():
+            for bm in config.pop("bookmarks", []) or []:
+                if isinstance(bm, dict) and bm.get("url"):
+                    self.add_bookmark(bm["url"], bm.get("title") or bm["url"])
+            for host, factor in (config.pop("zoom_data", {}) or {}).items():
+                self.set_zoom(host, float(factor))
+            for key, value in config.items():
+                self.set_setting(key, value)
+            self.set_setting(MIGRATED_KEY, os.path.basename(json_path))
+        print(f"Migrated {json_path} -> {self.path}")
+        return True
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE (khoá ghi của SQLite); lồng nhau thì dùng transaction ngoài"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.outer = False
+
+    def __enter__(self):
+        self.outer = not self.conn.in_transaction
+        if self.outer:
+            self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.outer:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,305 @@
+import re
+import sys
+import json
+import time
+import queue
+from collections import OrderedDict
+from urllib.parse import quote_plus, urlsplit
+from urllib.request import Request, urlopen
+import xml.etree.ElementTree as ET
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+HTML_TYPE = "text/html"
+SUGGEST_TYPE = "application/x-suggestions+json"
+DEBOUNCE_MS = 150        # chờ ngừng gõ rồi mới hỏi server gợi ý
+MIN_QUERY = 2
+MAX_REMOTE = 5           # số gợi ý từ server hiện trong popup
+CACHE_SIZE = 256         # LRU theo (engine, chữ đã gõ)
+CACHE_TTL_S = 600
+TIMEOUT_S = 2
+USER_AGENT = "MiniBrowser-Suggest/1.0"
+TEMPLATE_PARAM_RE = re.compile(r"\{[^{}]*\}")
+
+# Engine có sẵn; người dùng thêm engine từ file OpenSearch (lưu trong setting "search_engines")
+BUILTIN_ENGINES = [
+    {"name": "Google", "keyword": "@g",
+     "search_url": "https://www.google.com/search?q={searchTerms}",
+     "suggest_url": "https://suggestqueries.google.com/complete/search?client=firefox&q={searchTerms}"},
+    {"name": "DuckDuckGo", "keyword": "@d",
+     "search_url": "https://duckduckgo.com/?q={searchTerms}",
+     "suggest_url": "https://duckduckgo.com/ac/?q={searchTerms}&type=list"},
+    {"name": "Bing", "keyword": "@b",
+     "search_url": "https://www.bing.com/search?q={searchTerms}",
+     "suggest_url": "https://api.bing.com/osjson.aspx?query={searchTerms}"},
+    {"name": "Wikipedia", "keyword": "@w",
+     "search_url": "https://en.wikipedia.org/wiki/Special:Search?search={searchTerms}",
+     "suggest_url": "https://en.wikipedia.org/w/api.php?action=opensearch&search={searchTerms}"},
+    {"name": "YouTube", "keyword": "@yt",
+     "search_url": "https://www.youtube.com/results?search_query={searchTerms}",
+     "suggest_url": "https://suggestqueries.google.com/complete/search?client=firefox&ds=yt&q={searchTerms}"},
+]
+DEFAULT_ENGINE = "Google"
+
+
+def fill_template(template, terms):
+    """Điền {searchTerms}; tham số OpenSearch khác ({count?}, {inputEncoding}...) để trống"""
+    return TEMPLATE_PARAM_RE.sub("", template.replace("{searchTerms}", quote_plus(terms)))
+
+
+# --------------------------
+#  OPENSEARCH
+# --------------------------
+def parse_opensearch(data, keyword=None):
+    """OpenSearch description (bytes / str XML) => dict engine; ValueError nếu không hợp lệ"""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise ValueError(f"OpenSearch XML không hợp lệ: {e}")
+    if root.tag != OPENSEARCH_NS + "OpenSearchDescription":
+        raise ValueError("Không phải OpenSearchDescription")
+    engine = {"name": (root.findtext(OPENSEARCH_NS + "ShortName") or "").strip(),
+              "keyword": keyword, "search_url": None, "suggest_url": None}
+    for url in root.iter(OPENSEARCH_NS + "Url"):
+        template = url.get("template")
+        if not template or (url.get("method") or "get").lower() != "get":
+            continue
+        if url.get("type") == HTML_TYPE and not engine["search_url"]:
+            engine["search_url"] = template
+        elif url.get("type") == SUGGEST_TYPE and not engine["suggest_url"]:
+            engine["suggest_url"] = template
+    if not engine["name"] or not engine["search_url"]:
+        raise ValueError("OpenSearch thiếu ShortName hoặc Url text/html")
+    return engine
+
+
+# --------------------------
+#  REGISTRY
+# --------------------------
+class SearchEngines:
+    """Danh sách engine (có sẵn + thêm từ OpenSearch), engine mặc định và từ khoá tắt.
+
+    "@w python" => tìm "python" trên Wikipedia; không có từ khoá => engine mặc định.
+    """
+
+    def __init__(self, custom=(), default=None):
+        self.engines = [dict(e) for e in BUILTIN_ENGINES]
+        self.custom = []
+        self.default = None
+        for engine in custom:
+            self.add(engine)
+        self.default = self.get(default) or self.get(DEFAULT_ENGINE)
+
+    def get(self, name):
+        for engine in self.engines:
+            if engine["name"] == name:
+                return engine
+        return None
+
+    def by_keyword(self, keyword):
+        for engine in self.engines:
+            if engine.get("keyword") and engine["keyword"] == keyword:
+                return engine
+        return None
+
+    def add(self, engine):
+        """Thêm / thay engine tự thêm (trùng tên), trả về engine"""
+        self.remove(engine["name"])
+        engine = dict(engine)
+        if engine.get("keyword") and self.by_keyword(engine["keyword"]):
+            engine["keyword"] = None  # từ khoá đã có engine khác dùng
+        self.engines.append(engine)
+        self.custom.append(engine)
+        return engine
+
+    def add_opensearch(self, data, keyword=None):
+        return self.add(parse_opensearch(data, keyword))
+
+    def remove(self, name):
+        """Chỉ xoá được engine tự thêm"""
+        engine = next((e for e in self.custom if e["name"] == name), None)
+        if engine is None:
+            return False
+        self.custom.remove(engine)
+        self.engines.remove(engine)
+        if self.default is engine:
+            self.default = self.get(DEFAULT_ENGINE)
+        return True
+
+    def set_default(self, name):
+        self.default = self.get(name) or self.default
+
+    def resolve(self, text):
+        """text => (engine, chữ cần tìm): từ khoá ở đầu chọn engine"""
+        text = text.strip()
+        keyword, _, rest = text.partition(" ")
+        engine = self.by_keyword(keyword) if rest.strip() else None
+        if engine is not None:
+            return engine, rest.strip()
+        return self.default, text
+
+    def search_url(self, text):
+        engine, terms = self.resolve(text)
+        return fill_template(engine["search_url"], terms)
+
+
+_builtin = None
+
+
+def search_url(text):
+    """URL tìm kiếm trên engine mặc định (cho các bản không có profile.db)"""
+    global _builtin
+    if _builtin is None:
+        _builtin = SearchEngines()
+    return _builtin.search_url(text)
+
+
+# --------------------------
+#  REMOTE SUGGESTIONS
+# --------------------------
+def urlopen_client(url, timeout=TIMEOUT_S):
+    """Client mặc định: GET url, trả về bytes (thay được bằng client khác, vd. để test)"""
+    req = Request(url, headers={"User-Agent": USER_AGENT})
+    with urlopen(req, timeout=timeout) as resp:
+        return resp.read()
+
+
+def parse_suggestions(data):
+    """OpenSearch suggestions: ["query", ["gợi ý 1", "gợi ý 2", ...], ...]"""
+    try:
+        doc = json.loads(data)
+    except ValueError:
+        return []
+    if isinstance(doc, list) and len(doc) > 1 and isinstance(doc[1], list):
+        return [s for s in doc[1] if isinstance(s, str)]
+    return []
+
+
+def fetch_suggestions(engine, terms, client=urlopen_client):
+    if not engine.get("suggest_url"):
+        return []
+    return parse_suggestions(client(fill_template(engine["suggest_url"], terms)))
+
+
+class _SuggestWorker(QThread):
+    """Một thread hỏi server; hàng đợi dồn nhiều yêu cầu thì chỉ làm yêu cầu mới nhất"""
+    fetched = pyqtSignal(object, str, list)  # key, text, gợi ý
+
+    def __init__(self, client, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.queue = queue.Queue()
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            while job is not None and not self.queue.empty():
+                job = self.queue.get()
+            if job is None:
+                return
+            key, text, engine, terms = job
+            try:
+                results = fetch_suggestions(engine, terms, self.client)
+            except Exception as e:  # lỗi mạng / server: bỏ qua lần gõ này
+                print(f"⚠ Search suggestions failed ({urlsplit(engine['suggest_url']).hostname}): {e}")
+                continue
+            self.fetched.emit(key, text, results)
+
+
+class SearchSuggester(QObject):
+    """Gợi ý tìm kiếm từ server của engine: debounce DEBOUNCE_MS, hỏi trên thread riêng,
+    kết quả giữ trong LRU theo (engine, chữ đã gõ) nên gõ lùi / gõ lại không hỏi lại."""
+    ready = pyqtSignal(str, list)  # text, [(gợi ý, url tìm kiếm)]
+
+    def __init__(self, engines, client=urlopen_client, parent=None):
+        super().__init__(parent)
+        self.engines = engines
+        self.client = client
+        self.cache = OrderedDict()
+        self.worker = None
+        self._latest = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.fetch)
+
+    def request(self, text):
+        self._timer.stop()
+        self._latest = text
+        engine, terms = self.engines.resolve(text)
+        if len(terms) < MIN_QUERY or not engine.get("suggest_url"):
+            self.ready.emit(text, [])
+            return
+        results = self.cached((engine["name"], terms.lower()))
+        if results is not None:
+            self.ready.emit(text, self.links(engine, results))
+        else:
+            self._timer.start(DEBOUNCE_MS)
+
+    def cached(self, key):
+        hit = self.cache.get(key)
+        if hit is None or time.time() - hit[0] > CACHE_TTL_S:
+            return None
+        self.cache.move_to_end(key)
+        return hit[1]
+
+    def fetch(self):
+        engine, terms = self.engines.resolve(self._latest)
+        if self.worker is None:
+            self.worker = _SuggestWorker(self.client, self)
+            self.worker.fetched.connect(self.on_fetched)
+            self.worker.start()
+        self.worker.queue.put(((engine["name"], terms.lower()), self._latest, engine, terms))
+
+    def on_fetched(self, key, text, results):
+        self.cache[key] = (time.time(), results)
+        self.cache.move_to_end(key)
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        if text == self._latest:
+            engine = self.engines.get(key[0])
+            if engine is not None:
+                self.ready.emit(text, self.links(engine, results))
+
+    @staticmethod
+    def links(engine, results):
+        return [(s, fill_template(engine["search_url"], s)) for s in results[:MAX_REMOTE]]
+
+    def stop(self):
+        self._timer.stop()
+        if self.worker is not None:
+            self.worker.queue.put(None)
+            if not self.worker.wait(int(TIMEOUT_S * 1000) + 500):
+                # Kẹt ở DNS (timeout của socket không tính phần phân giải tên): huỷ QThread
+                # đang chạy thì Qt abort cả tiến trình => dừng cưỡng bức rồi mới huỷ
+                print("⚠ Search suggestion worker did not stop, terminating")
+                self.worker.terminate()
+                self.worker.wait()
+
+
+# --------------------------
+#  COMMAND LINE
+# --------------------------
+def main():
+    """python search_engines.py [--suggest-url TEMPLATE | --engine NAME | --opensearch FILE] TEXT
+
+    In URL tìm kiếm và gợi ý từ server (dùng được với server giả trên 127.0.0.1)."""
+    args = sys.argv[1:]
+    engines = SearchEngines()
+    while len(args) > 1 and args[0].startswith("--"):
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--engine":
+            engines.set_default(value)
+        elif flag == "--opensearch":
+            with open(value, "rb") as f:
+                engines.set_default(engines.add_opensearch(f.read())["name"])
+        elif flag == "--suggest-url":
+            engines.set_default(engines.add({"name": "cli", "keyword": None, "suggest_url": value,
+                                             "search_url": engines.default["search_url"]})["name"])
+    text = " ".join(args)
+    engine, terms = engines.resolve(text)
+    print(json.dumps({"engine": engine["name"], "search_url": engines.search_url(text),
+                      "suggestions": fetch_suggestions(engine, terms)}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import re
+import math
+import heapq
+from urllib.parse import urlsplit
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_PREFIX = 6        # prefix n-gram 1..6 ký tự; dài hơn thì lọc thêm bằng startswith
+SCORE_LIMIT = 500     # số ứng viên tối đa được chấm điểm chi tiết
+EXPAND_LIMIT = 128    # prefix quá ngắn khớp quá nhiều token => chỉ lấy token phổ biến nhất
+PARTIAL_LIMIT = 30000  # tổng postings gộp cho một prefix (gõ thêm ký tự thì lại đầy đủ)
+DENSE_TIER = 4096     # nhiều kết quả hơn => lấy theo thứ tự visits từng khúc thay vì sắp xếp cả tập
+RANK_CHUNK = 2048     # số id mỗi khúc thứ tự visits
+SCAN_LIMIT = 16384    # tier dày: duyệt tối đa từng này id theo visits rồi mới giao cả tập
+RERANK_VISITS = 0.01  # visits đổi trên 1% số mục thì mới sắp xếp lại thứ tự visits
+BUILD_BATCH = 1000    # số bookmark thêm vào index mỗi lượt khi dựng dần (~20 ms)
+TIER_CACHE_SIZE = 64  # tier của các từ vừa gõ (gõ thêm từ mới không tính lại từ cũ)
+SKIP_HOST_TOKENS = {"www", "m", "com", "net", "org"}
+
+# Trọng số field: khớp ở title quan trọng hơn host, host hơn path
+TITLE, HOST, PATH = 0, 1, 2
+FIELD_WEIGHT = (3.0, 2.0, 1.0)
+EXACT_BONUS = 2.0     # token khớp nguyên vẹn so với chỉ khớp prefix
+VISIT_WEIGHT = 1.5    # nhân với log(1 + visits)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def url_fields(url):
+    """(host tokens, path tokens) của một URL"""
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return [], tokenize(url)
+    host_tokens = [t for t in host.split(".") if t and t not in SKIP_HOST_TOKENS]
+    return host_tokens, tokenize(f"{parts.path} {parts.query}")
+
+
+# --------------------------
+#  INVERTED INDEX
+# --------------------------
+class SearchIndex:
+    """Inverted index trong RAM cho ô tìm kiếm bookmark / history.
+
+    token -> tập id theo từng field (title, host, path), cộng bảng prefix n-gram
+    prefix -> tập token để gõ dở vẫn ra kết quả. Thêm / xoá / visit đều cập nhật
+    tại chỗ, không dựng lại index. Mỗi key có một id số nguyên (giao tập int nhanh
+    gấp đôi tập chuỗi URL); phép giao / hợp tập chạy trong C nên truy vấn trên 100k
+    mục vẫn dưới vài ms.
+    """
+
+    def __init__(self):
+        self._ids = {}        # key -> id
+        self._next_id = 0
+        self._docs = {}       # id -> (doc, {field: tokens})
+        self._visits = {}     # id -> số lần mở
+        self._postings = ({}, {}, {})  # theo field: token -> set(id)
+        self._prefixes = {}   # prefix -> set(token)
+        self._token_refs = {}  # token -> số (key, field) còn dùng, để dọn prefix
+        self._ranked = None   # cache thứ tự theo visits: list khúc set id (xem ranked_chunks)
+        self._stale_visits = 0
+        self._tier_cache = {}  # term -> tiers, xoá khi index đổi
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    # --------------------------
+    #  UPDATES
+    # --------------------------
+    def add(self, key, title, url, visits=0, doc=None):
+        if key in self._ids:
+            self.remove(key)
+        self._tier_cache.clear()
+        doc_id = self._next_id
+        self._next_id += 1
+        self._ids[key] = doc_id
+        host_tokens, path_tokens = url_fields(url)
+        fields = (set(tokenize(title)), set(host_tokens), set(path_tokens))
+        refs = self._token_refs
+        for postings, tokens in zip(self._postings, fields):
+            for token in tokens:
+                postings.setdefault(token, set()).add(doc_id)
+                if token in refs:
+                    refs[token] += 1
+                else:
+                    self._new_token(token)
+        self._docs[doc_id] = (doc if doc is not None else key, fields)
+        self._visits[doc_id] = visits
+        if self._ranked is not None:
+            if visits:
+                self._ranked = None
+            elif len(self._ranked[-1]) < RANK_CHUNK:
+                self._ranked[-1].add(doc_id)
+            else:
+                self._ranked.append({doc_id})
+
+    def remove(self, key):
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        entry = self._docs.pop(doc_id)
+        self._tier_cache.clear()
+        self._visits.pop(doc_id, None)
+        for field, tokens in enumerate(entry[1]):
+            postings = self._postings[field]
+            for token in tokens:
+                keys = postings.get(token)
+                if keys is not None:
+                    keys.discard(doc_id)
+                    if not keys:
+                        del postings[token]
+                self._unref_token(token)
+
+    def visit(self, key, count=1):
+        doc_id = self._ids.get(key)
+        if doc_id is not None:
+            self._visits[doc_id] += count
+            # Thứ tự visits chỉ để chọn ứng viên (điểm tính lại từ visits thật) => chấp nhận hơi cũ
+            self._stale_visits += count
+            if self._stale_visits > len(self._visits) * RERANK_VISITS:
+                self._ranked = None
+
+    def _new_token(self, token):
+        self._token_refs[token] = 1
+        for n in range(1, min(len(token), MAX_PREFIX) + 1):
+            self._prefixes.setdefault(token[:n], set()).add(token)
+
+    def _unref_token(self, token):
+        refs = self._token_refs.get(token, 0) - 1
+        if refs > 0:
+            self._token_refs[token] = refs
+            return
+        self._token_refs.pop(token, None)
+        for n in range(1, min(len(token), MAX_PREFIX) + 1):
+            tokens = self._prefixes.get(token[:n])
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._prefixes[token[:n]]
+
+    # --------------------------
+    #  QUERY
+    # --------------------------
+    def expand(self, term):
+        """Các token trong index bắt đầu bằng term (tối đa EXPAND_LIMIT token phổ biến nhất)"""
+        tokens = self._prefixes.get(term[:MAX_PREFIX], ())
+        if len(term) > MAX_PREFIX:
+            tokens = [t for t in tokens if t.startswith(term)]
+        if len(tokens) > EXPAND_LIMIT:
+            # gõ thêm ký tự thì tập này nhỏ lại và lại đầy đủ
+            tokens = heapq.nlargest(EXPAND_LIMIT, tokens, key=self._token_refs.__getitem__)
+        return tokens
+
+    def _term_tiers(self, term):
+        """[(điểm, set id)] cho một từ: khớp nguyên vẹn / prefix ở từng field"""
+        tiers = self._tier_cache.get(term)
+        if tiers is not None:
+            return tiers
+        tokens = self.expand(term)
+        tiers = []
+        for field, postings in enumerate(self._postings):
+            weight = FIELD_WEIGHT[field]
+            exact = postings.get(term)
+            if exact:
+                tiers.append((weight * EXACT_BONUS, exact))
+            partial = sorted((postings[t] for t in tokens if t != term and t in postings), key=len, reverse=True)
+            total = 0
+            for n, keys in enumerate(partial):
+                total += len(keys)
+                if total >= PARTIAL_LIMIT:
+                    partial = partial[:n + 1]
+                    break
+            if partial:
+                # Một token thì dùng thẳng postings (chỉ đọc), khỏi copy tập lớn
+                tiers.append((weight, partial[0] if len(partial) == 1 else set().union(*partial)))
+        tiers.sort(key=lambda t: -t[0])
+        if len(self._tier_cache) >= TIER_CACHE_SIZE:
+            self._tier_cache.pop(next(iter(self._tier_cache)))
+        self._tier_cache[term] = tiers
+        return tiers
+
+    def search(self, query, limit=50):
+        """Tất cả các từ phải khớp (từ cuối tính cả prefix); trả về list doc"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        term_tiers = []
+        for term in terms:
+            tiers = self._term_tiers(term)
+            if not tiers:
+                return []
+            term_tiers.append(tiers)
+        # Từ hiếm nhất sinh ứng viên, các từ còn lại chỉ lọc
+        term_tiers.sort(key=lambda tiers: sum(len(s) for _, s in tiers))
+        pool = self._pool(term_tiers[0], term_tiers[1:])
+
+        # Điểm khớp của từng từ = tier cao nhất chứa id (tiers đã xếp theo điểm giảm dần)
+        visits = self._visits
+        scored = []
+        for doc_id in pool:
+            score = VISIT_WEIGHT * math.log1p(visits[doc_id])
+            for tiers in term_tiers:
+                for weight, ids in tiers:
+                    if doc_id in ids:
+                        score += weight
+                        break
+            scored.append((score, doc_id))
+        scored.sort(reverse=True)
+        docs = self._docs
+        return [docs[doc_id][0] for _, doc_id in scored[:limit]]
+
+    @staticmethod
+    def _matching(ids, others):
+        """ids khớp mọi từ trong others (giao trong C, duyệt theo tập nhỏ hơn)"""
+        for tiers in others:
+            if len(tiers) == 1:
+                ids = ids & tiers[0][1]
+            else:
+                ids = set().union(*(ids & s for _, s in tiers))
+            if not ids:
+                break
+        return ids
+
+    def _top_visited(self, ids, room):
+        return sorted(ids, key=self._visits.__getitem__, reverse=True)[:room]
+
+    def _pool(self, source, others):
+        """Các id sẽ được chấm điểm, tối đa SCORE_LIMIT.
+
+        Lấy lần lượt từ tier điểm cao xuống của từ hiếm nhất; tier nào vượt quá giới
+        hạn thì chỉ lấy các mục được mở nhiều nhất.
+        """
+        pool = set()
+        for _, ids in source:
+            room = SCORE_LIMIT - len(pool)
+            if len(ids) <= DENSE_TIER:
+                found = self._matching(ids, others) - pool
+                pool.update(self._top_visited(found, room) if len(found) > room else found)
+            else:
+                pool.update(self._most_visited(ids, others, room, pool))
+            if len(pool) >= SCORE_LIMIT:
+                break
+        return pool
+
+    def _most_visited(self, ids, others, room, exclude):
+        """room id khớp mọi từ, visits cao nhất, trong tier dày ids.
+
+        Duyệt thứ tự visits từng khúc RANK_CHUNK (mỗi khúc giao trong C) và dừng khi đủ;
+        từ ghép hiếm khi đi cùng nhau (quét quá SCAN_LIMIT) thì giao nốt cả tập.
+        """
+        picked = []
+        scanned = 0
+        for chunk in self.ranked_chunks():
+            found = self._matching(chunk & ids, others)
+            if exclude:
+                found -= exclude
+            if len(found) >= room:
+                return picked + self._top_visited(found, room)
+            picked.extend(found)
+            room -= len(found)
+            scanned += RANK_CHUNK
+            if scanned >= SCAN_LIMIT and scanned < len(self._visits):
+                rest = self._matching(ids, others) - exclude - set(picked)
+                return picked + self._top_visited(rest, room)
+        return picked
+
+    def ranked_chunks(self):
+        """Id theo số lần mở giảm dần, chia khúc RANK_CHUNK; chỉ sắp xếp lại khi visits đổi nhiều"""
+        if self._ranked is None:
+            ranked = sorted(self._visits, key=self._visits.__getitem__, reverse=True)
+            self._ranked = [set(ranked[i:i + RANK_CHUNK]) for i in range(0, len(ranked), RANK_CHUNK)] or [set()]
+            self._stale_visits = 0
+        return self._ranked
+
+
+def bookmark_index(store):
+    """SearchIndex trên BookmarkStore (dựng ngay), cập nhật theo listener của store"""
+    index, steps = bookmark_index_builder(store)
+    for _ in steps:
+        pass
+    return index
+
+
+def bookmark_index_builder(store, batch=BUILD_BATCH):
+    """(index, generator): index đã nối listener của store, mỗi next() thêm batch bookmark.
+
+    Chạy generator từng lượt trên event loop => không đứng GUI khi có 100k bookmark;
+    index dùng được ngay (kết quả thiếu các bookmark chưa tới lượt).
+    """
+    index = SearchIndex()
+
+    def on_change(event, bm):
+        if event == "added":
+            index.add(bm["url"], bm["title"], bm["url"], bm.get("visits", 0), doc=bm)
+        elif event == "removed":
+            index.remove(bm["url"])
+        elif event == "visited":
+            index.visit(bm["url"])
+
+    def steps():
+        bookmarks = list(store)
+        for i in range(0, len(bookmarks), batch):
+            for bm in bookmarks[i:i + batch]:
+                # Đã xoá hoặc đã được listener thêm trong lúc dựng => bỏ qua
+                if bm["url"] not in index and store.get(bm["url"]) is bm:
+                    index.add(bm["url"], bm["title"], bm["url"], bm.get("visits", 0), doc=bm)
+            yield
+        index.ranked_chunks()
+
+    store.listeners.append(on_change)
+    return index, steps()
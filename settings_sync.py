@@ -0,0 +1,76 @@
+import os
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+NOTIFY_DELAY_MS = 150
+
+
+# --------------------------
+#  ADVISORY LOCK
+# --------------------------
+class FileLock:
+    """Khoá advisory trên file <path>.lock, dùng chung giữa các instance"""
+
+    def __init__(self, path):
+        self.lock_path = path + ".lock"
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.lock_path, "a+")
+        if fcntl:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        else:
+            self._f.seek(0)
+            msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            else:
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._f.close()
+            self._f = None
+        return False
+
+
+# --------------------------
+#  CHANGE WATCHER
+# --------------------------
+class FileChangeWatcher(QObject):
+    """QFileSystemWatcher + debounce. Theo dõi cả thư mục vì os.replace đổi inode"""
+    changed = pyqtSignal()
+
+    def __init__(self, paths, delay_ms=NOTIFY_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.watcher = QFileSystemWatcher(self)
+        dirs = sorted({os.path.dirname(p) for p in self.paths})
+        self.watcher.addPaths(dirs)
+        self.rewatch()
+        self.watcher.fileChanged.connect(self.on_event)
+        self.watcher.directoryChanged.connect(self.on_event)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.changed)
+
+    def rewatch(self):
+        watched = set(self.watcher.files())
+        missing = [p for p in self.paths if p not in watched and os.path.exists(p)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_event(self, path):
+        # Sự kiện thư mục có thể do file khác => người nhận tự so sánh nội dung
+        self.rewatch()
+        self._timer.start()
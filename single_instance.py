@@ -0,0 +1,82 @@
+import json
+import getpass
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT_MS = 200
+ALIVE_TIMEOUT_MS = 3000  # instance đầu có thể đang bận (tải trang, mở DB) => chờ lâu hơn trước khi coi là đã chết
+WRITE_TIMEOUT_MS = 500
+
+
+# --------------------------
+#  SINGLE INSTANCE
+# --------------------------
+class SingleInstance(QObject):
+    """Chỉ chạy một MiniBrowser: lần chạy thứ hai gửi URL qua QLocalSocket rồi thoát"""
+    urlsReceived = pyqtSignal(list)
+
+    def __init__(self, name=None, parent=None):
+        super().__init__(parent)
+        self.name = name or f"MiniBrowser-{getpass.getuser()}"
+        self.server = None
+        self._buffers = {}
+
+    def forward(self, urls, timeout_ms=CONNECT_TIMEOUT_MS):
+        """Gửi urls tới instance đang chạy. True nếu đã gửi (tiến trình này nên thoát)"""
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(timeout_ms):
+            return False
+        socket.write((json.dumps({"urls": list(urls)}) + "\n").encode("utf-8"))
+        socket.waitForBytesWritten(WRITE_TIMEOUT_MS)
+        socket.disconnectFromServer()
+        if socket.state() != QLocalSocket.UnconnectedState:
+            socket.waitForDisconnected(WRITE_TIMEOUT_MS)
+        return True
+
+    def alive(self):
+        """Có instance trả lời trên socket không (chờ ALIVE_TIMEOUT_MS)"""
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(ALIVE_TIMEOUT_MS):
+            return False
+        socket.abort()
+        return True
+
+    def listen(self):
+        """False nếu instance đầu vẫn sống (chỉ bận) hoặc không listen được"""
+        # Kiểm tra trước: với socket options, Qt tạo socket ở thư mục tạm rồi rename đè lên
+        # socket cũ => listen() thành công cả khi instance đầu còn sống
+        if self.alive():
+            return False
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        if not self.server.listen(self.name):
+            # Không ai trả lời => socket cũ còn sót lại sau khi crash: xoá rồi thử lại
+            QLocalServer.removeServer(self.name)
+            if not self.server.listen(self.name):
+                print(f"⚠ Single-instance server failed: {self.server.errorString()}")
+                return False
+        self.server.newConnection.connect(self.on_new_connection)
+        return True
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self.on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self.on_disconnected(s))
+
+    def on_ready_read(self, socket):
+        self._buffers[socket] = self._buffers.get(socket, b"") + bytes(socket.readAll())
+
+    def on_disconnected(self, socket):
+        self.on_ready_read(socket)
+        data = self._buffers.pop(socket, b"")
+        socket.deleteLater()
+        for line in data.decode("utf-8", "replace").splitlines():
+            try:
+                urls = json.loads(line).get("urls", [])
+            except (ValueError, AttributeError):
+                continue
+            self.urlsReceived.emit([u for u in urls if isinstance(u, str)])
@@ -0,0 +1,192 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from proc_stats import cpu_time
+
+BACKGROUND_GRACE_MS = 30000   # tab ẩn bao lâu thì bị freeze
+READOUT_INTERVAL_MS = 5000
+
+# Tạm dừng video đang tự phát mà không có tiếng (autoplay muted)
+PAUSE_MUTED_VIDEO_JS = """
+(function() {
+    document.querySelectorAll('video').forEach(function(v) {
+        if (!v.paused && (v.muted || v.volume === 0)) {
+            v.pause();
+            v.dataset.mbSuspended = "1";
+        }
+    });
+})();
+"""
+
+# Chỉ phát lại các video do policy tạm dừng
+RESUME_VIDEO_JS = """
+(function() {
+    document.querySelectorAll('video[data-mb-suspended]').forEach(function(v) {
+        delete v.dataset.mbSuspended;
+        v.play().catch(function() {});
+    });
+})();
+"""
+
+
+# --------------------------
+#  TAB STATE
+# --------------------------
+class _TabState:
+    def __init__(self):
+        self.timer = None
+        self.frozen = False
+        self.hidden_at = None
+        self.hidden_cpu = None
+        self.frozen_at = None
+        self.cpu_rate = 0.0  # CPU giây / giây khi tab ẩn nhưng chưa freeze
+
+
+# --------------------------
+#  BACKGROUND TAB POLICY
+# --------------------------
+class TabSuspensionPolicy(QObject):
+    """Freeze tab nền sau thời gian chờ, dừng video muted, đo CPU tiết kiệm được"""
+    readoutChanged = pyqtSignal(str)
+    resumed = pyqtSignal(object)  # web vừa hết freeze
+
+    def __init__(self, tabs, grace_ms=BACKGROUND_GRACE_MS, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.grace_ms = grace_ms
+        self._states = {}
+        self._current = None
+        self._cpu_saved = 0.0
+
+        self._readout_timer = QTimer(self)
+        self._readout_timer.setInterval(READOUT_INTERVAL_MS)
+        self._readout_timer.timeout.connect(self.update_readout)
+
+        self.tabs.currentChanged.connect(self.on_current_changed)
+
+    # --------------------------
+    #  TRACKING
+    # --------------------------
+    def track(self, web):
+        """Gọi sau khi tab đã được thêm vào QTabWidget"""
+        if web in self._states:
+            return
+        self._states[web] = _TabState()
+        web.page().recentlyAudibleChanged.connect(
+            lambda audible, w=web: self.on_audible_changed(w, audible))
+        if self.current_web() is web:
+            self._current = web
+        else:
+            self.on_hidden(web)
+
+    def untrack(self, web):
+        state = self._states.pop(web, None)
+        if state is None:
+            return
+        if state.timer:
+            state.timer.stop()
+        if state.frozen:
+            self._cpu_saved += state.cpu_rate * (time.monotonic() - state.frozen_at)
+        if self._current is web:
+            self._current = None
+        self.update_readout()
+
+    def current_web(self):
+        tab = self.tabs.currentWidget()
+        return tab.web if tab else None
+
+    # --------------------------
+    #  VISIBILITY
+    # --------------------------
+    def on_current_changed(self, index):
+        web = self.current_web()
+        if web is self._current:
+            return
+        previous = self._current
+        self._current = web
+        if previous in self._states:
+            self.on_hidden(previous)
+        if web in self._states:
+            self.on_visible(web)
+
+    def on_hidden(self, web):
+        state = self._states[web]
+        web.page().runJavaScript(PAUSE_MUTED_VIDEO_JS)
+        state.hidden_at = time.monotonic()
+        state.hidden_cpu = cpu_time(self.renderer_pid(web))
+        self.start_grace_timer(web)
+
+    def on_visible(self, web):
+        state = self._states[web]
+        if state.timer:
+            state.timer.stop()
+        if state.frozen:
+            state.frozen = False
+            self._cpu_saved += state.cpu_rate * (time.monotonic() - state.frozen_at)
+            web.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            self.resumed.emit(web)
+        web.page().runJavaScript(RESUME_VIDEO_JS)
+        self.update_readout()
+
+    def on_audible_changed(self, web, audible):
+        # Tab nền vừa tắt tiếng => bắt đầu đếm lại thời gian chờ
+        if not audible and web is not self._current and web in self._states:
+            self.start_grace_timer(web)
+
+    def start_grace_timer(self, web):
+        state = self._states[web]
+        if state.timer is None:
+            state.timer = QTimer(self)
+            state.timer.setSingleShot(True)
+            state.timer.timeout.connect(lambda w=web: self.freeze(w))
+        state.timer.start(self.grace_ms)
+
+    # --------------------------
+    #  FREEZE
+    # --------------------------
+    def freeze(self, web):
+        state = self._states.get(web)
+        if state is None or state.frozen or web is self._current:
+            return
+        page = web.page()
+        if page.recentlyAudible():
+            return  # người dùng đang nghe nhạc nền, không freeze
+
+        now = time.monotonic()
+        cpu_now = cpu_time(self.renderer_pid(web))
+        if cpu_now is not None and state.hidden_cpu is not None and now > state.hidden_at:
+            state.cpu_rate = max(0.0, (cpu_now - state.hidden_cpu) / (now - state.hidden_at))
+        state.frozen = True
+        state.frozen_at = now
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+        self.update_readout()
+
+    def renderer_pid(self, web):
+        page = web.page()
+        return page.renderProcessPid() if hasattr(page, "renderProcessPid") else None
+
+    # --------------------------
+    #  READOUT
+    # --------------------------
+    def cpu_saved(self):
+        """CPU giây tiết kiệm được (ước lượng) kể cả các tab đang freeze"""
+        now = time.monotonic()
+        running = sum(s.cpu_rate * (now - s.frozen_at)
+                      for s in self._states.values() if s.frozen)
+        return self._cpu_saved + running
+
+    def is_frozen(self, web):
+        state = self._states.get(web)
+        return bool(state and state.frozen)
+
+    def frozen_count(self):
+        return sum(1 for s in self._states.values() if s.frozen)
+
+    def update_readout(self):
+        frozen = self.frozen_count()
+        if frozen:
+            self._readout_timer.start()
+        else:
+            self._readout_timer.stop()
+        self.readoutChanged.emit(f"💤 {frozen} frozen · CPU saved {self.cpu_saved():.1f}s")
@@ -0,0 +1,108 @@
+"""Kiểm tra url_classifier trên vài chục nghìn chuỗi gõ có nhãn (mỗi luật trong Public Suffix
+List, IP, port, localhost, intranet, từ khoá, tên file...).
+
+    python -m unittest discover -s tests -t .
+"""
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import url_classifier
+from url_classifier import classify, public_suffixes
+
+WORDS = ("python news video music github docs tutorial release article guide "
+         "linux kernel rust browser weather mail intranet build").split()
+FILE_EXTS = ["txt", "csv", "jpeg", "exe", "docx", "tar", "gz", "json", "yaml", "h", "cpp"]
+SCHEMES = ["http://", "https://", "ftp://", "file:///", "view-source:http://", "git+ssh://"]
+KNOWN_HOSTS = {"wiki", "jenkins", "nas", "wiki.corp", "build.intra", "nas.home"}
+SEED = 7
+MIN_CASES = 40000
+MAX_MISMATCHES = 20   # số chỗ sai in ra khi test hỏng
+
+
+def psl_cases(psl, path):
+    """Mỗi luật PSL: "<nhãn>.<luật>" là URL ("*" thay bằng một nhãn, "!" bỏ đi)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            rule = line.strip()
+            if not rule or rule.startswith("//"):
+                continue
+            rule = rule.split()[0].lstrip("!").replace("*", "x")
+            yield f"example.{rule}", "url"
+            yield f"Shop.{rule}/cart?id=1", "url"
+
+
+def make_cases(psl, rnd):
+    """[(chuỗi gõ, "url" | "search")]"""
+    cases = list(psl_cases(psl, url_classifier.PSL_FILE))
+    tlds = sorted(label for label in psl.root if label != url_classifier.WILDCARD)
+    for tld in tlds:
+        cases.append((f"{rnd.choice(WORDS)}.{tld}", "url"))
+        cases.append((f"{rnd.choice(WORDS)}.{tld}:{rnd.randrange(1, 65536)}/a", "url"))
+        cases.append((f"user@{rnd.choice(WORDS)}.{tld}#top", "url"))
+    for ext in FILE_EXTS:
+        if not psl.is_tld(ext):
+            cases.append((f"{rnd.choice(WORDS)}.{ext}", "search"))
+    for _ in range(2000):
+        a, b, c, d = (rnd.randrange(256) for _ in range(4))
+        cases.append((f"{a}.{b}.{c}.{d}", "url"))
+        cases.append((f"{a}.{b}.{c}.{d}:{rnd.randrange(1, 65536)}/x", "url"))
+        cases.append((f"v{a}.{b}", "search"))
+        cases.append((f"{a}.{b}", "search"))
+        cases.append((f"{a}.{b}.{c}", "search"))
+        cases.append((f"{rnd.choice(WORDS)} {rnd.choice(WORDS)}.com", "search"))
+        cases.append((" ".join(rnd.sample(WORDS, 3)), "search"))
+        cases.append((rnd.choice(WORDS), "search"))
+        cases.append((rnd.choice(WORDS) + "/", "url"))
+        cases.append((f"{rnd.choice(WORDS)}:{rnd.randrange(1, 65536)}", "url"))
+        cases.append((f"{rnd.choice(WORDS)}:{rnd.randrange(65536, 99999)}", "search"))
+        cases.append((rnd.choice(SCHEMES) + rnd.choice(WORDS), "url"))
+        cases.append((f"[::{a:x}]:{rnd.randrange(1, 65536)}", "url"))
+    cases += [("localhost", "url"), ("localhost:8080", "url"), ("app.localhost:3000/x", "url"),
+              ("intranet.", "url"), ("about:blank", "url"), ("mailto:a@b.com", "url"),
+              ("c++: the book", "search"), ("", "search"), ("-bad-.com", "search")]
+    cases += [(host, "url") for host in KNOWN_HOSTS]
+    cases += [(f"{host}/status", "url") for host in KNOWN_HOSTS]
+    cases += [("printer.local", "url"), ("router.lan", "url"), ("nas.internal:5000", "url"),
+              ("unknown.corp", "search"), ("report.draft", "search")]
+    # Khoảng trắng: chỉ trong phần host mới là tìm kiếm
+    cases += [("example.com/a b", "url"), ("github.com/search?q=rust lang", "url"),
+              ("wiki.corp/release notes", "url"), ("example.com#top section", "url"),
+              ("python news.com/x", "search"), ("what is a/b", "search"), ("foo bar:8080", "search")]
+    return cases
+
+
+class ClassifyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.psl = public_suffixes()
+        cls.cases = make_cases(cls.psl, random.Random(SEED))
+
+    def test_labelled_cases(self):
+        self.assertGreaterEqual(len(self.cases), MIN_CASES)
+        mismatches = []
+        for text, expected in self.cases:
+            kind, _ = classify(text, known_host=KNOWN_HOSTS.__contains__, psl=self.psl)
+            if kind != expected:
+                mismatches.append((text, expected, kind))
+        self.assertFalse(mismatches, f"{len(mismatches)} mismatches (input, expected, got), "
+                                     f"first {MAX_MISMATCHES}: {mismatches[:MAX_MISMATCHES]}")
+
+    def test_unknown_single_label_is_search(self):
+        self.assertEqual(classify("jenkins", psl=self.psl)[0], "search")
+        self.assertEqual(classify("jenkins", known_host=KNOWN_HOSTS.__contains__, psl=self.psl)[0], "url")
+
+    def test_known_multi_label_intranet_host(self):
+        self.assertEqual(classify("wiki.corp", psl=self.psl)[0], "search")
+        self.assertEqual(classify("wiki.corp", known_host=KNOWN_HOSTS.__contains__, psl=self.psl),
+                         ("url", "http://wiki.corp"))
+
+    def test_whitespace_in_path_keeps_url(self):
+        self.assertEqual(classify("example.com/a b", psl=self.psl), ("url", "http://example.com/a b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import os
+import re
+import sys
+import ipaddress
+
+PSL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat")
+SYSTEM_PSL_FILE = "/usr/share/publicsuffix/public_suffix_list.dat"  # Debian / Ubuntu: gói publicsuffix
+DEFAULT_SCHEME = "http://"
+URL_SCHEMES = {"http", "https", "ftp", "file", "about", "data", "view-source", "chrome", "qrc", "mailto", "blob"}
+LOCAL_HOSTS = {"localhost"}
+# TLD nội bộ không có trong PSL: mDNS (.local), .internal (ICANN dành riêng), .lan của router
+INTRANET_TLDS = {"local", "internal", "lan"}
+
+SCHEME_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*):")
+LABEL_RE = re.compile(r"^(?!-)[a-z0-9_-]{1,63}(?<!-)$")
+PORT_RE = re.compile(r"^(.*):(\d{1,5})$")
+AUTHORITY_RE = re.compile(r"[^/?#]*")  # phần trước path / query / fragment
+
+RULE, EXCEPTION, WILDCARD = "$", "!", "*"
+
+
+# --------------------------
+#  PUBLIC SUFFIX LIST
+# --------------------------
+def _ascii_label(label):
+    """Nhãn IDN => punycode (xn--...), nhãn ASCII => chữ thường"""
+    label = label.lower()
+    if label.isascii():
+        return label
+    try:
+        return label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return label
+
+
+class PublicSuffixList:
+    """PSL dạng trie theo nhãn từ phải sang trái: "co.uk" => root["uk"]["co"].
+
+    Nút là dict nhãn -> nút con, cộng khoá RULE / EXCEPTION đánh dấu luật kết thúc
+    tại đó. Nhãn được intern nên hơn 9000 luật chỉ tốn vài trăm KB.
+    """
+
+    def __init__(self, rules=()):
+        self.root = {}
+        self.rules = 0
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_file(cls, path):
+        psl = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                rule = line.strip()
+                if rule and not rule.startswith("//"):
+                    psl.add(rule.split()[0])
+        return psl
+
+    def add(self, rule):
+        exception = rule.startswith("!")
+        labels = rule.lstrip("!").split(".")
+        node = self.root
+        for label in reversed(labels):
+            label = sys.intern(label if label == WILDCARD else _ascii_label(label))
+            node = node.setdefault(label, {})
+        node[EXCEPTION if exception else RULE] = True
+        self.rules += 1
+
+    def is_tld(self, label):
+        return _ascii_label(label) in self.root
+
+    def suffix_length(self, labels):
+        """Số nhãn của public suffix (luật dài nhất; luật ngoại lệ "!" thắng; mặc định "*" = 1)"""
+        match = 1
+        frontier = [self.root]
+        for depth in range(1, len(labels) + 1):
+            label = labels[-depth]
+            found = []
+            for node in frontier:
+                child = node.get(label)
+                if child is not None:
+                    if EXCEPTION in child:
+                        return depth - 1
+                    found.append(child)
+                wild = node.get(WILDCARD)
+                if wild is not None:
+                    found.append(wild)
+            if not found:
+                break
+            if any(RULE in node for node in found):
+                match = depth
+            frontier = found
+        return match
+
+    def public_suffix(self, host):
+        labels = [_ascii_label(l) for l in host.rstrip(".").split(".")]
+        return ".".join(labels[-self.suffix_length(labels):])
+
+    def registrable_domain(self, host):
+        """eTLD+1 ("news.bbc.co.uk" => "bbc.co.uk"); None nếu host chính là public suffix"""
+        labels = [_ascii_label(l) for l in host.rstrip(".").split(".")]
+        n = self.suffix_length(labels)
+        return ".".join(labels[-n - 1:]) if len(labels) > n else None
+
+
+_psl = None
+
+
+def public_suffixes():
+    """PSL nạp lần đầu khi cần rồi giữ trong RAM (file đi kèm, thiếu thì dùng bản của hệ thống)"""
+    global _psl
+    if _psl is None:
+        for path in (PSL_FILE, SYSTEM_PSL_FILE):
+            try:
+                _psl = PublicSuffixList.from_file(path)
+                break
+            except OSError:
+                continue
+        else:
+            print("⚠ Public Suffix List not found, treating every dotted host as a URL")
+            _psl = PublicSuffixList([WILDCARD])
+    return _psl
+
+
+# --------------------------
+#  INPUT CLASSIFIER
+# --------------------------
+def split_host(text):
+    """"host:port/path" => (host, port | None, phần còn lại)"""
+    cut = len(text)
+    for sep in "/?#":
+        i = text.find(sep)
+        if i != -1:
+            cut = min(cut, i)
+    hostport, rest = text[:cut], text[cut:]
+    if "@" in hostport:
+        hostport = hostport.rsplit("@", 1)[1]
+    if hostport.startswith("["):  # IPv6 [::1]:8080
+        end = hostport.find("]")
+        if end == -1:
+            return hostport, None, rest
+        port = hostport[end + 2:] if hostport[end + 1:end + 2] == ":" else None
+        if port is not None and not port.isdigit():  # "[::1]:" đang gõ dở
+            return hostport, None, rest
+        return hostport[:end + 1], port, rest
+    m = PORT_RE.match(hostport)
+    if m:
+        return m.group(1), m.group(2), rest
+    return hostport, None, rest
+
+
+def is_ip(host):
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+def classify(text, known_host=None, psl=None):
+    """("url", url đầy đủ) hoặc ("search", text) cho chữ gõ trên thanh địa chỉ.
+
+    known_host(host) -> bool: host đã từng mở được (intranet, kể cả "nas.corp" có đuôi
+    không phải TLD) thì coi là URL.
+    """
+    text = text.strip()
+    if not text:
+        return "search", text
+    m = SCHEME_RE.match(text)
+    if m and (m.group(1).lower() in URL_SCHEMES or text[m.end():m.end() + 2] == "//"):
+        return "url", text  # scheme gõ rõ ràng ("localhost:8080" không khớp: sau ":" không phải "//")
+    # Khoảng trắng chỉ xét ở phần host: "example.com/a b" vẫn là URL, "python news.com" thì không
+    if any(c.isspace() for c in AUTHORITY_RE.match(text).group()):
+        return "search", text
+
+    host, port, rest = split_host(text)
+    if port is not None:
+        if not (0 < int(port) < 65536):
+            return "search", text
+        if host and (is_ip(host) or _valid_host(host)):
+            return "url", DEFAULT_SCHEME + text
+        return "search", text
+    if not host:
+        return "search", text
+    if is_ip(host):
+        if host.startswith("[") or host.count(".") == 3:  # bỏ "1.5" (ip_address không nhận) và số trơn
+            return "url", DEFAULT_SCHEME + text
+        return "search", text
+    if not _valid_host(host):
+        return "search", text
+
+    host = host.lower()
+    if host in LOCAL_HOSTS or host.endswith(".localhost"):
+        return "url", DEFAULT_SCHEME + text
+    if host.endswith("."):  # "intranet." = tên đầy đủ, người dùng muốn mở
+        return "url", DEFAULT_SCHEME + text
+    labels = host.split(".")
+    if len(labels) == 1:
+        # Intranet một nhãn: "wiki/" hoặc host đã từng mở; còn lại là từ khoá tìm kiếm
+        if rest.startswith("/") or (known_host and known_host(host)):
+            return "url", DEFAULT_SCHEME + text
+        return "search", text
+    tld = labels[-1]
+    if tld.isdigit():  # "v1.2", "3.14"
+        return "search", text
+    if (psl or public_suffixes()).is_tld(tld) or tld in INTRANET_TLDS:
+        return "url", DEFAULT_SCHEME + text
+    if known_host and known_host(host):  # "wiki.corp": đuôi nội bộ, host đã từng mở
+        return "url", DEFAULT_SCHEME + text
+    return "search", text  # "file.txt", "data.csv": đuôi không phải TLD
+
+
+def _valid_host(host):
+    labels = host.rstrip(".").split(".")
+    for label in labels:
+        if not label:
+            return False
+        if not LABEL_RE.match(_ascii_label(label)):
+            return False
+    return True
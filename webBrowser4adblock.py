@@ -6,6 +6,7 @@ from PyQt5.QtWebEngineWidgets import *
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
 
 import re
+from search_engines import search_url
 
 HOME_PAGE = "https://www.google.com"
 
@@ -174,8 +175,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
 
         self.current().setUrl(QUrl(text))
 
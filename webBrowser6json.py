@@ -7,6 +7,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from search_engines import search_url
 
 CONFIG_FILE = "config.json"
 DEFAULT_HOME = "https://www.google.com"
@@ -196,8 +197,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
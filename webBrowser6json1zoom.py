@@ -7,6 +7,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from search_engines import search_url
 
 CONFIG_FILE = "browser_config.json"
 DEFAULT_HOME = "https://www.google.com"
@@ -210,8 +211,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = f"https://www.google.com/search?q={quote_plus(text)}"
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
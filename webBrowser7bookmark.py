@@ -6,7 +6,10 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
+
+from config_store import ConfigStore
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from search_engines import search_url
 
 CONFIG_FILE = "browser_config.json"
 DEFAULT_HOME = "https://www.google.com"
@@ -154,13 +157,9 @@ class MiniBrowser(QMainWindow):
     # CONFIG
     # --------------------------
     def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        self.config_store = ConfigStore(CONFIG_FILE, parent=self)
+        self.config_store.changed.connect(self.on_config_changed)
+        return self.config_store.data
 
     def save_config(self):
         tabs_info = []
@@ -170,15 +169,25 @@ class MiniBrowser(QMainWindow):
                 "url": tab.web.url().toString(),
                 "zoom": tab.web.zoomFactor()
             })
+        # Bookmark được lưu ngay khi thêm (xem add_bookmark); ở đây chỉ ghi key khác trên đĩa
         config = {
             "dark_mode": self.dark_mode,
             "home_page": self.home_page,
             "window_size": (self.width(), self.height()),
             "tabs": tabs_info,
-            "bookmarks": self.bookmarks
         }
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2)
+        self.config_store.update(config)
+
+    def on_config_changed(self, keys):
+        """Instance khác vừa lưu config => chỉ áp dụng các key thay đổi"""
+        if "dark_mode" in keys:
+            self.dark_mode = self.config.get("dark_mode", False)
+            self.dark_btn.setText("☀" if self.dark_mode else "🌙")
+        if "home_page" in keys:
+            self.home_page = self.config.get("home_page", DEFAULT_HOME)
+        if "bookmarks" in keys:
+            self.bookmarks = self.config.get("bookmarks", [])
+            self.update_bookmark_menu()
 
     # --------------------------
     # BOOKMARKS
@@ -192,6 +201,7 @@ class MiniBrowser(QMainWindow):
         # tránh trùng lặp
         if not any(b["url"] == url for b in self.bookmarks):
             self.bookmarks.append({"title": title, "url": url})
+            self.config_store.set("bookmarks", self.bookmarks)
             self.update_bookmark_menu()
             QMessageBox.information(self, "Bookmark Added", f"'{title}' has been added to bookmarks.")
 
@@ -247,8 +257,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = f"https://www.google.com/search?q={quote_plus(text)}"
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
@@ -397,6 +406,7 @@ class MiniBrowser(QMainWindow):
 
     def closeEvent(self, event):
         self.save_config()
+        self.config_store.flush()
         event.accept()
 
 # --------------------------
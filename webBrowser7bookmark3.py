@@ -6,6 +6,9 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 
+from config_store import ConfigStore
+from search_engines import search_url
+
 CONFIG_FILE = "config.json"
 DEFAULT_HOME = "https://www.google.com"
 
@@ -126,19 +129,33 @@ class MiniBrowser(QMainWindow):
     #  CONFIGURATION
     # --------------------------
     def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
+        self.config_store = ConfigStore(CONFIG_FILE, parent=self)
+        self.config = self.config_store.data
+        self.config_store.changed.connect(self.on_config_changed)
 
     def save_config(self):
         self.config["dark_mode"] = self.dark_mode
         self.config["home_page"] = self.home_page
         self.config["zoom_factor"] = self.zoom_factor
         self.config["bookmarks"] = self.bookmarks
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=4)
+        self.config_store.schedule_save()
+
+    def closeEvent(self, event):
+        self.config_store.flush()
+        super().closeEvent(event)
+
+    def on_config_changed(self, keys):
+        """Instance khác vừa lưu config => chỉ áp dụng các key thay đổi"""
+        if "dark_mode" in keys:
+            self.dark_mode = self.config.get("dark_mode", False)
+            self.apply_dark_if_enabled_all()
+        if "zoom_factor" in keys:
+            self.zoom_factor = self.config.get("zoom_factor", 1.0)
+            self.apply_zoom()
+        if "home_page" in keys:
+            self.home_page = self.config.get("home_page", DEFAULT_HOME)
+        if "bookmarks" in keys:
+            self.bookmarks = self.config.get("bookmarks", [])
 
     # --------------------------
     #  ADD / CLOSE TAB
@@ -173,8 +190,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
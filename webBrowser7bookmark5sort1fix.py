@@ -6,21 +6,54 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 
-CONFIG_FILE = "config.json"
+from tab_policy import TabSuspensionPolicy
+from profile_db import ProfileDB
+from bookmark_store import BookmarkStore
+from bookmark_model import BookmarkTreeModel, BookmarkResultsModel, SORT_MODES, DEFAULT_SORT
+from search_index import bookmark_index_builder
+from bookmark_io import BookmarkImporter, export_bookmarks
+from link_checker import LinkCheckJob
+from settings_sync import FileChangeWatcher
+from single_instance import SingleInstance, ALIVE_TIMEOUT_MS
+from launch_profiles import apply_launch_mode, select_launch_mode
+from page_pool import WarmPagePool
+from favicon_cache import FaviconCache
+from history_store import HistoryStore
+from history_maintenance import HistoryMaintenance
+from omnibox import Omnibox
+from url_classifier import classify
+from preconnect import Preconnector
+from search_engines import SearchEngines, SearchSuggester
+from dark_mode import DarkMode, DARK_ENGINES, DEFAULT_ENGINE as DEFAULT_DARK_ENGINE, native_dark_flags
+from dark_policy import DarkSitePolicy, POLICIES as DARK_POLICIES, AUTO as DARK_AUTO, site_of
+
+CONFIG_FILE = "config.json"  # chỉ dùng để migrate sang PROFILE_DB
+PROFILE_DB = "profile.db"
+HISTORY_DB = "history.db"
+FAVICON_DIR = "favicons"
+DARK_THEME_FILE = "dark_themes.json"  # theme tối sinh cho từng host
 DEFAULT_HOME = "https://www.google.com"
+INDEX_DELAY_MS = 2000  # dựng search index bookmark sau khi cửa sổ đã hiện (sau trie của omnibox)
 
 # --------------------------
 #  BROWSER TAB
 # --------------------------
 class BrowserTab(QWidget):
-    def __init__(self, url=DEFAULT_HOME, profile=None):
+    def __init__(self, url=DEFAULT_HOME, profile=None, web=None, page_factory=None):
         super().__init__()
         layout = QVBoxLayout(self)
-        self.web = QWebEngineView()
-        if profile:
-            page = QWebEnginePage(profile, self.web)
-            self.web.setPage(page)
-        self.web.setUrl(QUrl(url))
+        if web:
+            # View lấy từ warm pool: đã tải sẵn trang
+            self.web = web
+            self.web.show()
+        else:
+            self.web = QWebEngineView()
+            if page_factory:
+                self.web.setPage(page_factory(self.web))
+            elif profile:
+                page = QWebEnginePage(profile, self.web)
+                self.web.setPage(page)
+            self.web.setUrl(QUrl(url))
         layout.addWidget(self.web)
         self.setLayout(layout)
 
@@ -32,10 +65,30 @@ class MiniBrowser(QMainWindow):
         super().__init__()
         self.load_config()
 
-        self.dark_mode = self.config.get("dark_mode", False)
-        self.home_page = self.config.get("home_page", DEFAULT_HOME)
-        self.zoom_factor = self.config.get("zoom_factor", 1.0)
-        self.bookmarks = self.config.get("bookmarks", [])
+        self.dark_mode = self.db.get_setting("dark_mode", False)
+        self.home_page = self.db.get_setting("home_page", DEFAULT_HOME)
+        self.zoom_factor = self.db.get_setting("zoom_factor", 1.0)
+        self.bookmarks = BookmarkStore(self.db)
+        self.bookmarks.load(self.db.bookmarks())
+        self.favicons = FaviconCache(self.db, FAVICON_DIR, parent=self)
+        self.favicons.iconReady.connect(self.on_favicon_ready)
+        sort_mode = self.db.get_setting("bookmark_sort", DEFAULT_SORT)
+        if sort_mode not in SORT_MODES:
+            sort_mode = DEFAULT_SORT
+        self.bookmark_model = BookmarkTreeModel(self.bookmarks, self.favicons, self, sort_mode=sort_mode)
+        # Search index dựng dần trên event loop (như trie của omnibox), dùng được ngay
+        self.bookmark_index, self._index_steps = bookmark_index_builder(self.bookmarks)
+        self._index_timer = QTimer(self)
+        self._index_timer.setSingleShot(True)
+        self._index_timer.timeout.connect(self.build_index_step)
+        QTimer.singleShot(INDEX_DELAY_MS, self._index_timer.start)
+        self.bookmark_search = None
+        self.bookmark_results = BookmarkResultsModel(self.favicons, self)
+        self.bookmark_import = None
+        self.link_check = None
+        self.history = HistoryStore(HISTORY_DB)
+        self.search_engines = SearchEngines(self.db.get_setting("search_engines", []),
+                                            self.db.get_setting("default_search"))
 
         self.setWindowTitle("MiniBrowser")
         self.resize(1100, 700)
@@ -44,6 +97,24 @@ class MiniBrowser(QMainWindow):
         self.profile = QWebEngineProfile("MiniBrowserProfile", self)
         self.profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
         self.profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+        # Dark mode: script của profile chạy lúc tạo document => không nháy trắng
+        self.dark = DarkMode(self.profile, self.dark_mode,
+                             engine=self.db.get_setting("dark_engine", DEFAULT_DARK_ENGINE),
+                             cache_path=DARK_THEME_FILE,
+                             sites=DarkSitePolicy(self.db.get_setting("dark_sites"),
+                                                  self.db.get_setting("dark_detected")),
+                             parent=self)
+
+        # --- Warm pool: trang home tải sẵn cho tab mới ---
+        self.loading_tabs = set()
+        self.page_pool = WarmPagePool(self.profile, self.home_page, is_idle=lambda: not self.loading_tabs,
+                                      page_factory=self.dark.new_page, parent=self)
+
+        # --- Dọn history.db mỗi ngày, từng lượt ngắn khi không tải trang ---
+        self.history_maintenance = HistoryMaintenance(self.history, is_idle=lambda: not self.loading_tabs,
+                                                      parent=self)
+        self.history_maintenance.finished.connect(lambda stats: self.favicons.prune())  # file icon mồ côi
+        self.history_maintenance.schedule()
 
         # --- Tabs ---
         self.tabs = QTabWidget()
@@ -52,6 +123,15 @@ class MiniBrowser(QMainWindow):
         self.tabs.currentChanged.connect(self.update_urlbar)
         self.setCentralWidget(self.tabs)
 
+        # --- Background tab policy (freeze tab nền) ---
+        self.tab_policy = TabSuspensionPolicy(self.tabs, parent=self)
+        self.policy_label = QLabel()
+        self.statusBar().addPermanentWidget(self.policy_label)
+        self.tab_policy.readoutChanged.connect(self.policy_label.setText)
+        # Dark mode đổi khi tab đang ẩn => áp dụng lúc tab được mở lại / hết freeze
+        self.tabs.currentChanged.connect(self.apply_dark_if_stale)
+        self.tab_policy.resumed.connect(self.dark.apply_if_stale)
+
         # --- Toolbar ---
         nav = QToolBar("Navigation")
         self.addToolBar(nav)
@@ -92,6 +172,25 @@ class MiniBrowser(QMainWindow):
         self.dark_btn = QAction("🌙", self)
         self.dark_btn.setStatusTip("Toggle Dark Mode")
         self.dark_btn.triggered.connect(self.toggle_dark_mode)
+        dark_menu = QMenu(self)
+        self.dark_engine_group = QActionGroup(self)
+        for engine, label in zip(DARK_ENGINES, ("Theme (per site)", "Chromium force-dark (restart)", "Invert filter")):
+            action = dark_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(engine == self.dark.engine)
+            action.triggered.connect(lambda checked, e=engine: self.set_dark_engine(e))
+            self.dark_engine_group.addAction(action)
+        # Policy của site đang mở (auto: tự bỏ qua site đã có giao diện tối)
+        self.dark_site_menu = dark_menu.addMenu("This site")
+        self.dark_site_group = QActionGroup(self)
+        for mode in DARK_POLICIES:
+            action = self.dark_site_menu.addAction(mode.capitalize())
+            action.setCheckable(True)
+            action.setData(mode)
+            action.triggered.connect(lambda checked, m=mode: self.set_site_dark_policy(m))
+            self.dark_site_group.addAction(action)
+        dark_menu.aboutToShow.connect(self.update_dark_site_menu)
+        self.dark_btn.setMenu(dark_menu)
         nav.addAction(self.dark_btn)
 
         # URL bar
@@ -99,6 +198,21 @@ class MiniBrowser(QMainWindow):
         self.urlbar.returnPressed.connect(self.navigate)
         nav.addWidget(self.urlbar)
 
+        # Gợi ý khi gõ: history + bookmark, xếp theo frecency (trie trong RAM)
+        self.omnibox = Omnibox(self.urlbar, self.history, self.bookmarks, self.favicons, self)
+        self.omnibox.openUrl.connect(lambda url: self.navigate())
+
+        # Gợi ý tìm kiếm từ server của engine (debounce, thread riêng, LRU)
+        self.search_suggest = SearchSuggester(self.search_engines, parent=self)
+        self.omnibox.suggested.connect(lambda text, results: self.search_suggest.request(text))
+        self.search_suggest.ready.connect(self.omnibox.set_search_suggestions)
+
+        # Đang gõ: làm ấm DNS + TCP/TLS cho origin sắp mở
+        self.preconnect = Preconnector(self.profile, self.history, parent=self)
+        self.omnibox.suggested.connect(self.preconnect.on_suggestions)
+        self.preconnect.saved.connect(
+            lambda ms: self.statusBar().showMessage(f"⚡ preconnect: -{ms:.0f} ms", 3000))
+
         # New tab
         new_tab_btn = QAction("+", self)
         new_tab_btn.triggered.connect(lambda: self.add_tab(self.home_page))
@@ -109,6 +223,17 @@ class MiniBrowser(QMainWindow):
         bookmark_btn.triggered.connect(self.manage_bookmarks)
         nav.addAction(bookmark_btn)
 
+        # History
+        history_btn = QAction("🕘", self)
+        history_btn.triggered.connect(self.show_history)
+        nav.addAction(history_btn)
+
+        # Search engines
+        search_btn = QAction("🔍", self)
+        search_btn.setStatusTip("Search Engines")
+        search_btn.triggered.connect(self.manage_search_engines)
+        nav.addAction(search_btn)
+
         # Hotkeys
         self.init_hotkeys()
 
@@ -122,46 +247,104 @@ class MiniBrowser(QMainWindow):
         # Apply dark mode if enabled
         self.apply_dark_if_enabled_all()
 
+        self.page_pool.schedule_refill()
+
     # --------------------------
     #  CONFIGURATION
     # --------------------------
     def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
-
-    def save_config(self):
-        self.config["dark_mode"] = self.dark_mode
-        self.config["home_page"] = self.home_page
-        self.config["zoom_factor"] = self.zoom_factor
-        self.config["bookmarks"] = self.bookmarks
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=4)
+        self.db = ProfileDB(PROFILE_DB)
+        self.db.migrate_from_json(CONFIG_FILE)
+        # Instance khác ghi vào profile.db => đọc lại đúng các dòng đã đổi
+        self.db_watcher = FileChangeWatcher(self.db.watch_paths(), parent=self)
+        self.db_watcher.changed.connect(self.on_profile_changed)
+
+    def save_setting(self, key, value):
+        self.db.set_setting(key, value)
+
+    def on_profile_changed(self):
+        for kind, key in self.db.changes_since():
+            if kind == "setting" and key == "dark_mode":
+                self.dark_mode = self.db.get_setting("dark_mode", False)
+                self.apply_dark_if_enabled_all()
+            elif kind == "setting" and key == "dark_engine":
+                self.dark.set_engine(self.db.get_setting("dark_engine", DEFAULT_DARK_ENGINE))
+                self.apply_dark_if_enabled_all()
+            elif kind == "setting" and key == "dark_sites":
+                self.dark.sites.sites = DarkSitePolicy(self.db.get_setting("dark_sites")).sites
+                self.apply_dark_if_enabled_all()
+            elif kind == "setting" and key == "zoom_factor":
+                self.zoom_factor = self.db.get_setting("zoom_factor", 1.0)
+                self.apply_zoom()
+            elif kind == "setting" and key == "home_page":
+                self.home_page = self.db.get_setting("home_page", DEFAULT_HOME)
+                self.page_pool.set_url(self.home_page)
+            elif kind == "setting" and key in ("search_engines", "default_search"):
+                self.reload_search_engines()
+            elif kind == "setting" and key == "bookmark_sort":
+                self.bookmark_model.set_sort_mode(self.db.get_setting("bookmark_sort", DEFAULT_SORT))
+            elif kind == "bookmark":
+                bm = self.db.bookmark(key)
+                if bm:
+                    # add() báo cho tree model / search index / omnibox, load() chỉ dùng khi nạp lúc khởi động
+                    self.bookmarks.add(bm["url"], bm["title"], bm.get("added_at"), persist=False)
+                else:
+                    self.bookmarks.delete(key, persist=False)
 
     # --------------------------
     #  ADD / CLOSE TAB
     # --------------------------
     def add_tab(self, url):
-        tab = BrowserTab(url, profile=self.profile)
-        tab.web.loadFinished.connect(lambda ok, w=tab.web: self.apply_dark_if_enabled(w))
+        warm = self.page_pool.take(url)
+        tab = BrowserTab(url, profile=self.profile, web=warm, page_factory=self.dark.new_page)
+        tab.web.loadStarted.connect(lambda w=tab.web: self.loading_tabs.add(w))
+        tab.web.loadFinished.connect(lambda ok, w=tab.web: self.loading_tabs.discard(w))
+        tab.web.loadFinished.connect(lambda ok, w=tab.web: ok and self.dark.page_loaded(w))
         tab.web.loadFinished.connect(lambda ok, w=tab.web: self.apply_zoom_to_tab(w))
-        index = self.tabs.addTab(tab, "Tab")
-        tab.web.titleChanged.connect(lambda t, i=index: self.tabs.setTabText(i, t[:30]))
-        tab.web.urlChanged.connect(lambda u, i=index: self.url_changed(u, i))
+        tab.web.loadFinished.connect(lambda ok, w=tab.web: ok and self.bookmarks.visit(w.url().toString()))
+        tab.web.loadFinished.connect(lambda ok, w=tab.web: ok and self.preconnect.measure(w))
+        index = self.tabs.addTab(tab, warm.title()[:30] if warm else "Tab")
+        if warm:
+            self.apply_dark_if_enabled(tab.web)  # pool tải trước khi đổi dark mode
+            self.apply_zoom_to_tab(tab.web)
+            self.history.visit(warm.url().toString(), warm.title())  # urlChanged đã phát trong pool
+        tab.web.titleChanged.connect(lambda t, w=tab: self.title_changed(t, w))
+        tab.web.titleChanged.connect(lambda t, w=tab.web: self.history.set_title(w.url().toString(), t))
+        tab.web.urlChanged.connect(lambda u, t=tab: self.url_changed(u, t))
+        tab.web.iconChanged.connect(lambda icon, w=tab.web: self.on_icon_changed(w, icon))
+        if warm:
+            self.on_icon_changed(tab.web, warm.icon())
         self.tabs.setCurrentIndex(index)
+        self.tab_policy.track(tab.web)
 
     def close_tab(self, i):
         if self.tabs.count() == 1:
             self.close()
         else:
+            web = self.tabs.widget(i).web
+            self.tab_policy.untrack(web)
+            self.dark.forget(web)
+            self.loading_tabs.discard(web)
             self.tabs.removeTab(i)
 
     def current(self):
         tab = self.tabs.currentWidget()
         return tab.web if tab else None
 
+    def closeEvent(self, event):
+        if self.link_check:
+            self.link_check.shutdown()  # trước db.close(): kết quả đến muộn không ghi vào DB đã đóng
+        self.db_watcher.changed.disconnect(self.on_profile_changed)
+        if self.dark.sites.dirty:
+            self.save_setting("dark_detected", self.dark.sites.detected)
+        self.db.close()
+        self.preconnect.save()
+        self.dark.save_themes()
+        self.search_suggest.stop()
+        self.history.close()  # ghi nốt các visit còn trong hàng đợi
+        self.page_pool.clear()
+        super().closeEvent(event)
+
     # --------------------------
     #  NAVIGATION
     # --------------------------
@@ -169,17 +352,57 @@ class MiniBrowser(QMainWindow):
         text = self.urlbar.text().strip()
         if not text:
             return
-        if not text.startswith("http"):
-            if "." in text:
-                text = "http://" + text
-            else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
-        self.current().setUrl(QUrl(text))
-
-    def url_changed(self, url, index):
+        self.current().setUrl(QUrl(self.guess_url(text)))
+
+    def guess_url(self, text):
+        # PSL + IP / port / localhost; host một nhãn chỉ là URL nếu đã có trong lịch sử
+        kind, text = classify(text, known_host=lambda host: bool(self.history.for_host(host, 1)))
+        if kind == "search":
+            text = self.search_engines.search_url(text)  # "@w python" => Wikipedia
+        return text
+
+    def open_urls(self, urls):
+        """Mở URL (từ dòng lệnh hoặc instance thứ hai) thành tab mới"""
+        for text in urls:
+            text = text.strip()
+            if text:
+                self.add_tab(self.guess_url(text))
+        self.setWindowState(self.windowState() & ~Qt.WindowMinimized)
+        self.raise_()
+        self.activateWindow()
+
+    def title_changed(self, title, tab):
+        index = self.tabs.indexOf(tab)  # như url_changed: index lúc mở tab có thể đã lệch
+        if index >= 0:
+            self.tabs.setTabText(index, title[:30])
+
+    def url_changed(self, url, tab):
+        self.history.visit(url.toString())
+        # Tra index lúc phát signal: index lúc mở tab đã lệch nếu tab trước nó bị đóng
+        index = self.tabs.indexOf(tab)
+        if index < 0:
+            return
         if index == self.tabs.currentIndex():
             self.urlbar.setText(url.toString())
+        # Icon đã có trong cache thì hiện ngay, không chờ trang tải favicon
+        self.tabs.setTabIcon(index, self.favicons.icon(url.host()))
+
+    # --------------------------
+    #  FAVICONS
+    # --------------------------
+    def on_icon_changed(self, web, icon):
+        if icon.isNull():
+            return
+        self.favicons.store(web.url().host(), icon)
+        index = self.tabs.indexOf(web.parentWidget())
+        if index >= 0:
+            self.tabs.setTabIcon(index, icon)
+
+    def on_favicon_ready(self, host):
+        for i in range(self.tabs.count()):
+            web = self.tabs.widget(i).web
+            if web.url().host() == host and self.tabs.tabIcon(i).isNull():
+                self.tabs.setTabIcon(i, self.favicons.icon(host))
 
     def update_urlbar(self):
         w = self.current()
@@ -197,17 +420,17 @@ class MiniBrowser(QMainWindow):
     def zoom_in(self):
         self.zoom_factor += 0.1
         self.apply_zoom()
-        self.save_config()
+        self.save_setting("zoom_factor", self.zoom_factor)
 
     def zoom_out(self):
         self.zoom_factor = max(0.2, self.zoom_factor - 0.1)
         self.apply_zoom()
-        self.save_config()
+        self.save_setting("zoom_factor", self.zoom_factor)
 
     def zoom_reset(self):
         self.zoom_factor = 1.0
         self.apply_zoom()
-        self.save_config()
+        self.save_setting("zoom_factor", self.zoom_factor)
 
     def apply_zoom(self):
         for i in range(self.tabs.count()):
@@ -223,46 +446,51 @@ class MiniBrowser(QMainWindow):
     def toggle_dark_mode(self):
         self.dark_mode = not self.dark_mode
         self.apply_dark_if_enabled_all()
-        self.save_config()
+        self.save_setting("dark_mode", self.dark_mode)
 
     def apply_dark_if_enabled_all(self):
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
-            self.apply_dark_if_enabled(tab.web)
+        self.dark.set_enabled(self.dark_mode)
+        self.dark.apply_visible([self.tabs.widget(i).web for i in range(self.tabs.count())], self.current())
+        cost = self.dark.cost_per_page()
+        self.dark_btn.setText("☀" if self.dark_mode else "🌙")
+        self.dark_btn.setToolTip("Toggle Dark Mode" + (f" (~{cost:.2f} ms/page)" if cost is not None else ""))
+        if self.dark.needs_restart():
+            self.statusBar().showMessage("Chromium force-dark: restart MiniBrowser to apply", 5000)
+
+    def set_dark_engine(self, engine):
+        self.dark.set_engine(engine)
+        self.save_setting("dark_engine", engine)
+        self.apply_dark_if_enabled_all()
 
     def apply_dark_if_enabled(self, web):
-        if not self.dark_mode:
-            js_remove = """
-            (function() {
-                let style = document.getElementById("dark_mode_css");
-                if (style) style.remove();
-            })();
-            """
-            web.page().runJavaScript(js_remove)
-            self.dark_btn.setText("🌙")
+        # Chỉ đổi class trên <html> (CSS đã có sẵn từ lúc tạo document)
+        self.dark.apply(web)
+
+    def apply_dark_if_stale(self, index):
+        web = self.current()
+        if web and not self.tab_policy.is_frozen(web):  # tab đang freeze: chờ resumed
+            self.dark.apply_if_stale(web)
+
+    def update_dark_site_menu(self):
+        web = self.current()
+        host = web.url().host() if web else ""
+        self.dark_site_menu.setEnabled(bool(host))
+        self.dark_site_menu.setTitle(f"This site ({site_of(host)})" if host else "This site")
+        mode = self.dark.sites.policy(host) if host else None
+        for action in self.dark_site_group.actions():
+            action.setChecked(action.data() == mode)
+
+    def set_site_dark_policy(self, mode):
+        web = self.current()
+        if not web or not web.url().host():
             return
-
-        js = """
-        (function() {
-            if (!document.getElementById("dark_mode_css")) {
-                let css = `
-                    html, body {
-                        background: #111 !important;
-                        filter: invert(1) hue-rotate(180deg) !important;
-                    }
-                    img, video, canvas {
-                        filter: invert(1) hue-rotate(180deg) !important;
-                    }
-                `;
-                let style = document.createElement('style');
-                style.id = "dark_mode_css";
-                style.innerText = css;
-                document.head.appendChild(style);
-            }
-        })();
-        """
-        web.page().runJavaScript(js)
-        self.dark_btn.setText("☀")
+        host = web.url().host()
+        for site in [s for s in self.dark.sites.sites if host == s or host.endswith("." + s)]:
+            self.dark.sites.set_policy(site, DARK_AUTO)  # policy mới thay cho policy của host cha
+        self.dark.sites.set_policy(site_of(host), mode)
+        self.save_setting("dark_sites", self.dark.sites.sites)
+        self.apply_dark_if_enabled_all()
+        self.dark.page_loaded(web)  # always trên site chưa có theme => sinh ngay
 
     # --------------------------
     #  HOTKEYS
@@ -283,6 +511,7 @@ class MiniBrowser(QMainWindow):
 
         # --- Hotkey bookmark ---
         QShortcut(QKeySequence("Ctrl+B"), self, self.manage_bookmarks)
+        QShortcut(QKeySequence("Ctrl+Shift+H"), self, self.show_history)
 
     def focus_urlbar(self):
         self.urlbar.setFocus()
@@ -330,14 +559,32 @@ class MiniBrowser(QMainWindow):
         dlg.resize(500, 400)
         layout = QVBoxLayout(dlg)
 
-        self.bookmark_tree = QTreeWidget()
-        self.bookmark_tree.setHeaderLabels(["Title", "URL"])
+        # Ô tìm kiếm: lọc theo inverted index ngay khi gõ
+        self.bookmark_search = QLineEdit()
+        self.bookmark_search.setPlaceholderText("Search bookmarks...")
+        self.bookmark_search.setClearButtonEnabled(True)
+        self.bookmark_search.textChanged.connect(self.filter_bookmarks)
+
+        # Thứ tự sắp xếp của cây (lưu trong profile)
+        self.bookmark_sort = QComboBox()
+        for mode, (label, _, _) in SORT_MODES.items():
+            self.bookmark_sort.addItem(label, mode)
+        self.bookmark_sort.setCurrentIndex(self.bookmark_sort.findData(self.bookmark_model.sort_mode))
+        self.bookmark_sort.currentIndexChanged.connect(self.sort_bookmarks)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.bookmark_search, 1)
+        search_layout.addWidget(self.bookmark_sort)
+        layout.addLayout(search_layout)
+
+        # Model dùng chung (self.bookmark_model), view chỉ nạp các dòng đang hiển thị
+        self.bookmark_tree = QTreeView()
+        self.bookmark_tree.setUniformRowHeights(True)
+        self.bookmark_tree.setModel(self.bookmark_model)
         layout.addWidget(self.bookmark_tree)
 
-        self.populate_bookmark_tree()  # Hàm populate tree từ self.bookmarks
-
         # Double click mở link
-        self.bookmark_tree.itemDoubleClicked.connect(self.open_bookmark)
+        self.bookmark_tree.doubleClicked.connect(self.open_bookmark)
 
         # Nút thêm / xóa
         btn_layout = QHBoxLayout()
@@ -348,80 +595,285 @@ class MiniBrowser(QMainWindow):
         del_btn = QPushButton("Delete Selected")
         del_btn.clicked.connect(self.delete_bookmark_tree)
         btn_layout.addWidget(del_btn)
+
+        # Import / export (Netscape HTML, Chrome Bookmarks, Firefox places.sqlite)
+        import_btn = QPushButton("Import...")
+        import_btn.clicked.connect(self.import_bookmarks)
+        btn_layout.addWidget(import_btn)
+
+        export_btn = QPushButton("Export...")
+        export_btn.clicked.connect(self.export_bookmarks)
+        btn_layout.addWidget(export_btn)
+
+        # Kiểm tra link chết trên thread nền
+        check_btn = QPushButton("Check Links")
+        check_btn.clicked.connect(self.check_bookmark_links)
+        btn_layout.addWidget(check_btn)
         layout.addLayout(btn_layout)
 
         dlg.exec_()
 
-    def populate_bookmark_tree(self):
-        """Xây dựng TreeWidget từ self.bookmarks, gom nhóm theo tên miền"""
-        self.bookmark_tree.clear()
-        groups = {}
-        for bm in self.bookmarks:
-            domain = QUrl(bm['url']).host()
-            if domain not in groups:
-                group_item = QTreeWidgetItem([domain])
-                self.bookmark_tree.addTopLevelItem(group_item)
-                groups[domain] = group_item
-            child = QTreeWidgetItem([bm['title'], bm['url']])
-            groups[domain].addChild(child)
-
-    def open_bookmark(self, item, column):
+    def build_index_step(self):
+        """Thêm một batch vào search index; dựng xong thì lọc lại nếu đang tìm"""
+        if next(self._index_steps, StopIteration) is not StopIteration:
+            self._index_timer.start()
+            return
+        self._index_steps = None
+        if self.bookmark_search and self.bookmark_search.text().strip():
+            self.filter_bookmarks(self.bookmark_search.text())
+
+    def filter_bookmarks(self, text):
+        """Có từ khoá thì hiện danh sách kết quả đã xếp hạng, không thì hiện cây"""
+        if text.strip():
+            self.bookmark_results.set_results(self.bookmark_index.search(text, limit=200))
+            model = self.bookmark_results
+        else:
+            model = self.bookmark_model
+        if self.bookmark_tree.model() is not model:
+            self.bookmark_tree.setModel(model)
+            self.bookmark_tree.setRootIsDecorated(model is self.bookmark_model)
+
+    def sort_bookmarks(self, row):
+        mode = self.bookmark_sort.itemData(row)
+        self.bookmark_model.set_sort_mode(mode)
+        self.save_setting("bookmark_sort", mode)
+
+    def open_bookmark(self, index):
         """Mở link khi double click (chỉ các item con)"""
-        if item.childCount() == 0:
-            url = item.text(1)
-            self.add_tab(url)
+        bm = self.bookmark_tree.model().bookmark(index)
+        if bm:
+            self.add_tab(bm['url'])
 
     def add_bookmark_tree(self):
-        """Thêm bookmark hiện tại vào TreeWidget và lưu config"""
+        """Thêm bookmark hiện tại, model tự chèn đúng một dòng"""
         w = self.current()
         if not w:
             return
         url = w.url().toString()
         title = w.title() or url
 
-        # Tránh bookmark trùng lặp
-        if any(b['url'] == url for b in self.bookmarks):
+        # Tránh bookmark trùng lặp (so theo URL chuẩn hoá, O(1))
+        bm = self.bookmarks.add(url, title)
+        if not bm:
             return
-
-        self.bookmarks.append({"title": title, "url": url})
-        self.save_config()
-
-        # Thêm vào tree hiện tại
-        domain = QUrl(url).host()
-        group_item = None
-        for i in range(self.bookmark_tree.topLevelItemCount()):
-            top = self.bookmark_tree.topLevelItem(i)
-            if top.text(0) == domain:
-                group_item = top
-                break
-        if not group_item:
-            group_item = QTreeWidgetItem([domain])
-            self.bookmark_tree.addTopLevelItem(group_item)
-
-        child_item = QTreeWidgetItem([title, url])
-        group_item.addChild(child_item)
-        group_item.setExpanded(True)  # tự mở nhóm khi thêm
+        self.filter_bookmarks(self.bookmark_search.text())
+        group = self.bookmark_model.group_index(bm['host'])
+        if group.isValid() and self.bookmark_tree.model() is self.bookmark_model:
+            self.bookmark_tree.expand(group)  # tự mở nhóm khi thêm
 
     def delete_bookmark_tree(self):
         """Xóa bookmark được chọn"""
-        item = self.bookmark_tree.currentItem()
-        if item and item.childCount() == 0:
-            url = item.text(1)
-            # Xóa khỏi danh sách bookmarks
-            self.bookmarks = [b for b in self.bookmarks if b['url'] != url]
-            self.save_config()
-            parent = item.parent()
-            if parent:
-                parent.removeChild(item)
+        bm = self.bookmark_tree.model().bookmark(self.bookmark_tree.currentIndex())
+        if bm:
+            # Xóa khỏi store + DB, model tự bỏ dòng
+            self.bookmarks.delete(bm['url'])
+            self.filter_bookmarks(self.bookmark_search.text())
+
+    def import_bookmarks(self):
+        """Nhập theo batch trên event loop, tiến độ hiện ở status bar"""
+        if self.bookmark_import:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Bookmarks", "",
+            "Bookmarks (*.html *.htm Bookmarks *.json places.sqlite *.sqlite);;All Files (*)")
+        if not path:
+            return
+        job = BookmarkImporter(self.bookmarks, path, parent=self)
+        job.progress.connect(lambda added, seen: self.statusBar().showMessage(
+            f"Importing bookmarks: {seen} read, {added} added"))
+        job.finished.connect(self.import_finished)
+        job.failed.connect(self.import_failed)
+        self.bookmark_import = job
+        job.start()
+
+    def import_finished(self, added, duplicates):
+        self.bookmark_import = None
+        self.statusBar().showMessage(f"Imported {added} bookmarks ({duplicates} duplicates merged)", 10000)
+        if self.bookmark_search:
+            self.filter_bookmarks(self.bookmark_search.text())
+
+    def import_failed(self, error):
+        self.bookmark_import = None
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Import Failed", error)
+
+    def export_bookmarks(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Bookmarks", "bookmarks.html",
+            "Bookmarks HTML (*.html);;Chrome Bookmarks JSON (*.json)")
+        if not path:
+            return
+        try:
+            count = export_bookmarks(self.bookmarks, path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", str(e))
+            return
+        self.statusBar().showMessage(f"Exported {count} bookmarks to {path}", 10000)
+
+    def check_bookmark_links(self):
+        """Chỉ kiểm tra link chưa kiểm tra / đã cũ; xong thì liệt kê link chết"""
+        if self.link_check:
+            return
+        job = LinkCheckJob(self.db, [bm['url'] for bm in self.bookmarks], parent=self)
+        job.progress.connect(lambda done, total, dead: self.statusBar().showMessage(
+            f"Checking links: {done}/{total} · {dead} dead"))
+        job.finished.connect(self.link_check_finished)
+        self.link_check = job
+        job.start()
+
+    def link_check_finished(self, checked, dead):
+        self.link_check = None
+        self.statusBar().showMessage(f"Checked {checked} links, {dead} dead", 10000)
+        dead_links = [bm for bm in (self.bookmarks.get(row['url']) for row in self.db.dead_links()) if bm]
+        if dead_links and self.bookmark_dialog.isVisible():
+            self.bookmark_search.blockSignals(True)
+            self.bookmark_search.clear()
+            self.bookmark_search.blockSignals(False)
+            self.bookmark_results.set_results(dead_links)
+            self.bookmark_tree.setModel(self.bookmark_results)
+            self.bookmark_tree.setRootIsDecorated(False)
+
+    # --------------------------
+    #  HISTORY
+    # --------------------------
+    def show_history(self):
+        self.history_dialog = QDialog(self)
+        dlg = self.history_dialog
+        dlg.setWindowTitle("History")
+        dlg.resize(700, 450)
+        layout = QVBoxLayout(dlg)
+
+        self.history_search = QLineEdit()
+        self.history_search.setPlaceholderText("Search history...")
+        self.history_search.setClearButtonEnabled(True)
+        self.history_search.textChanged.connect(self.filter_history)
+        layout.addWidget(self.history_search)
+
+        # Cùng dạng dict (title, url, host) với bookmark nên dùng lại model kết quả
+        self.history_results = BookmarkResultsModel(self.favicons, dlg)
+        self.history_view = QTreeView()
+        self.history_view.setRootIsDecorated(False)
+        self.history_view.setUniformRowHeights(True)
+        self.history_view.setModel(self.history_results)
+        self.history_view.doubleClicked.connect(
+            lambda index: self.add_tab(self.history_results.bookmark(index)['url']))
+        layout.addWidget(self.history_view)
+
+        self.history.flush()  # hiện cả các trang vừa mở
+        self.filter_history("")
+        dlg.exec_()
+
+    def filter_history(self, text):
+        text = text.strip()
+        self.history_results.set_results(self.history.search(text) if text else self.history.recent())
+
+
+    # --------------------------
+    #  SEARCH ENGINES
+    # --------------------------
+    def manage_search_engines(self):
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Search Engines")
+        dlg.resize(600, 320)
+        layout = QVBoxLayout(dlg)
+
+        self.engine_list = QListWidget()
+        layout.addWidget(self.engine_list)
+        self.fill_engine_list()
+
+        btn_layout = QHBoxLayout()
+        default_btn = QPushButton("Set Default")
+        default_btn.clicked.connect(self.set_default_engine)
+        btn_layout.addWidget(default_btn)
+
+        add_btn = QPushButton("Add OpenSearch...")
+        add_btn.clicked.connect(self.add_search_engine)
+        btn_layout.addWidget(add_btn)
+
+        del_btn = QPushButton("Remove")
+        del_btn.clicked.connect(self.remove_search_engine)
+        btn_layout.addWidget(del_btn)
+        layout.addLayout(btn_layout)
+        dlg.exec_()
+
+    def fill_engine_list(self):
+        self.engine_list.clear()
+        for engine in self.search_engines.engines:
+            mark = "★ " if engine is self.search_engines.default else ""
+            keyword = f"  [{engine['keyword']}]" if engine.get("keyword") else ""
+            item = QListWidgetItem(f"{mark}{engine['name']}{keyword}  —  {engine['search_url']}")
+            item.setData(Qt.UserRole, engine["name"])
+            self.engine_list.addItem(item)
+
+    def selected_engine(self):
+        item = self.engine_list.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+    def set_default_engine(self):
+        name = self.selected_engine()
+        if name:
+            self.search_engines.set_default(name)
+            self.save_setting("default_search", name)
+            self.fill_engine_list()
+
+    def add_search_engine(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Add Search Engine", "", "OpenSearch (*.xml);;All Files (*)")
+        if not path:
+            return
+        keyword, ok = QInputDialog.getText(self, "Add Search Engine", "Keyword (e.g. @gh, optional):")
+        if not ok:
+            return
+        try:
+            with open(path, "rb") as f:
+                self.search_engines.add_opensearch(f.read(), keyword.strip() or None)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Add Search Engine", str(e))
+            return
+        self.save_setting("search_engines", self.search_engines.custom)
+        self.fill_engine_list()
+
+    def remove_search_engine(self):
+        name = self.selected_engine()
+        if name and self.search_engines.remove(name):
+            self.save_setting("search_engines", self.search_engines.custom)
+            self.fill_engine_list()
+
+    def reload_search_engines(self):
+        self.search_engines = SearchEngines(self.db.get_setting("search_engines", []),
+                                            self.db.get_setting("default_search"))
+        self.search_suggest.engines = self.search_engines
 
 
 # --------------------------
 #  RUN APP
 # --------------------------
 def main():
+    # Process model (process-per-site, renderer-limit:N, ...) phải đặt trước QApplication
+    # Force-dark của Chromium là cờ lúc khởi động => đọc setting trước khi tạo QApplication
+    db = ProfileDB(PROFILE_DB)
+    dark_flags = native_dark_flags(db.get_setting("dark_mode", False),
+                                   db.get_setting("dark_engine", DEFAULT_DARK_ENGINE))
+    db.close()
+    try:
+        apply_launch_mode(select_launch_mode(), extra_flags=dark_flags)
+    except ValueError as e:
+        print(f"⚠ {e}")
+        sys.exit(2)
     app = QApplication(sys.argv)
+    urls = [a for a in app.arguments()[1:] if not a.startswith("-")]
+
+    # Đã có MiniBrowser chạy => chuyển URL sang đó rồi thoát ngay
+    instance = SingleInstance()
+    if instance.forward(urls):
+        sys.exit(0)
+    if not instance.listen() and instance.forward(urls, ALIVE_TIMEOUT_MS):
+        sys.exit(0)  # instance đầu đang bận nên lần gửi nhanh ở trên hết giờ
+
     browser = MiniBrowser()
+    instance.urlsReceived.connect(browser.open_urls)
     browser.show()
+    if urls:
+        browser.open_urls(urls)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
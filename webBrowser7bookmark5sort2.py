@@ -6,9 +6,13 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 
+from config_store import ConfigStore
+from search_engines import search_url
+from dark_policy import DarkSitePolicy, DETECT_JS, POLICIES as DARK_POLICIES, AUTO as DARK_AUTO, is_native_dark, site_of
+
 CONFIG_FILE = "config.json"
 DEFAULT_HOME = "https://www.google.com"
-SKIP_DARK_MODE = ["youtube.com", "twitter.com", "facebook.com"]  # Các trang nặng bỏ dark mode
+DARK_STYLE_ID = "dark_mode_css"
 
 # --------------------------
 #  BROWSER TAB
@@ -36,6 +40,8 @@ class MiniBrowser(QMainWindow):
         self.dark_mode = self.config.get("dark_mode", False)
         self.home_page = self.config.get("home_page", DEFAULT_HOME)
         self.zoom_factor = self.config.get("zoom_factor", 1.0)
+        # Dark mode theo site (always / never / auto); auto bỏ qua site đã có giao diện tối
+        self.dark_sites = DarkSitePolicy(self.config.get("dark_sites"), self.config.get("dark_detected"))
 
         self.setWindowTitle("MiniBrowser Stable")
         self.resize(1100, 700)
@@ -90,6 +96,17 @@ class MiniBrowser(QMainWindow):
         self.dark_btn = QAction("🌙", self)
         self.dark_btn.setStatusTip("Toggle Dark Mode")
         self.dark_btn.triggered.connect(self.toggle_dark_mode)
+        dark_menu = QMenu(self)
+        self.dark_site_menu = dark_menu.addMenu("This site")
+        self.dark_site_group = QActionGroup(self)
+        for mode in DARK_POLICIES:
+            action = self.dark_site_menu.addAction(mode.capitalize())
+            action.setCheckable(True)
+            action.setData(mode)
+            action.triggered.connect(lambda checked, m=mode: self.set_site_dark_policy(m))
+            self.dark_site_group.addAction(action)
+        dark_menu.aboutToShow.connect(self.update_dark_site_menu)
+        self.dark_btn.setMenu(dark_menu)
         nav.addAction(self.dark_btn)
 
         self.urlbar = QLineEdit()
@@ -114,18 +131,35 @@ class MiniBrowser(QMainWindow):
     #  CONFIG
     # --------------------------
     def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
+        self.config_store = ConfigStore(CONFIG_FILE, parent=self)
+        self.config = self.config_store.data
+        self.config_store.changed.connect(self.on_config_changed)
 
     def save_config(self):
         self.config["dark_mode"] = self.dark_mode
         self.config["home_page"] = self.home_page
         self.config["zoom_factor"] = self.zoom_factor
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=4)
+        self.config_store.schedule_save()
+
+    def closeEvent(self, event):
+        if self.dark_sites.dirty:
+            self.config["dark_detected"] = self.dark_sites.detected
+        self.config_store.flush()
+        super().closeEvent(event)
+
+    def on_config_changed(self, keys):
+        """Instance khác vừa lưu config => chỉ áp dụng các key thay đổi"""
+        if "dark_mode" in keys:
+            self.dark_mode = self.config.get("dark_mode", False)
+            self.apply_dark_if_enabled_current()
+        if "dark_sites" in keys:
+            self.dark_sites.sites = DarkSitePolicy(self.config.get("dark_sites")).sites
+            self.apply_dark_if_enabled_current()
+        if "zoom_factor" in keys:
+            self.zoom_factor = self.config.get("zoom_factor", 1.0)
+            self.apply_zoom()
+        if "home_page" in keys:
+            self.home_page = self.config.get("home_page", DEFAULT_HOME)
 
     # --------------------------
     #  TAB
@@ -160,8 +194,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
@@ -218,11 +251,14 @@ class MiniBrowser(QMainWindow):
             self.apply_dark_if_enabled(web)
 
     def apply_dark_if_enabled(self, web):
-        url = web.url().toString()
-        if any(domain in url for domain in SKIP_DARK_MODE):
-            return  # Không áp dụng dark mode cho trang nặng
+        host = web.url().host()
+        if self.dark_mode and self.dark_sites.needs_detection(host):
+            # Lần đầu gặp host (auto): xem site đã có giao diện tối chưa rồi mới quyết định
+            js = DETECT_JS % (json.dumps(""), json.dumps(DARK_STYLE_ID))
+            web.page().runJavaScript(js, lambda result, w=web, h=host: self.on_dark_detected(w, h, result))
+            return
 
-        if not self.dark_mode:
+        if not self.dark_mode or not self.dark_sites.wants_dark(host):
             js_remove = """
             (function() {
                 let style = document.getElementById("dark_mode_css");
@@ -230,7 +266,7 @@ class MiniBrowser(QMainWindow):
             })();
             """
             web.page().runJavaScript(js_remove)
-            self.dark_btn.setText("🌙")
+            self.dark_btn.setText("☀" if self.dark_mode else "🌙")
             return
 
         js = """
@@ -249,6 +285,33 @@ class MiniBrowser(QMainWindow):
         web.page().runJavaScript(js)
         self.dark_btn.setText("☀")
 
+    def on_dark_detected(self, web, host, result):
+        if result is None:
+            return
+        self.dark_sites.remember(host, is_native_dark(result))
+        if web.url().host() == host:
+            self.apply_dark_if_enabled(web)
+
+    def update_dark_site_menu(self):
+        web = self.current()
+        host = web.url().host() if web else ""
+        self.dark_site_menu.setEnabled(bool(host))
+        self.dark_site_menu.setTitle(f"This site ({site_of(host)})" if host else "This site")
+        mode = self.dark_sites.policy(host) if host else None
+        for action in self.dark_site_group.actions():
+            action.setChecked(action.data() == mode)
+
+    def set_site_dark_policy(self, mode):
+        web = self.current()
+        if not web or not web.url().host():
+            return
+        host = web.url().host()
+        for site in [s for s in self.dark_sites.sites if host == s or host.endswith("." + s)]:
+            self.dark_sites.set_policy(site, DARK_AUTO)  # policy mới thay cho policy của host cha
+        self.dark_sites.set_policy(site_of(host), mode)
+        self.config_store.set("dark_sites", dict(self.dark_sites.sites))
+        self.apply_dark_if_enabled_current()
+
     # --------------------------
     #  HOTKEYS
     # --------------------------
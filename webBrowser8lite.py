@@ -6,7 +6,14 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWebEngineWidgets import *
 
-CONFIG_FILE = "config_light.json"
+from profile_db import ProfileDB
+from bookmark_store import BookmarkStore
+from bookmark_model import BookmarkTreeModel
+from settings_sync import FileChangeWatcher
+from search_engines import search_url
+
+CONFIG_FILE = "config_light.json"  # chỉ dùng để migrate sang PROFILE_DB
+PROFILE_DB = "profile_light.db"
 DEFAULT_HOME = "https://www.google.com"
 
 # --------------------------
@@ -34,8 +41,9 @@ class MiniBrowser(QMainWindow):
 
         self.load_config()
 
-        self.zoom_data = self.config.get("zoom_data", {})  # host -> zoom factor
-        self.bookmarks = self.config.get("bookmarks", [])
+        self.bookmarks = BookmarkStore(self.db)
+        self.bookmarks.load(self.db.bookmarks())
+        self.bookmark_model = BookmarkTreeModel(self.bookmarks, parent=self)
 
         self.setWindowTitle("MiniBrowser Light")
         self.resize(1100, 700)
@@ -112,24 +120,38 @@ class MiniBrowser(QMainWindow):
     # CONFIG
     # --------------------------
     def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
-
-    def save_config(self):
-        self.config["zoom_data"] = self.zoom_data
-        self.config["bookmarks"] = self.bookmarks
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=4)
+        self.db = ProfileDB(PROFILE_DB)
+        self.db.migrate_from_json(CONFIG_FILE)
+        # Instance khác ghi vào profile_light.db => đọc lại đúng các dòng đã đổi
+        self.db_watcher = FileChangeWatcher(self.db.watch_paths(), parent=self)
+        self.db_watcher.changed.connect(self.on_profile_changed)
+
+    def closeEvent(self, event):
+        self.db_watcher.changed.disconnect(self.on_profile_changed)
+        self.db.close()
+        super().closeEvent(event)
+
+    def on_profile_changed(self):
+        for kind, key in self.db.changes_since():
+            if kind == "zoom":
+                for i in range(self.tabs.count()):
+                    web = self.tabs.widget(i).web
+                    if web.url().host() == key:
+                        web.setZoomFactor(self.db.zoom(key))
+            elif kind == "bookmark":
+                bm = self.db.bookmark(key)
+                if bm:
+                    # add() báo cho tree model / search index / omnibox, load() chỉ dùng khi nạp lúc khởi động
+                    self.bookmarks.add(bm["url"], bm["title"], bm.get("added_at"), persist=False)
+                else:
+                    self.bookmarks.delete(key, persist=False)
 
     # --------------------------
     # TAB MANAGEMENT
     # --------------------------
     def add_tab(self, url):
         host = QUrl(url).host()
-        zoom = self.zoom_data.get(host, 1.0)
+        zoom = self.db.zoom(host)
         tab = BrowserTab(url, profile=self.profile, zoom_factor=zoom)
         index = self.tabs.addTab(tab, "Tab")
         tab.web.titleChanged.connect(lambda t, i=index: self.tabs.setTabText(i, t[:30]))
@@ -158,8 +180,7 @@ class MiniBrowser(QMainWindow):
             if "." in text:
                 text = "http://" + text
             else:
-                from urllib.parse import quote_plus
-                text = "https://www.google.com/search?q=" + quote_plus(text)
+                text = search_url(text)
         self.current().setUrl(QUrl(text))
 
     def url_changed(self, url, index):
@@ -181,8 +202,7 @@ class MiniBrowser(QMainWindow):
     # --------------------------
     def apply_saved_zoom(self, url, web):
         host = QUrl(url).host()
-        zoom = self.zoom_data.get(host, 1.0)
-        web.setZoomFactor(zoom)
+        web.setZoomFactor(self.db.zoom(host))
 
     def zoom_in(self):
         w = self.current()
@@ -190,8 +210,7 @@ class MiniBrowser(QMainWindow):
             f = w.zoomFactor() + 0.1
             w.setZoomFactor(f)
             host = w.url().host()
-            self.zoom_data[host] = f
-            self.save_config()
+            self.db.set_zoom(host, f)
 
     def zoom_out(self):
         w = self.current()
@@ -199,16 +218,14 @@ class MiniBrowser(QMainWindow):
             f = max(0.2, w.zoomFactor() - 0.1)
             w.setZoomFactor(f)
             host = w.url().host()
-            self.zoom_data[host] = f
-            self.save_config()
+            self.db.set_zoom(host, f)
 
     def zoom_reset(self):
         w = self.current()
         if w:
             w.setZoomFactor(1.0)
             host = w.url().host()
-            self.zoom_data[host] = 1.0
-            self.save_config()
+            self.db.set_zoom(host, 1.0)
 
     # --------------------------
     # HOTKEYS
@@ -243,12 +260,11 @@ class MiniBrowser(QMainWindow):
         dlg.resize(500, 400)
         layout = QVBoxLayout(dlg)
 
-        self.bookmark_tree = QTreeWidget()
-        self.bookmark_tree.setHeaderLabels(["Title", "URL"])
+        self.bookmark_tree = QTreeView()
+        self.bookmark_tree.setUniformRowHeights(True)
+        self.bookmark_tree.setModel(self.bookmark_model)
         layout.addWidget(self.bookmark_tree)
-
-        self.populate_bookmark_tree()
-        self.bookmark_tree.itemDoubleClicked.connect(self.open_bookmark)
+        self.bookmark_tree.doubleClicked.connect(self.open_bookmark)
 
         btn_layout = QHBoxLayout()
         add_btn = QPushButton("Add Current")
@@ -261,43 +277,28 @@ class MiniBrowser(QMainWindow):
 
         dlg.exec_()
 
-    def populate_bookmark_tree(self):
-        self.bookmark_tree.clear()
-        groups = {}
-        for bm in self.bookmarks:
-            domain = QUrl(bm['url']).host()
-            if domain not in groups:
-                group_item = QTreeWidgetItem([domain])
-                self.bookmark_tree.addTopLevelItem(group_item)
-                groups[domain] = group_item
-            child = QTreeWidgetItem([bm['title'], bm['url']])
-            groups[domain].addChild(child)
-
     def add_bookmark(self):
         w = self.current()
         if not w:
             return
         url = w.url().toString()
         title = w.title() or url
-        if any(b['url'] == url for b in self.bookmarks):
+        bm = self.bookmarks.add(url, title)
+        if not bm:
             return
-        self.bookmarks.append({"title": title, "url": url})
-        self.save_config()
-        self.populate_bookmark_tree()
+        group = self.bookmark_model.group_index(bm['host'])
+        if group.isValid():
+            self.bookmark_tree.expand(group)
 
     def delete_bookmark(self):
-        item = self.bookmark_tree.currentItem()
-        if item and item.childCount() == 0:
-            url = item.text(1)
-            self.bookmarks = [b for b in self.bookmarks if b['url'] != url]
-            self.save_config()
-            parent = item.parent()
-            if parent:
-                parent.removeChild(item)
-
-    def open_bookmark(self, item, column):
-        if item.childCount() == 0:
-            self.add_tab(item.text(1))
+        bm = self.bookmark_model.bookmark(self.bookmark_tree.currentIndex())
+        if bm:
+            self.bookmarks.delete(bm['url'])
+
+    def open_bookmark(self, index):
+        bm = self.bookmark_model.bookmark(index)
+        if bm:
+            self.add_tab(bm['url'])
 
 # --------------------------
 # RUN APP
@@ -7,6 +7,8 @@ from PyQt5.QtCore import QUrl, Qt
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage, QWebEngineSettings
 from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
 
+from launch_profiles import apply_launch_mode, select_launch_mode
+
 # ----- CONFIG -----
 HOME = "https://www.youtube.com"
 # Patterns we will block (video codecs / heavy js / trackers)
@@ -25,11 +27,15 @@ BLOCK_RE = [re.compile(pat, re.IGNORECASE) for pat in BLOCK_PATTERNS]
 # Some domains we always allow (core YouTube resources)
 WHITELIST_DOMAINS = ["youtube.com", "googlevideo.com", "ytimg.com", "gstatic.com"]
 
-# Set chromium flags to attempt to reduce usage of experimental codecs / GPU issues
+# Chromium flags to attempt to reduce usage of experimental codecs / GPU issues
 # Note: flags change with Chromium versions; these are best-effort.
-os.environ.setdefault("QTWEBENGINE_CHROMIUM_FLAGS",
-                     "--disable-gpu --disable-features=UseChromeOSDirectVideoDecoder,WebRTCUseHwH264Decoding "
-                     "--autoplay-policy=user-gesture-required --enable-low-end-device-mode")
+# Process model comes from the launch mode (default: low-end), see launch_profiles.py
+DEFAULT_LAUNCH_MODE = "low-end"
+YT_CHROMIUM_FLAGS = [
+    "--disable-gpu",
+    "--disable-features=UseChromeOSDirectVideoDecoder,WebRTCUseHwH264Decoding",
+    "--autoplay-policy=user-gesture-required",
+]
 
 # ----- Interceptor -----
 class YouTubeInterceptor(QWebEngineUrlRequestInterceptor):
@@ -187,6 +193,11 @@ class UltraSmoothBrowser(QMainWindow):
 
 # ----- run -----
 def main():
+    try:
+        apply_launch_mode(select_launch_mode(default=DEFAULT_LAUNCH_MODE), extra_flags=YT_CHROMIUM_FLAGS)
+    except ValueError as e:
+        print(f"⚠ {e}")
+        sys.exit(2)
     # Use software GL if GPU causes instability (optional)
     QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
     app = QApplication(sys.argv)